@@ -0,0 +1,55 @@
+import random
+import sys
+import timeit
+from hearthbreaker.agents.basic_agents import RandomAgent
+from hearthbreaker.engine import Game
+from hearthbreaker.sim import load_deck
+
+
+def print_usage():
+    usage = """usage: python benchmark_copy.py deck1 deck2 [positions] [copies]
+
+       Measures how long Game.copy() takes on full midgame boards.  Games are played until there are at least 9
+       minions on the board and each player has at least 2 cards in hand, and each of these positions is copied.
+       The same positions are found each time, so the times can be compared between versions.
+       deck1 and deck2 are the decks to be used by the players, in cockatrice format
+       positions is the number of positions to copy (default 20)
+       copies is the number of times each position is copied (default 200)
+    """
+    print(usage)
+
+
+def find_positions(deck_files, position_count):
+    positions = []
+    seed = 0
+    while len(positions) < position_count:
+        random.seed(seed)
+        game = Game([load_deck(deck_file) for deck_file in deck_files], [RandomAgent(), RandomAgent()])
+        game.pre_game()
+        game.current_player = game.players[1]
+        while not game.game_ended:
+            game.play_single_turn()
+            if not game.game_ended and len(game.players[0].minions) + len(game.players[1].minions) >= 9 and \
+                    min(len(player.hand) for player in game.players) >= 2:
+                positions.append(game)
+                break
+        seed += 1
+    return positions
+
+
+def do_stuff():
+    position_count = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    copies = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+
+    positions = find_positions(sys.argv[1:3], position_count)
+    minions = sum(len(player.minions) for game in positions for player in game.players) / len(positions)
+    time = min(timeit.repeat(lambda: [game.copy() for game in positions], number=copies // 5, repeat=5))
+    print("{0} positions with {1:.1f} minions on average".format(len(positions), minions))
+    print("copy: {0:.1f}us".format(time / (copies // 5) / len(positions) * 1000000))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print_usage()
+        sys.exit()
+    do_stuff()
@@ -0,0 +1,272 @@
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+from hearthbreaker.agents.basic_agents import RandomAgent
+from hearthbreaker.agents.transposition import TranspositionTable
+import hearthbreaker.serialization.binary
+from hearthbreaker.serialization.move import TurnEndMove
+
+
+class _Node:
+    """
+    A node in the search tree of :class:`MCTSAgent`.  Moves which involve chance (such as a battlecry with a random
+    target) can lead to different states each time, so children are found by the text of the move that leads to them
+    rather than by position, and the moves available are worked out again each time the node is visited.
+    """
+
+    def __init__(self):
+        self.children = {}
+        self.visits = 0
+        self.score = 0.0
+
+    def select(self, moves, rng, exploration):
+        """
+        Pick the move to explore from this node.  Any move which hasn't been tried yet is picked first, and after that
+        the move with the highest upper confidence bound (UCT).
+
+        :param list[hearthbreaker.serialization.move.Move] moves: The moves which can be made from this node
+        :param random.Random rng: The generator to break ties with
+        :param float exploration: How strongly moves which have been tried less often are preferred
+        :return: The chosen move and the child node it leads to
+        """
+        keyed = [(move.to_output_string(), move) for move in moves]
+        untried = [(key, move) for key, move in keyed if key not in self.children]
+        if untried:
+            key, move = untried[rng.randint(0, len(untried) - 1)]
+            self.children[key] = _Node()
+            return move, self.children[key]
+
+        log_visits = math.log(self.visits)
+        best = None
+        best_value = -1.0
+        for key, move in keyed:
+            child = self.children[key]
+            value = child.score / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best = (move, child)
+                best_value = value
+        return best
+
+
+def _score(game, player_index):
+    """
+    Score a game from the point of view of one of its players: 1 for a win, 0 for a loss and 0.5 for a draw.  A game
+    which hasn't ended yet is scored between 0 and 1 by how much health each hero has left.
+    """
+    hero = game.players[player_index].hero
+    enemy_hero = game.players[1 - player_index].hero
+    if hero.dead or enemy_hero.dead:
+        if hero.dead and enemy_hero.dead:
+            return 0.5
+        return 0.0 if hero.dead else 1.0
+    health = hero.health + hero.armor
+    enemy_health = enemy_hero.health + enemy_hero.armor
+    return 0.5 + 0.5 * (health - enemy_health) / (health + enemy_health)
+
+
+def _search(game, iterations, time_limit, playout_turns, exploration, seed, table=None):
+    """
+    Run the search from the state of ``game``, which is not changed.  Every iteration plays a copy of the game with a
+    new random seed, so the cards yet to be drawn are different each time.  The current player can't see the cards in
+    their opponent's hand, so before each playout those are shuffled back into the opponent's deck, and the opponent
+    is dealt a new hand of the same size from it.  The tree covers the rest of the current player's turn, and from the
+    end of that turn the copy is played out by :class:`RandomAgent` for both players.
+
+    If a transposition table is given, the score of each playout is added to the scores kept for the position at the
+    end of the turn, and the average of those is what is counted in the tree.  Orders of moves which end the turn in
+    the same position then share what is known about it.  The position only covers what the current player can see,
+    so that it is the same whichever hand their opponent was dealt.
+
+    :return: The visits and total score of each move from the current state, keyed by the text of the move
+    :rtype: dict[str, (int, float)]
+    """
+    rng = random.Random(seed)
+    root = _Node()
+    player_index = game.players.index(game.current_player)
+    deadline = time.time() + time_limit if time_limit else None
+    iteration = 0
+    while iteration < iterations and (deadline is None or time.time() < deadline):
+        iteration += 1
+        playout = game.copy()
+        playout.random = random.Random(rng.getrandbits(64))
+        for player in playout.players:
+            player.agent = RandomAgent()
+        playout.players[1 - player_index].redeal_hand()
+
+        path = [root]
+        node = root
+        end_of_turn = None
+        while not playout.game_ended:
+            move, node = node.select(playout.legal_moves(), rng, exploration)
+            path.append(node)
+            if isinstance(move, TurnEndMove):
+                if table is not None:
+                    end_of_turn = playout.state_hash(playout.players[player_index])
+                playout.apply_move(move)
+                break
+            playout.apply_move(move)
+
+        for turn in range(playout_turns):
+            if playout.game_ended:
+                break
+            playout.current_player.agent.do_turn(playout.current_player)
+            if not playout.game_ended:
+                playout.apply_move(TurnEndMove())
+
+        score = _score(playout, player_index)
+        if end_of_turn is not None:
+            score = table.add_value(end_of_turn, score, playout_turns)
+        for visited in path:
+            visited.visits += 1
+            visited.score += score
+    return dict((key, (child.visits, child.score)) for key, child in root.children.items())
+
+
+# The transposition table of the agent which started a pool of workers.  Each worker is forked with a copy of it, and
+# keeps adding to its own copy for as long as the pool lasts.
+_worker_table = None
+
+
+def _start_worker(table):
+    global _worker_table
+    _worker_table = table
+
+
+def _search_in_worker(args):
+    data = args[0]
+    game = hearthbreaker.serialization.binary.decode(data, [RandomAgent(), RandomAgent()])
+    return _search(game, *args[1:], table=_worker_table)
+
+
+class MCTSAgent(RandomAgent):
+    """
+    An agent which picks each move with a Monte Carlo tree search over :meth:`Game.legal_moves
+    <hearthbreaker.engine.Game.legal_moves>`.  Each iteration plays out a copy of the game from the current state,
+    first with moves from the search tree until the end of the turn, and then with :class:`RandomAgent` making the
+    moves for both players.  Choices which aren't part of a move, such as the target of a battlecry, are made at
+    random.
+
+    The rollouts can be spread over a pool of worker processes, each of which searches its own tree.  The visits of
+    the moves at the root of each tree are added up to make the decision.  This needs processes to be forked, and
+    so falls back to a single process on platforms which can't, or when the agent is already playing in a worker
+    (such as in :func:`hearthbreaker.sim.run_batch`).  The pool is started for the first decision, and used for every
+    decision after it until :meth:`close` is called.  Each decision sends the game to the workers in the
+    :mod:`binary format <hearthbreaker.serialization.binary>`.
+
+    The scores of the positions at the end of each turn are kept in a
+    :class:`TranspositionTable <hearthbreaker.agents.transposition.TranspositionTable>`, which lasts for as long as
+    the agent, and can be shared with other agents.  Workers start from a copy of the table as it was when the pool
+    was started, and what they add to it is kept by each worker, but not sent back.
+    """
+
+    def __init__(self, iterations=100, time_limit=1.0, playout_turns=4, workers=1, exploration=0.7, table=None):
+        """
+        :param int iterations: The most rollouts to run for each decision
+        :param float time_limit: The most seconds to spend on each decision, or None for no limit
+        :param int playout_turns: The number of turns to play out at random after the end of the current turn,
+                                  before the game is scored by the health of the heroes
+        :param int workers: The number of processes to run the rollouts in.  If 1, they are run in this process.
+        :param float exploration: The exploration constant of the upper confidence bound
+        :param hearthbreaker.agents.transposition.TranspositionTable table: The table to keep the scores of positions
+                                                                           in.  If None, the agent makes its own.
+        """
+        super().__init__()
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.playout_turns = playout_turns
+        self.workers = workers
+        self.exploration = exploration
+        if table is None:
+            table = TranspositionTable()
+        self.table = table
+        #: The number of moves this agent has chosen
+        self.decisions = 0
+        #: The number of seconds this agent has spent choosing them
+        self.thinking_time = 0.0
+        self._pool = None
+
+    @property
+    def decisions_per_second(self):
+        """
+        The number of moves this agent has chosen for every second it has spent searching
+        """
+        if self.thinking_time == 0:
+            return 0.0
+        return self.decisions / self.thinking_time
+
+    def do_turn(self, player):
+        game = player.game
+        while not game.game_ended:
+            moves = game.legal_moves()
+            if len(moves) == 1:
+                return
+            move = self.choose_move(game, moves)
+            if isinstance(move, TurnEndMove):
+                return
+            game.apply_move(move)
+
+    def choose_move(self, game, moves):
+        """
+        Search for the best move from the current state of the game.
+
+        :param hearthbreaker.engine.Game game: The game to choose a move in
+        :param list[hearthbreaker.serialization.move.Move] moves: The moves which can be made, from
+                                                                  :meth:`Game.legal_moves()
+                                                                  <hearthbreaker.engine.Game.legal_moves>`
+        :rtype: hearthbreaker.serialization.move.Move
+        """
+        start = time.time()
+        seed = game.random.getrandbits(64)
+        workers = self._usable_workers()
+        if workers == 1:
+            results = [_search(game, self.iterations, self.time_limit, self.playout_turns, self.exploration, seed,
+                               self.table)]
+        else:
+            results = self._search_in_pool(game, workers, seed)
+
+        visits = {}
+        for result in results:
+            for key, (count, score) in result.items():
+                visits[key] = visits.get(key, 0) + count
+        best = max(moves, key=lambda move: visits.get(move.to_output_string(), 0))
+
+        self.decisions += 1
+        self.thinking_time += time.time() - start
+        return best
+
+    def _usable_workers(self):
+        if self.workers <= 1 or multiprocessing.current_process().daemon:
+            return 1
+        if hasattr(multiprocessing, "get_all_start_methods"):
+            if "fork" not in multiprocessing.get_all_start_methods():
+                return 1
+        elif sys.platform == "win32":
+            return 1
+        return self.workers
+
+    def _search_in_pool(self, game, workers, seed):
+        if self._pool is None:
+            if hasattr(multiprocessing, "get_context"):
+                self._pool = multiprocessing.get_context("fork").Pool(workers, _start_worker, (self.table,))
+            else:
+                self._pool = multiprocessing.Pool(workers, _start_worker, (self.table,))
+        data = hearthbreaker.serialization.binary.encode(game)
+        chunks = []
+        for worker in range(workers):
+            count = self.iterations // workers
+            if worker < self.iterations % workers:
+                count += 1
+            chunks.append((data, count, self.time_limit, self.playout_turns, self.exploration, seed + worker))
+        return self._pool.map(_search_in_worker, chunks)
+
+    def close(self):
+        """
+        Stop the pool of worker processes, if this agent has started one.  A later decision starts a new pool.
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
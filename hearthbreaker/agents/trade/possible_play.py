@@ -1,3 +1,4 @@
+import collections
 from hearthbreaker.agents.trade.util import Util
 from functools import reduce
 
@@ -53,7 +54,8 @@ class PossiblePlay:
         return False
 
     def first_card(self):
-        if self.has_hero_power():
+        # The coin has to come first if the hero power is to be paid for with it
+        if self.has_hero_power() and self.cards[0].name != "The Coin":
             for card in self.cards:
                 if card.name == 'Hero Power':
                     return card
@@ -67,45 +69,6 @@ class PossiblePlay:
         return "{} {}".format(s, self.value())
 
 
-class CoinPlays:
-    def coin(self):
-        cards = [c for c in filter(lambda c: c.name == 'The Coin', self.cards)]
-        return cards[0]
-
-    def raw_plays_with_coin(self):
-        res = []
-        if self.has_coin():
-            coinPlays = self.after_coin().raw_plays()
-
-            for play in coinPlays:
-                cards = [self.coin()] + play
-                res.append(cards)
-
-        return res
-
-    def raw_plays(self):
-        res = []
-        for play in self.raw_plays_without_coin():
-            res.append(play)
-
-        for play in self.raw_plays_with_coin():
-            res.append(play)
-
-        return res
-
-    def has_coin(self):
-        return any(map(lambda c: c.name == "The Coin", self.cards))
-
-    def cards_without_coin(self):
-        return Util.filter_out_one(self.cards, lambda c: c.name == "The Coin")
-
-    def after_coin(self):
-        return PossiblePlays(self.cards_without_coin(), self.mana + 1)
-
-    def without_coin(self):
-        return PossiblePlays(self.cards_without_coin(), self.mana)
-
-
 class HeroPowerCard:
     def __init__(self):
         self.mana = 2
@@ -119,60 +82,89 @@ class HeroPowerCard:
         return 2
 
 
-class PossiblePlays(CoinPlays):
+class PossiblePlays:
+    """
+    Finds every set of cards from a hand which could be played together this turn, as a knapsack over the mana
+    available.  Copies of the same card which cost the same are interchangeable, so each set is made by choosing how
+    many copies of each card to play, and no set is found more than once.  Each coin played adds a mana to spend, and
+    the hero power can be used once if there are two mana left for it.
+
+    Only sets that leave nothing else playable are kept, so a play never leaves out a card (or the hero power) that
+    could still be afforded.  The coin is the exception, as the mana it adds would be wasted if it is played for
+    nothing.  Each set is scored by :meth:`PossiblePlay.value`.
+    """
+
     def __init__(self, cards, mana, allow_hero_power=True):
         self.cards = cards
         self.mana = mana
         self.allow_hero_power = allow_hero_power
 
-    def possible_is_pointless_coin(self, possible):
-        if len(possible) != 1 or possible[0].name != "The Coin":
-            return False
-
-        cards_playable_after_coin = [card for card in filter(lambda c: c.mana - 1 == self.mana, self.cards)]
-        return len(cards_playable_after_coin) == 0
-
-    def raw_plays_without_coin(self):
-        res = []
-
-        def valid_card(card):
+    def _usable(self, card, mana):
+        key = (id(card), mana)
+        if key not in self._usable_cache:
             saved_mana = card.player.mana
-            card.player.mana = self.mana
-            usable = card.can_use(card.player, card.player.game)
+            card.player.mana = mana
+            self._usable_cache[key] = card.can_use(card.player, card.player.game)
             card.player.mana = saved_mana
-            return usable
-
-        possible = [card for card in
-                    filter(valid_card, self.cards)]
-
-        if self.possible_is_pointless_coin(possible):
-            possible = []
+        return self._usable_cache[key]
 
-        if self.mana >= 2 and self.allow_hero_power:
-            possible.append(HeroPowerCard())
-
-        if len(possible) == 0:
-            return [[]]
-
-        for card in possible:
-            rest = self.cards[0:99999]
-
-            if card.name == 'Hero Power':
-                f_plays = PossiblePlays(rest,
-                                        self.mana - card.mana_cost(),
-                                        allow_hero_power=False).raw_plays()
+    def raw_plays(self):
+        """
+        Find the cards of every possible play.  The coins in each play come first, then the other cards in the order
+        they first appear in the hand, then the hero power.
+
+        :rtype: list[list[hearthbreaker.game_objects.Card]]
+        """
+        self._usable_cache = {}
+        coins = []
+        groups = collections.OrderedDict()
+        for card in self.cards:
+            if card.name == "The Coin":
+                coins.append(card)
             else:
-                rest.remove(card)
-                f_plays = PossiblePlays(rest,
-                                        self.mana - card.mana_cost(),
-                                        allow_hero_power=self.allow_hero_power).raw_plays()
+                cost = card.mana_cost()
+                groups.setdefault((card.name, cost), ([], cost))[0].append(card)
+        groups = list(groups.values())
 
-            for following_play in f_plays:
-                combined = [card] + following_play
-                res.append(combined)
+        res = []
+        for coin_count in range(len(coins), -1, -1):
+            coins_played = coins[:coin_count]
+            for play in self._choose(groups, 0, self.mana + coin_count):
+                if play or coins_played:
+                    res.append(coins_played + play)
+        if len(res) == 0:
+            return [[]]
+        return res
 
-        res = Util.uniq_by_sorted(res)
+    def _choose(self, groups, index, mana):
+        """
+        Find the plays from the cards in ``groups[index:]``, with ``mana`` left to spend.  Larger numbers of each card
+        are tried first.
+        """
+        if index == len(groups):
+            if self.allow_hero_power and mana >= 2:
+                return [[HeroPowerCard()]]
+            return [[]]
 
+        cards, cost = groups[index]
+        res = []
+        count = 0
+        remaining = mana
+        while count < len(cards) and cost <= remaining and self._usable(cards[count], remaining):
+            remaining -= cost
+            count += 1
+
+        if cost == 0:
+            lowest = count
+        else:
+            lowest = 0
+        for played in range(count, lowest - 1, -1):
+            remaining = mana - cost * played
+            for rest in self._choose(groups, index + 1, remaining):
+                left = remaining - sum(card.mana_cost() for card in rest)
+                if played < len(cards) and cost <= left and self._usable(cards[played], left):
+                    continue
+                res.append(cards[:played] + rest)
         return res
 
     def plays_inner(self):
@@ -5,25 +5,51 @@ from hearthbreaker.game_objects import Hero
 
 
 class memoized(object):
-    '''Decorator. Caches a function's return value each time it is called.
-    If called later with the same arguments, the cached value is returned
-    (not reevaluated).
+    '''Decorator. Caches a method's return value each time it is called.
+    If called later on the same object with the same arguments, the cached
+    value is returned (not reevaluated).
+
+    The values are kept on the object itself, so they go when it does, and
+    each object keeps at most max_size of them for each method, dropping the
+    least recently used.  The hits and misses of every object are counted
+    on the decorator, which can be reached through the class, e.g.
+    Trade.value.hits.
     '''
-    def __init__(self, func):
+    def __init__(self, func, max_size=128):
         self.func = func
-        self.cache = {}
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        functools.update_wrapper(self, func)
+
+    def cache_for(self, obj):
+        caches = obj.__dict__.setdefault("_memoized", {})
+        if self not in caches:
+            caches[self] = collections.OrderedDict()
+        return caches[self]
 
-    def __call__(self, *args):
-        if not isinstance(args, collections.Hashable):
+    def __call__(self, obj, *args):
+        try:
+            hash(args)
+        except TypeError:
             # uncacheable. a list, for instance.
             # better to not cache than blow up.
-            return self.func(*args)
-        if args in self.cache:
-            return self.cache[args]
-        else:
-            value = self.func(*args)
-            self.cache[args] = value
-            return value
+            return self.func(obj, *args)
+        cache = self.cache_for(obj)
+        if args in cache:
+            self.hits += 1
+            cache.move_to_end(args)
+            return cache[args]
+        self.misses += 1
+        value = self.func(obj, *args)
+        cache[args] = value
+        if len(cache) > self.max_size:
+            cache.popitem(last=False)
+        return value
+
+    def reset_counts(self):
+        self.hits = 0
+        self.misses = 0
 
     def __repr__(self):
         '''Return the function's docstring.'''
@@ -31,6 +57,8 @@ class memoized(object):
 
     def __get__(self, obj, objtype):
         '''Support instance methods.'''
+        if obj is None:
+            return self
         return functools.partial(self.__call__, obj)
 
 
@@ -53,16 +81,16 @@ class Util:
         return res.values()
 
     @staticmethod
-    def rand_el(list):
-        i = random.randint(0, len(list) - 1)
+    def rand_el(list, rand=random):
+        i = rand.randint(0, len(list) - 1)
         return list[i]
 
     @staticmethod
-    def rand_prefer_minion(targets):
+    def rand_prefer_minion(targets, rand=random):
         minions = [card for card in filter(lambda c: not isinstance(c, Hero), targets)]
         if len(minions) > 0:
             targets = minions
-        return Util.rand_el(targets)
+        return Util.rand_el(targets, rand)
 
     @staticmethod
     def filter_out_one(arr, f):
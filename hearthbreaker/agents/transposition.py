@@ -0,0 +1,163 @@
+import collections
+
+__doc__ = """
+A bounded table of what a search has learned about the positions it has reached, keyed by
+:meth:`Game.state_hash <hearthbreaker.engine.Game.state_hash>`.
+
+The same position is often reached by more than one order of moves (such as playing two minions in either order), so
+a search which keeps its results here only has to evaluate it once.  A table can be shared by many searches, so what
+is learned during one decision is still there for the next decision, and the next turn.
+"""
+
+#: Replace the entry which was used longest ago when the table is full
+LRU = "lru"
+#: Keep the entries searched to the greatest depth.  Each position has one slot, and a new entry only replaces the
+#: entry already in that slot if it was searched at least as deeply.
+DEPTH_PREFERRED = "depth"
+
+
+class TranspositionEntry:
+    """
+    What is known about one position.
+    """
+    __slots__ = ["key", "value", "visits", "move", "depth"]
+
+    def __init__(self, key, value, visits, move, depth):
+        #: The hash of the position
+        self.key = key
+        #: The estimated value of the position
+        self.value = value
+        #: The number of evaluations the value was averaged from
+        self.visits = visits
+        #: The best move found from the position, or None
+        self.move = move
+        #: How deeply the position was searched to find the value
+        self.depth = depth
+
+
+class TranspositionTable:
+    """
+    A table of :class:`TranspositionEntry` keyed by the hash of a position.  The table never holds more than
+    ``max_entries`` entries, and which are thrown away when it is full depends on the ``replacement`` policy:
+
+    * :data:`LRU` keeps the most recently used entries.  This suits a search which keeps visiting the same
+      positions.
+    * :data:`DEPTH_PREFERRED` keeps the entries which took the most work to find.  It doesn't have to track use, so
+      :meth:`lookup` is a little quicker.
+
+    The table only holds numbers and moves, so each entry takes about 200 bytes.
+    """
+
+    def __init__(self, max_entries=50000, replacement=LRU):
+        """
+        :param int max_entries: The most entries to keep
+        :param str replacement: Which entries to throw away when the table is full, either :data:`LRU` or
+                                :data:`DEPTH_PREFERRED`
+        """
+        if max_entries < 1:
+            raise ValueError("A transposition table must hold at least one entry")
+        if replacement not in (LRU, DEPTH_PREFERRED):
+            raise ValueError("Unknown replacement policy: {0}".format(replacement))
+        self.max_entries = max_entries
+        self.replacement = replacement
+        #: The number of times :meth:`lookup` found an entry
+        self.hits = 0
+        #: The number of times :meth:`lookup` didn't find an entry
+        self.misses = 0
+        self.clear()
+
+    def clear(self):
+        """
+        Remove every entry from the table
+        """
+        if self.replacement == LRU:
+            self._entries = collections.OrderedDict()
+        else:
+            self._slots = [None] * self.max_entries
+            self._count = 0
+
+    def __len__(self):
+        if self.replacement == LRU:
+            return len(self._entries)
+        return self._count
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def _find(self, key):
+        if self.replacement == LRU:
+            return self._entries.get(key)
+        entry = self._slots[key % self.max_entries]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def lookup(self, key):
+        """
+        Find what is known about a position.
+
+        :param int key: The :meth:`state_hash <hearthbreaker.engine.Game.state_hash>` of the position
+        :return: The entry for the position, or None if there isn't one
+        :rtype: TranspositionEntry
+        """
+        entry = self._find(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.replacement == LRU:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key, value, move=None, depth=0, visits=1):
+        """
+        Record what is known about a position, replacing anything already known about it.  With
+        :data:`DEPTH_PREFERRED` replacement, the entry is not stored if a different position which was searched more
+        deeply is using its slot.
+
+        :param int key: The :meth:`state_hash <hearthbreaker.engine.Game.state_hash>` of the position
+        :param float value: The estimated value of the position
+        :param hearthbreaker.serialization.move.Move move: The best move found from the position
+        :param int depth: How deeply the position was searched
+        :param int visits: The number of evaluations the value was averaged from
+        :return: The stored entry, or None if it wasn't stored
+        :rtype: TranspositionEntry
+        """
+        entry = TranspositionEntry(key, value, visits, move, depth)
+        if self.replacement == LRU:
+            entries = self._entries
+            if key in entries:
+                entries.move_to_end(key)
+            elif len(entries) >= self.max_entries:
+                entries.popitem(last=False)
+            entries[key] = entry
+            return entry
+
+        slot = key % self.max_entries
+        current = self._slots[slot]
+        if current is None:
+            self._count += 1
+        elif current.key != key and current.depth > depth:
+            return None
+        self._slots[slot] = entry
+        return entry
+
+    def add_value(self, key, value, depth=0):
+        """
+        Add one more evaluation of a position to the average kept for it.  The best move and depth already recorded
+        are kept, unless ``depth`` is greater.
+
+        :param int key: The :meth:`state_hash <hearthbreaker.engine.Game.state_hash>` of the position
+        :param float value: The value of this evaluation
+        :param int depth: How deeply the position was searched for this evaluation
+        :return: The average of every evaluation of the position which is still known
+        :rtype: float
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            self.store(key, value, depth=depth)
+            return value
+        entry.value += (value - entry.value) / (entry.visits + 1)
+        entry.visits += 1
+        entry.depth = max(entry.depth, depth)
+        return entry.value
@@ -1,14 +1,21 @@
 import abc
 from functools import reduce
 import hearthbreaker.constants
+import hearthbreaker.targeting
 from hearthbreaker.constants import CARD_RARITY, MINION_TYPE
-from hearthbreaker.game_objects import Bindable, GameObject, GameException, Hero
+from hearthbreaker.game_objects import Bindable, GameObject, GameException, Hero, _HASH_HAND
+from hearthbreaker.tags.base import copy_tags
+
+
+# The pristine instance of each card class that :meth:`Card.create` copies from
+_prototypes = {}
 
 
 def _battlecry_targetable(target):
     return target.player is target.player.game.current_player or not target.stealth
 
 
+@hearthbreaker.targeting.cacheable_filter
 def _is_spell_targetable(target):
     return target.spell_targetable() and not target.dead
 
@@ -23,6 +30,7 @@ class Card(Bindable, GameObject):
     In order to play a card, it should be passed to :meth:`Game.play_card`.  Simply calling :meth:`use` will
     cause its effect, but not update the game state.
     """
+    _hash_part = _HASH_HAND
 
     def __init__(self, name, mana, character_class, rarity, collectible, target_func=None,
                  filter_func=_is_spell_targetable, overload=0, ref_name=None, effects=None, buffs=None):
@@ -113,13 +121,16 @@ class Card(Bindable, GameObject):
         :return: representing the actual mana cost of this card.
         :rtype: int
         """
+        return self.cached_stat("mana_cost", self._calculate_mana_cost)
+
+    def _calculate_mana_cost(self):
         from hearthbreaker.tags.status import ManaChange
         # Mana appears to be calculated in reverse order from other stats (auras first, then buffs)
 
         mana = reduce(lambda a, b: b.update(self, a), [aura.status
                                                        for p in self.player.game.players
-                                                       for aura in p.object_auras
-                                                       if aura.match(self) and isinstance(aura.status, ManaChange)],
+                                                       for aura in p.auras_for(ManaChange)
+                                                       if aura.match(self)],
                       self.mana)
         mana = reduce(lambda a, b: b.update(self, a), [buff.status for buff in self.buffs
                                                        if isinstance(buff.status, ManaChange) and
@@ -163,6 +174,44 @@ class Card(Bindable, GameObject):
         new_card.attach(new_card, self.player)
         self.player.hand[index] = new_card
 
+    def copy(self):
+        """
+        Create a copy of this card which is not attached to any player.
+
+        The parts of a card which are fixed when it is defined, such as its battlecry or deathrattle, are shared with
+        the copy.  Only the state which can change during a game (its effects, auras, buffs and event bindings) is
+        duplicated.
+
+        :rtype: Card
+        """
+        cls = type(self)
+        new_card = cls.__new__(cls)
+        contents = new_card.__dict__ = self.__dict__.copy()
+        contents["events"] = {}
+        contents["effects"] = copy_tags(self.effects) if self.effects else []
+        contents["auras"] = copy_tags(self.auras) if self.auras else []
+        contents["buffs"] = copy_tags(self.buffs) if self.buffs else []
+        contents["player"] = None
+        contents["_attached"] = False
+        contents["_stat_cache"] = {}
+        if self.targetable:
+            contents["targets"] = []
+        return new_card
+
+    @classmethod
+    def create(cls):
+        """
+        Create a new instance of this card, as it would be before it is drawn.  This has the same result as calling the
+        class, but copies a prototype of the card rather than constructing its tags again.
+
+        :rtype: Card
+        """
+        prototype = _prototypes.get(cls)
+        if prototype is None:
+            prototype = cls()
+            _prototypes[cls] = prototype
+        return prototype.copy()
+
 
 class MinionCard(Card, metaclass=abc.ABCMeta):
     """
@@ -229,7 +229,7 @@ class SoulOfTheForest(SpellCard):
         # Can stack as many deathrattles as we want, so no need to check if this has already been given
         # See http://hearthstone.gamepedia.com/Soul_of_the_Forest
         for minion in player.minions:
-            minion.deathrattle.append(Deathrattle(Summon(Treant()), PlayerSelector()))
+            minion.add_deathrattle(Deathrattle(Summon(Treant()), PlayerSelector()))
 
 
 class Swipe(SpellCard):
@@ -418,7 +418,7 @@ class Recycle(SpellCard):
 
     def use(self, player, game):
         super().use(player, game)
-        player.opponent.deck.put_back(self.target)
+        player.opponent.deck.put_back(type(self.target.card)())
         self.target.remove_from_board()
 
 
@@ -119,6 +119,7 @@ class IceBarrier(SecretCard):
     def _reveal(self, attacker, target):
         if target is self.player.hero and not attacker.removed:
             attacker.player.game.other_player.hero.armor += 8
+            attacker.player.game.other_player.hero._hash_changed()
             super().reveal()
 
     def activate(self, player):
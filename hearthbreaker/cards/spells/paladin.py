@@ -248,6 +248,7 @@ class Redemption(SecretCard):
         resurrection = minion.card.summon(minion.player, minion.game, min(minion.index, len(minion.player.minions)))
         if resurrection:
             resurrection.health = 1
+            resurrection._hash_changed()
             super().reveal()
 
     def activate(self, player):
@@ -53,11 +53,13 @@ class Betrayal(SpellCard):
 
         original_immune = self.target.immune
         self.target.immune = True
+        self.target._hash_changed()
         if left_minion is not None:
             left_minion.damage(self.target.calculate_attack(), self.target)
         if right_minion is not None:
             right_minion.damage(self.target.calculate_attack(), self.target)
         self.target.immune = original_immune
+        self.target._hash_changed()
 
 
 class BladeFlurry(SpellCard):
@@ -112,6 +114,7 @@ class DeadlyPoison(SpellCard):
         super().use(player, game)
 
         player.weapon.base_attack += 2
+        player.weapon._hash_changed()
         player.hero.change_temp_attack(2)
 
     def can_use(self, player, game):
@@ -244,6 +247,7 @@ class TinkersSharpswordOil(SpellCard):
     def use(self, player, game):
         super().use(player, game)
         player.weapon.base_attack += 3
+        player.weapon._hash_changed()
         player.hero.change_temp_attack(3)
         if player.cards_played > 0:
             targets = hearthbreaker.targeting.find_friendly_minion_battlecry_target(player.game, lambda x: x)
@@ -28,7 +28,7 @@ class AncestralSpirit(SpellCard):
 
     def use(self, player, game):
         super().use(player, game)
-        self.target.deathrattle.append(Deathrattle(Summon(self.target.card), PlayerSelector()))
+        self.target.add_deathrattle(Deathrattle(Summon(self.target.card), PlayerSelector()))
 
 
 class Bloodlust(SpellCard):
@@ -132,13 +132,11 @@ class SenseDemons(SpellCard):
         super().use(player, game)
 
         for i in range(0, 2):
-            demon_card = game.random_draw(game.current_player.deck.cards,
-                                          lambda c: not c.drawn and
-                                          c.is_minion() and
+            demon_card = game.random_draw(game.current_player.deck.undrawn_cards(),
+                                          lambda c: c.is_minion() and
                                           c.minion_type == MINION_TYPE.DEMON)
             if demon_card:
-                demon_card.drawn = True
-                player.deck.left -= 1
+                player.deck.remove(demon_card)
                 if len(player.hand) < 10:
                     player.hand.append(demon_card)
                     demon_card.player = player
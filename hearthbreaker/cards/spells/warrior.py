@@ -195,8 +195,11 @@ class Upgrade(SpellCard):
         if player.weapon:
             player.weapon.durability += 1
             player.weapon.base_attack += 1
+            player.weapon._hash_changed()
         else:
-            heavy_axe = HeavyAxe().create_weapon(player)
+            axe_card = HeavyAxe()
+            heavy_axe = axe_card.create_weapon(player)
+            heavy_axe.card = axe_card
             heavy_axe.equip(player)
 
 
@@ -1,54 +1,351 @@
+import bisect
 import copy
+import hashlib
 import random
 from hearthbreaker.cards.heroes import hero_from_name
 import hearthbreaker.constants
-from hearthbreaker.game_objects import Bindable, GameException, Minion, Hero, Weapon
+import hearthbreaker.game_objects
+from hearthbreaker.game_objects import Bindable, GameException, GameObject, Minion, Hero, Weapon, _HASH_HAND, \
+    _HASH_HERO, _HASH_MINIONS, _HASH_SECRETS, _HASH_GRAVEYARD, _HASH_PARTS
+from hearthbreaker.proxies import ProxyCard
+from hearthbreaker.serialization.move import PlayMove, AttackMove, PowerMove, TurnEndMove
 import hearthbreaker.tags
 from hearthbreaker.tags.base import Effect, AuraUntil
 import hearthbreaker.targeting
 
 
+#: Every card class, keyed by reference name.  This is only filled in once a card is looked up by a name that
+#: :func:`card_lookup` can't guess from the class names, or :func:`get_cards` is called.
 card_table = {}
 
+# Every card class, found when this module is loaded
+_card_classes = []
+# The same classes, keyed by class name with the case and punctuation removed
+_classes_by_name = {}
 
-def __create_card_table():
-    from hearthbreaker.cards.base import WeaponCard, SpellCard, MinionCard, SecretCard, ChoiceCard, HeroCard
 
-    def __card_lookup_rec(card_type):
-        subclasses = card_type.__subclasses__()
-        for sc in subclasses:
-            c = sc()
-            card_table[c.ref_name] = sc
+def __find_card_classes():
+    from hearthbreaker.cards.base import WeaponCard, SpellCard, MinionCard, SecretCard, ChoiceCard, HeroCard
 
     for card_class in [WeaponCard, SpellCard, MinionCard, SecretCard, ChoiceCard, HeroCard]:
-        __card_lookup_rec(card_class)
+        for subclass in card_class.__subclasses__():
+            _card_classes.append(subclass)
+            _classes_by_name.setdefault(subclass.__name__.lower(), []).append(subclass)
+
+
+def _simplify_name(name):
+    return "".join(character for character in name if character.isalnum()).lower()
+
+
+def __create_card_table():
+    # The reference name of a card is only set by its constructor, so each card has to be created to find it
+    for card_class in _card_classes:
+        card_table[card_class().ref_name] = card_class
+
+
+def _card_table():
+    if not card_table:
+        __create_card_table()
+    return card_table
 
 
 def card_lookup(card_name):
     """
     Given a the name of a card as a string, return an object corresponding to that card
 
+    Most card classes are named after their card, so the class with the matching name is tried first.  The full table
+    of cards, which means creating one of every card, is only built if that doesn't find the card.
+
     :param str card_name: A string representing the name of the card in English
     :return: An instance of a subclass of Card corresponding to the given card name or None if no Card
              by that name exists.
     :rtype: hearthbreaker.game_objects.Card
     """
 
-    card = card_table[card_name]
+    if not card_table:
+        for card_class in _classes_by_name.get(_simplify_name(card_name), []):
+            card = card_class()
+            if card.ref_name == card_name:
+                return card
+
+    card = _card_table()[card_name]
     if card is not None:
         return card()
     return None
 
 
 def get_cards():
-    card_list = filter(lambda c: c.collectible,
-                       [card() for card in card_table.values()])
-    return card_list
+    return [card.copy() for card in collectible_cards()]
+
+
+# One of each collectible card, in card table order, and the same cards filed under each key from _card_keys
+_collectible_cards = []
+_collectible_index = {}
+
+
+def _card_keys(card):
+    keys = [("character_class", card.character_class), ("rarity", card.rarity), ("mana", card.mana)]
+    if card.is_minion():
+        keys.append(("minion",))
+        keys.append(("minion_type", card.minion_type))
+    if card.is_spell():
+        keys.append(("spell",))
+    if card.is_secret():
+        keys.append(("secret",))
+    if card.is_weapon():
+        keys.append(("weapon",))
+    return keys
+
+
+def __index_collectible_cards():
+    index = {}
+    for card_class in _card_table().values():
+        card = card_class()
+        if card.collectible:
+            _collectible_cards.append(card)
+            for key in _card_keys(card):
+                index.setdefault(key, []).append(card)
+    for key, cards in index.items():
+        _collectible_index[key] = (tuple(cards), frozenset(cards))
+
+
+def collectible_cards(keys=()):
+    """
+    Find the collectible cards which are filed under every one of the given keys, such as ``("mana", 2)`` or
+    ``("minion_type", MINION_TYPE.BEAST)``.  The keys are those given by
+    :meth:`hearthbreaker.tags.base.Condition.card_key`.
+
+    The cards returned are shared by every caller, so they must be copied rather than changed or played.
+
+    :param list keys: The keys to look up.  If empty, every collectible card is returned.
+    :return: The cards, in the same order as :func:`get_cards`
+    :rtype: list[hearthbreaker.cards.base.Card]
+    """
+    if not _collectible_cards:
+        __index_collectible_cards()
+    if not keys:
+        return list(_collectible_cards)
+    entries = [_collectible_index.get(key, ((), frozenset())) for key in keys]
+    entries.sort(key=lambda entry: len(entry[0]))
+    return [card for card in entries[0][0] if all(card in entry[1] for entry in entries[1:])]
+
+
+# The Zobrist key of each feature of a game state which has been hashed so far
+_zobrist_keys = {}
+
+_HASH_MASK = 0xffffffffffffffff
+
+
+def _zobrist(feature):
+    """
+    Find the random 64-bit key of a feature of a game state, such as a minion at a position on the board.  The key is
+    taken from a digest of the feature, rather than from :func:`hash`, so that it is the same in every process.
+
+    :param tuple feature: The feature, made only of strings, numbers, booleans, None and tuples
+    :rtype: int
+    """
+    key = _zobrist_keys.get(feature)
+    if key is None:
+        if len(_zobrist_keys) >= 1000000:
+            _zobrist_keys.clear()
+        key = int.from_bytes(hashlib.md5(repr(feature).encode("utf-8")).digest()[:8], "little")
+        _zobrist_keys[feature] = key
+    return key
+
+
+def _rotate_hash(state, index):
+    """
+    Rotate the part of the hash belonging to the second player, so that the same part for each player doesn't cancel
+    out.
+    """
+    if index:
+        return ((state << 32) | (state >> 32)) & _HASH_MASK
+    return state
+
+
+def _tags_hash(position, obj, *tag_lists):
+    """
+    Hash the tags of an object at a position, with one key for each of the given lists of tags on it.
+    """
+    state = 0
+    for name in tag_lists:
+        tags = getattr(obj, name)
+        if tags:
+            state ^= _zobrist((position, name, tuple(tag.key() for tag in tags)))
+    return state
+
+
+def _tags_changeable(obj, *tag_lists):
+    """
+    Check whether any of the tags in the given lists on an object can change without the list being changed, in which
+    case a hash of them can't be kept.  These are the tags whose key isn't kept by :meth:`JSONObject.key
+    <hearthbreaker.tags.base.JSONObject.key>`.
+    """
+    for name in tag_lists:
+        for tag in getattr(obj, name):
+            if "_key" not in tag.__dict__:
+                return True
+    return False
+
+
+class _HashedList(list):
+    """
+    A list belonging to a :class:`Player` which is part of the state hash.  Changing it makes the player forget the
+    hash it kept of the part of their state the list is in.
+    """
+    __slots__ = ["owner", "part"]
+
+    def __init__(self, owner, part, items=()):
+        super().__init__(items)
+        self.owner = owner
+        self.part = part
+
+    def __reduce_ex__(self, protocol):
+        return _HashedList, (self.owner, self.part, list(self))
+
+    def append(self, item):
+        list.append(self, item)
+        self.owner._hash_appended(self.part)
+
+    def insert(self, index, item):
+        list.insert(self, index, item)
+        self.owner._hash_changed(self.part)
+
+    def extend(self, items):
+        list.extend(self, items)
+        self.owner._hash_changed(self.part)
+
+    def remove(self, item):
+        list.remove(self, item)
+        self.owner._hash_changed(self.part)
+
+    def pop(self, *index):
+        item = list.pop(self, *index)
+        self.owner._hash_changed(self.part)
+        return item
+
+    def clear(self):
+        list.clear(self)
+        self.owner._hash_changed(self.part)
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self.owner._hash_changed(self.part)
+
+    def reverse(self):
+        list.reverse(self)
+        self.owner._hash_changed(self.part)
+
+    def __setitem__(self, index, item):
+        list.__setitem__(self, index, item)
+        self.owner._hash_changed(self.part)
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self.owner._hash_changed(self.part)
+
+    def __iadd__(self, items):
+        list.extend(self, items)
+        self.owner._hash_changed(self.part)
+        return self
+
+    def __imul__(self, count):
+        list.__imul__(self, count)
+        self.owner._hash_changed(self.part)
+        return self
+
+
+class _SharedRandom(random.Random):
+    """
+    A random number generator which draws from the generator behind the module level functions in :mod:`random`.  It
+    is used by games which were not given a seed, and is shared rather than duplicated when a game is copied.
+    """
+
+    def seed(self, *args, **kwargs):
+        pass
+
+    def random(self):
+        return random.random()
+
+    def getrandbits(self, k):
+        return random.getrandbits(k)
+
+    def getstate(self):
+        return random.getstate()
+
+    def setstate(self, state):
+        random.setstate(state)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class _SeededRandom(random.Random):
+    """
+    The random number generator of a game which was given a seed.  A copy takes over the state of the original
+    without seeding itself first, which is what makes copying a :class:`random.Random` slow.
+    """
+
+    def __copy__(self):
+        copied = _SeededRandom.__new__(_SeededRandom)
+        copied.setstate(self.getstate())
+        return copied
+
+
+class _MoveAgent:
+    """
+    Stands in for a player's agent while :meth:`Game.apply_move` plays a move.  The move sets the target, index and
+    option it was made with, and any other question (such as the target of a battlecry) goes to the real agent.
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.next_target = None
+        self.next_index = -1
+        self.next_option = None
+
+    def choose_target(self, targets):
+        if self.next_target is not None:
+            return self.next_target
+        return self.agent.choose_target(targets)
+
+    def choose_index(self, card, player):
+        if self.next_index > -1:
+            return self.next_index
+        return self.agent.choose_index(card, player)
+
+    def choose_option(self, options, player):
+        if self.next_option is not None:
+            return options[self.next_option]
+        return self.agent.choose_option(options, player)
+
+    def __getattr__(self, item):
+        return getattr(self.agent, item)
 
 
 class Game(Bindable):
-    def __init__(self, decks, agents):
+    #: If True, :meth:`state_hash` checks the hashes kept by each player and deck against one worked out from scratch
+    verify_state_hash = False
+
+    def __init__(self, decks, agents, seed=None):
+        """
+        Create a new game between two decks.
+
+        :param list[Deck] decks: The decks for the two players
+        :param list agents: The agents which will play each deck
+        :param int seed: The seed for this game's random number generator.  Every random decision in the game, including
+                         those made by the agents, is drawn from this generator, so a game with a given seed can be
+                         reproduced exactly.  If None (the default), the generator behind the :mod:`random` module
+                         is used instead.
+        """
         super().__init__()
+        #: The seed this game's random number generator was created from, or None if it uses the shared generator
+        self.seed = seed
+        #: The random number generator all random decisions in this game are made with
+        self.random = _SharedRandom() if seed is None else _SeededRandom(seed)
         self.delayed_minions = set()
         self.first_player = self._generate_random_between(0, 1)
         if self.first_player is 0:
@@ -69,6 +366,68 @@ class Game(Bindable):
         self._all_cards_played = []
         self._turns_passed = 0
         self.selected_card = None
+        self._legal_moves_checked = None
+        self._play_moves = None
+        self._play_moves_key = None
+        self._attack_moves = None
+        self._attack_moves_key = None
+        self._target_cache = {}
+        self._target_cache_key = None
+
+    def state_hash(self, viewer=None):
+        """
+        Find a 64-bit Zobrist hash of the state of this game.  Two games in the same state have the same hash, in any
+        process, so the hash can be used to recognise positions which have been seen before.
+
+        The hash covers the player whose turn it is, and for each player their mana, hero, hero power, weapon, hand,
+        minions (cards, stats and tags), secrets, graveyard and the cards left in their deck.  It does not cover the
+        order that minions were played in, or how many turns have passed.
+
+        Each deck keeps its part of the hash up to date as cards are drawn, removed and put back, so the deck doesn't
+        have to be scanned.  In the same way, each player keeps a hash of each part of the rest of their state: their
+        hand, hero (with their weapon, effects and auras), minions, secrets and graveyard.  The lists of the player
+        tell them when they change, as do the methods which change their cards, minions, hero and weapon, so only the
+        parts which have changed are hashed again.  Code which changes one of those objects directly must call its
+        ``_hash_changed`` method.  Setting :attr:`verify_state_hash` to True checks every kept part against a hash of
+        the whole state each time.
+
+        :param hearthbreaker.engine.Player viewer: If given, the hash only covers what this player can see.  Instead of
+                                                   the cards in their opponent's hand and deck, it covers how many
+                                                   there are.
+        :rtype: int
+        """
+        state = self._board_hash()
+        for index, player in enumerate(self.players):
+            state ^= _rotate_hash(player.deck._hash, index)
+        if Game.verify_state_hash and state != self._compute_state_hash():
+            raise GameException("The kept state hash is out of date")
+        if viewer is not None:
+            index = 1 - self.players.index(viewer)
+            hidden = self.players[index]
+            state ^= hidden._cards_in_hand_hash(index) ^ _rotate_hash(hidden.deck._hash, index)
+            state ^= _zobrist(("hidden", index, len(hidden.hand), hidden.deck.left))
+        return state
+
+    def _compute_state_hash(self):
+        """
+        Work out :meth:`state_hash` from scratch, without any of the parts kept by the players and their decks.
+        """
+        state = _zobrist(("current", self.players.index(self.current_player)))
+        for index, player in enumerate(self.players):
+            state ^= player._compute_hash(index) ^ _rotate_hash(player.deck._compute_hash(), index)
+        return state
+
+    def _board_hash(self):
+        state = self._field_hash()
+        for index, player in enumerate(self.players):
+            state ^= player._hand_hash(index)
+        return state
+
+    def _field_hash(self):
+        state = _zobrist(("current", self.players.index(self.current_player)))
+        for index, player in enumerate(self.players):
+            state ^= player._field_hash(index)
+        return state
 
     def random_draw(self, cards, requirement):
         filtered_cards = [card for card in filter(requirement, cards)]
@@ -83,7 +442,7 @@ class Game(Bindable):
         return self._generate_random_between(minimum, maximum)
 
     def _generate_random_between(self, lowest, highest):
-        return random.randint(lowest, highest)
+        return self.random.randint(lowest, highest)
 
     def check_delayed(self):
         sorted_minions = sorted(self.delayed_minions, key=lambda m: m.born)
@@ -106,7 +465,7 @@ class Game(Bindable):
             if not card_keep_index[card_index]:
                 put_back_cards.append(p1_draw[card_index])
                 p1_draw[card_index] = self.players[0].deck.draw(self)
-        self.players[0].hand = p1_draw
+        self.players[0].hand[:] = p1_draw
         for card in put_back_cards:
             self.players[0].put_back(card)
         for card in self.players[0].hand:
@@ -119,7 +478,7 @@ class Game(Bindable):
             if not card_keep_index[card_index]:
                 put_back_cards.append(p2_draw[card_index])
                 p2_draw[card_index] = self.players[1].deck.draw(self)
-        self.players[1].hand = p2_draw
+        self.players[1].hand[:] = p2_draw
         for card in put_back_cards:
             self.players[1].put_back(card)
 
@@ -162,6 +521,7 @@ class Game(Bindable):
             secret.activate(self.other_player)
         for minion in self.current_player.minions:
             minion.attacks_performed = 0
+        self.current_player._hash_changed(_HASH_MINIONS)
         self.current_player.mana = self.current_player.max_mana - self.current_player.upcoming_overload
         self.current_player.current_overload = self.current_player.upcoming_overload
         self.current_player.upcoming_overload = 0
@@ -169,6 +529,7 @@ class Game(Bindable):
         self.current_player.dead_this_turn = []
         self.current_player.hero.power.used = False
         self.current_player.hero.attacks_performed = 0
+        self.current_player.hero._hash_changed()
         self.current_player.draw()
         self.current_player.trigger("turn_started", self.current_player)
         self._has_turn_ended = False
@@ -183,19 +544,21 @@ class Game(Bindable):
                 self.current_player.hero.attacks_performed < self.current_player.hero.attacks_allowed():
             self.current_player.hero.frozen = 0
             self.current_player.hero.buffs = \
-                [buff for buff in self.current_player.hero.buffs if not isinstance(buff, Frozen)]
+                [buff for buff in self.current_player.hero.buffs if not isinstance(buff.status, Frozen)]
+            self.current_player.hero._hash_changed()
 
         for minion in self.current_player.minions:
             if minion.attacks_performed < minion.attacks_allowed() and minion.frozen:
                 minion.frozen = False
-                minion.buffs = [buff for buff in minion.buffs if not isinstance(buff, Frozen)]
+                minion.buffs = [buff for buff in minion.buffs if not isinstance(buff.status, Frozen)]
             minion.exhausted = False
             minion.used_windfury = False
             minion.attacks_performed = 0
+        self.current_player._hash_changed(_HASH_MINIONS)
 
         for aura in copy.copy(self.current_player.object_auras):
             if aura.expires:
-                self.current_player.object_auras.remove(aura)
+                self.current_player._remove_object_aura(aura)
                 aura.unapply()
 
         for secret in self.other_player.secrets:
@@ -205,9 +568,19 @@ class Game(Bindable):
         self._has_turn_ended = True
 
     def copy(self):
-        copied_game = copy.copy(self)
+        copied_game = type(self).__new__(type(self))
+        copied_game.__dict__ = self.__dict__.copy()
         copied_game.events = {}
+        copied_game.random = copy.copy(self.random)
+        copied_game.delayed_minions = set(self.delayed_minions)
+        copied_game._legal_moves_checked = None
+        copied_game._play_moves = None
+        copied_game._play_moves_key = None
+        copied_game._attack_moves = None
+        copied_game._attack_moves_key = None
         copied_game._all_cards_played = []
+        copied_game._target_cache = {}
+        copied_game._target_cache_key = None
         copied_game.players = [player.copy(copied_game) for player in self.players]
         if self.current_player is self.players[0]:
             copied_game.current_player = copied_game.players[0]
@@ -238,6 +611,7 @@ class Game(Bindable):
             raise GameException("That card cannot be used")
         card_index = self.current_player.hand.index(card)
         self.current_player.hand.pop(card_index)
+        GameObject.invalidate_stats()
         self.current_player.mana -= card.mana_cost()
         self._all_cards_played.append(card)
         card.target = None
@@ -268,6 +642,115 @@ class Game(Bindable):
         # overload is applied regardless of counterspell, but after the card is played
         self.current_player.upcoming_overload += card.overload
 
+    def legal_moves(self):
+        """
+        Find every move the current player could make.  Targets, indices and options are resolved, so each move can be
+        passed straight to :meth:`apply_move`.  The ending of the turn is always included.
+
+        Choices which can only be made once a card is being played, such as the target of a battlecry or the option of
+        a choose one spell, are not part of the move, and are left to the player's agent.
+
+        The moves are remembered along with the state of this game they were found in, so an agent can ask for them as
+        often as it likes, and they are only worked out again once that state has changed.  The moves which attack
+        don't depend on the hands or mana of the players, so they are kept when only those have changed, such as
+        after playing The Coin.
+
+        :return: The moves the current player could make
+        :rtype: list[hearthbreaker.serialization.move.Move]
+        """
+        if self.game_ended:
+            return []
+        player = self.current_player
+        # Hashing the state takes a while, so it is skipped when nothing has happened in any game since the last call
+        checked = (hearthbreaker.game_objects._stat_epoch, player, player.mana)
+        if self._legal_moves_checked == checked:
+            return self._play_moves[0] + self._attack_moves + self._play_moves[1]
+        self._legal_moves_checked = checked
+        # The moves refer to characters and cards by their positions, so they suit any game in the same state
+        field = self._field_hash()
+        if self._attack_moves_key != field:
+            self._attack_moves = self._find_attack_moves(player)
+            self._attack_moves_key = field
+        state = (field, self.players[0]._hand_hash(0), self.players[1]._hand_hash(1))
+        if self._play_moves_key != state:
+            self._play_moves = (self._find_card_moves(player), self._find_power_moves(player) + [TurnEndMove()])
+            self._play_moves_key = state
+        return self._play_moves[0] + self._attack_moves + self._play_moves[1]
+
+    def _find_card_moves(self, player):
+        moves = []
+        for card_index, card in enumerate(player.hand):
+            if not card.can_use(player, self):
+                continue
+            if card.is_minion():
+                indices = range(0, len(player.minions) + 1)
+            else:
+                indices = [-1]
+            options = [None]
+            if card.is_minion() and card.choices:
+                options = [option for option, choice in enumerate(card.choices) if choice.card.can_choose(player)]
+            targets = [None]
+            if card.targetable and card.targets:
+                targets = card.targets
+            for option in options:
+                proxy = ProxyCard(card_index)
+                proxy.set_option(option)
+                for index in indices:
+                    for target in targets:
+                        moves.append(PlayMove(proxy, index, target))
+        return moves
+
+    def _find_attack_moves(self, player):
+        moves = []
+        attackers = [minion for minion in player.minions if minion.can_attack()]
+        if player.hero.can_attack():
+            attackers.append(player.hero)
+        if attackers:
+            # The same targets as in Character.attack, which are the same for every attacker
+            targets = [enemy for enemy in self.other_player.minions if enemy.can_be_attacked()]
+            taunts = [target for target in targets if target.taunt]
+            if taunts:
+                targets = taunts
+            else:
+                targets.append(self.other_player.hero)
+            for attacker in attackers:
+                for target in targets:
+                    moves.append(AttackMove(attacker, target))
+        return moves
+
+    def _find_power_moves(self, player):
+        power = player.hero.power
+        if not power.can_use():
+            return []
+        if power.targetable:
+            targets = hearthbreaker.targeting.find_spell_target(self, hearthbreaker.targeting.is_spell_targetable)
+            return [PowerMove(target) for target in targets]
+        return [PowerMove()]
+
+    def apply_move(self, move):
+        """
+        Make a move for the current player, such as one of those from :meth:`legal_moves`.
+
+        Ending the turn also starts the next player's turn, so that a whole game can be played out by applying moves.
+        An agent making moves from its :meth:`do_turn` should return rather than apply the end of its turn.
+
+        :param hearthbreaker.serialization.move.Move move: The move to make
+        """
+        if self.game_ended:
+            raise GameException("The game has ended")
+        if isinstance(move, TurnEndMove):
+            self._end_turn()
+            if not self.game_ended:
+                self._start_turn()
+            return
+        player = self.current_player
+        agent = player.agent
+        player.agent = _MoveAgent(agent)
+        try:
+            move.play(self)
+        finally:
+            player.agent = agent
+
     def __to_json__(self):
         if self.current_player == self.players[0]:
             active_player = 1
@@ -288,7 +771,15 @@ class Game(Bindable):
         new_game._turns_passed = d['turn_count']
         new_game.delayed_minions = set()
         new_game.game_ended = False
-        new_game.random_func = random.randint
+        new_game.seed = None
+        new_game.random = _SharedRandom()
+        new_game._legal_moves_checked = None
+        new_game._play_moves = None
+        new_game._play_moves_key = None
+        new_game._attack_moves = None
+        new_game._attack_moves_key = None
+        new_game._target_cache = {}
+        new_game._target_cache_key = None
         new_game.events = {}
         new_game.players = [Player.__from_json__(pd, new_game, None) for pd in d["players"]]
         new_game._has_turn_ended = False
@@ -308,7 +799,7 @@ class Game(Bindable):
             player.agent = agents[index]
             for effect_json in d['players'][index]['effects']:
                 player.add_effect(Effect.from_json(**effect_json))
-            player.player_auras = []
+            player.player_auras.clear()
             for aura_json in d['players'][index]['auras']:
                 player.add_aura(AuraUntil.from_json(**aura_json))
             player.hero.attach(player.hero, player)
@@ -326,6 +817,10 @@ class Game(Bindable):
 class Player(Bindable):
     def __init__(self, name, deck, agent, game):
         super().__init__()
+        #: The hash kept of each part of the state of this player, with the objects it was worked out from
+        self._hash_kept = {}
+        #: The position of this player in the game when :attr:`_hash_kept` was worked out
+        self._hash_index = None
         self.game = game
         self.hero = deck.hero.create_hero(self)
         self.hero.card = deck.hero
@@ -334,15 +829,16 @@ class Player(Bindable):
         self.max_mana = 0
         self.deck = deck
         self.spell_damage = 0
-        self.minions = []
-        self.graveyard = []
-        self.hand = []
-        self.object_auras = []
-        self.player_auras = []
+        self.minions = _HashedList(self, _HASH_MINIONS)
+        self.graveyard = _HashedList(self, _HASH_GRAVEYARD)
+        self.hand = _HashedList(self, _HASH_HAND)
+        self.object_auras = _HashedList(self, _HASH_HERO)
+        self.player_auras = _HashedList(self, _HASH_HERO)
+        self._aura_index = {}
         self.fatigue = 0
         self.agent = agent
-        self.effects = []
-        self.secrets = []
+        self.effects = _HashedList(self, _HASH_HERO)
+        self.secrets = _HashedList(self, _HASH_SECRETS)
         self.weapon = None
         self.spell_multiplier = 1
         self.heal_multiplier = 1
@@ -362,26 +858,25 @@ class Player(Bindable):
         copied_player = Player(self.name, self.deck.copy(), self.agent, new_game)
 
         copied_player.hero = self.hero.copy(copied_player)
-        copied_player.graveyard = copy.copy(self.graveyard)
-        copied_player.minions = [minion.copy(copied_player, new_game) for minion in self.minions]
-        copied_player.hand = [copy.copy(card) for card in self.hand]
+        copied_player.graveyard.extend(self.graveyard)
+        copied_player.minions.extend([minion.copy(copied_player, new_game) for minion in self.minions])
+        copied_player.hand.extend([card.copy() for card in self.hand])
         for card in copied_player.hand:
-            card._attached = False
             card.attach(card, copied_player)
         copied_player.spell_damage = self.spell_damage
         copied_player.mana = self.mana
         copied_player.max_mana = self.max_mana
         copied_player.upcoming_overload = self.upcoming_overload
         copied_player.current_overload = self.current_overload
-        copied_player.dead_this_turn = copy.copy(self.dead_this_turn)
+        copied_player.fatigue = self.fatigue
+        copied_player.dead_this_turn = list(self.dead_this_turn)
         if self.weapon:
             copied_player.weapon = self.weapon.copy(copied_player)
         for effect in self.effects:
             effect = copy.copy(effect)
             copied_player.add_effect(effect)
-        copied_player.secrets = []
         for secret in self.secrets:
-            new_secret = type(secret)()
+            new_secret = type(secret).create()
             new_secret.player = copied_player
             copied_player.secrets.append(new_secret)
         for aura in filter(lambda a: isinstance(a, AuraUntil), self.player_auras):
@@ -393,6 +888,12 @@ class Player(Bindable):
             aura.owner = copied_player.hero
             copied_player.add_aura(aura)
         copied_player.effect_count = dict()
+        # The copy is in the same state, so it can keep the hashes of the parts which are still up to date
+        copied_player._hash_index = self._hash_index
+        for part in list(self._hash_kept):
+            state = self._kept_hash(part)
+            if state is not None:
+                copied_player._keep_hash(part, state)
         return copied_player
 
     def draw(self):
@@ -429,6 +930,24 @@ class Player(Bindable):
         self.deck.put_back(card)
         self.trigger("card_put_back", card)
 
+    def redeal_hand(self):
+        """
+        Shuffle the cards in this player's hand which were drawn from their deck back into it, and deal new cards from
+        the deck in their places.  Cards which didn't come from the deck, such as The Coin, are kept.
+
+        This isn't something which happens in a game, so no events are triggered.  A search agent does it to the hand
+        of its opponent, so that it plays against the cards they could be holding, rather than the ones it can't see.
+        """
+        positions = []
+        for position, card in enumerate(self.hand):
+            if self.deck.return_drawn(card):
+                card.unattach()
+                positions.append(position)
+        for position in positions:
+            card = self.deck.draw(self.game)
+            self.hand[position] = card
+            card.attach(card, self)
+
     def discard(self):
         if len(self.hand) > 0:
             targets = self.hand
@@ -453,21 +972,218 @@ class Player(Bindable):
             self.player_auras.append(aura)
         else:
             self.object_auras.append(aura)
+            for stat_class, auras in self._aura_index.items():
+                if isinstance(aura.status, stat_class):
+                    auras.append(aura)
+            GameObject.invalidate_stats()
         if not aura.owner:
             aura.set_owner(self.hero)
         aura.apply()
 
     def remove_aura(self, aura):
         if isinstance(aura.selector, hearthbreaker.tags.selector.PlayerSelector):
-            self.player_auras = [au for au in filter(lambda a: a is not aura, self.player_auras)]
+            self.player_auras[:] = [au for au in filter(lambda a: a is not aura, self.player_auras)]
         else:
             for an_aura in self.object_auras:
                 if an_aura.eq(aura):
-                    self.object_auras.remove(an_aura)
+                    self._remove_object_aura(an_aura)
                     aura = an_aura
                     break
         aura.unapply()
 
+    def _remove_object_aura(self, aura):
+        def remove_from(auras):
+            for index in range(len(auras)):
+                if auras[index] is aura:
+                    del auras[index]
+                    return
+
+        remove_from(self.object_auras)
+        for stat_class, auras in self._aura_index.items():
+            if isinstance(aura.status, stat_class):
+                remove_from(auras)
+        GameObject.invalidate_stats()
+
+    def auras_for(self, stat_class):
+        """
+        Get the object auras belonging to this player whose status is a ``stat_class``, such as
+        :class:`hearthbreaker.tags.status.ChangeAttack`.  The auras are in the same order as :attr:`object_auras`.
+
+        The auras for each status class are bucketed the first time they are asked for, and the buckets are kept up to
+        date as auras are added and removed, so that stat calculations only need to look at auras which could apply.
+
+        :param type stat_class: The status class to find auras for
+        :rtype: list[hearthbreaker.tags.base.Aura]
+        """
+        if stat_class not in self._aura_index:
+            self._aura_index[stat_class] = [aura for aura in self.object_auras if isinstance(aura.status, stat_class)]
+        return self._aura_index[stat_class]
+
+    def _hash_changed(self, part):
+        """
+        Forget the hash kept of a part of the state of this player, so that it is worked out again the next time it
+        is needed.  This is called whenever something in the part changes: one of the lists of this player, or a card,
+        minion, hero or weapon of theirs.
+
+        :param int part: The part which changed, such as ``_HASH_MINIONS``
+        """
+        self._hash_kept.pop(part, None)
+
+    def _hash_appended(self, part):
+        # Cards are only ever added to the end of the graveyard, so the kept hash still covers the ones before them
+        if part != _HASH_GRAVEYARD:
+            self._hash_kept.pop(part, None)
+
+    def _hash_sources(self, part):
+        """
+        Find the objects which a part of the state of this player is hashed from.  The kept hash of the part is out
+        of date if any of them has been replaced.
+        """
+        if part == _HASH_HAND:
+            return (self.hand,)
+        if part == _HASH_HERO:
+            return (self.effects, self.player_auras, self.object_auras, self.hero, self.weapon, self.hero.power)
+        if part == _HASH_MINIONS:
+            return (self.minions,)
+        if part == _HASH_SECRETS:
+            return (self.secrets,)
+        return (self.graveyard,)
+
+    def _keep_hash(self, part, state):
+        """
+        Keep the hash of a part of the state of this player, as long as each of the lists it is hashed from tells
+        this player when it changes.  A list assigned by a card, for instance, might not, so the part is hashed each
+        time until the game is copied.
+        """
+        sources = self._hash_sources(part)
+        for source in sources:
+            if isinstance(source, list) and (type(source) is not _HashedList or source.owner is not self):
+                return
+        self._hash_kept[part] = (state, sources, len(self.graveyard))
+
+    def _kept_hash(self, part):
+        """
+        Get the hash kept of a part of the state of this player, or None if it is out of date.
+        """
+        kept = self._hash_kept.get(part)
+        if kept is None:
+            return None
+        state, sources, graveyard_size = kept
+        for source, kept_source in zip(self._hash_sources(part), sources):
+            if source is not kept_source:
+                return None
+        if part == _HASH_GRAVEYARD and graveyard_size != len(self.graveyard):
+            for position in range(graveyard_size, len(self.graveyard)):
+                state ^= _zobrist(("graveyard", self._hash_index, position, self.graveyard[position]))
+            self._hash_kept[part] = (state, sources, len(self.graveyard))
+        return state
+
+    def _part_hash(self, index, part):
+        """
+        Get the hash of a part of the state of this player, working it out again only if the part has changed since
+        it was kept.
+
+        :param int index: The position of this player in the game
+        :param int part: The part to hash, such as ``_HASH_MINIONS``
+        :rtype: int
+        """
+        if index != self._hash_index:
+            self._hash_kept = {}
+            self._hash_index = index
+        state = self._kept_hash(part)
+        if state is None:
+            state, changeable = self._compute_part_hash(index, part)
+            if not changeable:
+                self._keep_hash(part, state)
+        return state
+
+    def _compute_part_hash(self, index, part):
+        """
+        Hash a part of the state of this player from scratch.
+
+        :return: The hash, and whether the part can change without this player being told, so that the hash can't be
+                 kept
+        :rtype: (int, bool)
+        """
+        state = 0
+        changeable = False
+        if part == _HASH_HAND:
+            for position, card in enumerate(self.hand):
+                state ^= _zobrist(("hand", index, position, card.name))
+                state ^= _tags_hash(("hand", index, position), card, "effects", "auras", "buffs")
+                changeable = changeable or _tags_changeable(card, "effects", "auras", "buffs")
+
+        elif part == _HASH_HERO:
+            state = _tags_hash(("player", index), self, "effects")
+            changeable = _tags_changeable(self, "effects")
+            auras = [aura for aura in self.player_auras + self.object_auras if isinstance(aura, AuraUntil)]
+            if auras:
+                state ^= _zobrist((("player", index), "auras", tuple(aura.key() for aura in auras)))
+                changeable = changeable or any("_key" not in aura.__dict__ for aura in auras)
+
+            hero = self.hero
+            state ^= _zobrist(("hero", index, hero.card and hero.card.name, hero.health, hero.armor, hero.base_attack,
+                               hero.attacks_performed, hero.frozen, hero.immune, hero.used_windfury,
+                               type(hero.power).__name__, hero.power.used))
+            state ^= _tags_hash(("hero", index), hero, "effects", "auras", "buffs")
+            changeable = changeable or _tags_changeable(hero, "effects", "auras", "buffs")
+
+            if self.weapon:
+                weapon = self.weapon
+                state ^= _zobrist(("weapon", index, weapon.card and weapon.card.name, weapon.base_attack,
+                                   weapon.durability))
+                state ^= _tags_hash(("weapon", index), weapon, "effects", "auras", "buffs")
+                changeable = changeable or _tags_changeable(weapon, "effects", "auras", "buffs")
+
+        elif part == _HASH_MINIONS:
+            for position, minion in enumerate(self.minions):
+                state ^= _zobrist(("minion", index, position, minion.card.name, minion.base_attack,
+                                   minion.base_health, minion.health, minion.exhausted, minion.attacks_performed,
+                                   minion.frozen))
+                state ^= _tags_hash(("minion", index, position), minion, "effects", "auras", "buffs", "deathrattle",
+                                    "enrage")
+                changeable = changeable or _tags_changeable(minion, "effects", "auras", "buffs", "deathrattle",
+                                                            "enrage")
+
+        elif part == _HASH_SECRETS:
+            for position, secret in enumerate(self.secrets):
+                state ^= _zobrist(("secret", index, position, secret.name))
+
+        elif part == _HASH_GRAVEYARD:
+            for position, name in enumerate(self.graveyard):
+                state ^= _zobrist(("graveyard", index, position, name))
+        return state, changeable
+
+    def _compute_hash(self, index):
+        """
+        Hash the state of this player apart from their deck from scratch, ignoring the kept parts.
+        """
+        state = self._mana_hash(index)
+        for part in _HASH_PARTS:
+            state ^= self._compute_part_hash(index, part)[0]
+        return state
+
+    def _mana_hash(self, index):
+        # The mana of a player is quicker to hash than to keep track of
+        return _zobrist(("mana", index, self.mana, self.max_mana, self.current_overload, self.upcoming_overload,
+                         self.fatigue))
+
+    def _hand_hash(self, index):
+        """
+        Hash the part of this player's state which only matters for the cards they can play: their mana and hand.
+        """
+        return self._mana_hash(index) ^ self._part_hash(index, _HASH_HAND)
+
+    def _cards_in_hand_hash(self, index):
+        return self._part_hash(index, _HASH_HAND)
+
+    def _field_hash(self, index):
+        """
+        Hash the rest of this player's state, apart from their deck.
+        """
+        state = self._part_hash(index, _HASH_HERO) ^ self._part_hash(index, _HASH_MINIONS)
+        return state ^ self._part_hash(index, _HASH_SECRETS) ^ self._part_hash(index, _HASH_GRAVEYARD)
+
     def choose_target(self, targets):
         return self.agent.choose_target(targets)
 
@@ -494,6 +1210,7 @@ class Player(Bindable):
             'max_mana': self.max_mana,
             'current_overload': self.current_overload,
             'upcoming_overload': self.upcoming_overload,
+            'fatigue': self.fatigue,
             'name': self.name,
         }
 
@@ -512,22 +1229,20 @@ class Player(Bindable):
         player.max_mana = pd["max_mana"]
         player.upcoming_overload = pd['upcoming_overload']
         player.current_overload = pd['current_overload']
+        player.fatigue = pd.get('fatigue', 0)
         player.name = pd['name']
-        player.hand = []
         for card_def in pd['hand']:
             card = card_lookup(card_def['name'])
             card.__from_json__(card, **card_def)
             card.attach(card, player)
             player.hand.append(card)
-        player.graveyard = pd["graveyard"]
+        player.graveyard.extend(pd["graveyard"])
 
-        player.secrets = []
         for secret_name in pd["secrets"]:
             secret = card_lookup(secret_name)
             secret.player = player
             player.secrets.append(secret)
         i = 0
-        player.minions = []
         for md in pd["minions"]:
             minion = Minion.__from_json__(md, player, game)
             minion.index = i
@@ -537,6 +1252,17 @@ class Player(Bindable):
 
 
 class Deck:
+    """
+    The cards a player has yet to draw.
+
+    Alongside the list of cards, the deck keeps a compact index of the positions of the cards which have not yet been
+    drawn, in deck order.  Drawing, removing and putting back cards updates this index in place, rather than scanning
+    every card for its ``drawn`` flag.  Drawing still chooses the n-th undrawn card for a random n, so that the random
+    numbers consumed (and stored in replays) are the same as choosing from a list of the undrawn cards.
+
+    A copy of a deck shares its undrawn cards with the original.  A shared card is only copied when one of the decks
+    hands it out, by drawing it or returning it from :meth:`undrawn_cards`.
+    """
     def __init__(self, cards, hero):
         if len(cards) != 30:
             raise GameException("Deck must have exactly 30 cards in it")
@@ -545,49 +1271,154 @@ class Deck:
         for card in cards:
             card.drawn = False
         self.left = 30
+        self._index_cards()
+
+    def _index_cards(self):
+        """
+        Rebuild the index of undrawn cards from the ``drawn`` flag of each card.
+        """
+        self._positions = {}
+        for position, card in enumerate(self.cards):
+            if card not in self._positions:
+                self._positions[card] = position
+        self._undrawn = [position for position, card in enumerate(self.cards) if not card.drawn]
+        self._shared = set()
+        self._hash = self._compute_hash()
+
+    def _card_hash(self, position):
+        return _zobrist(("deck", position, self.cards[position].name))
+
+    def _compute_hash(self):
+        """
+        Work out this deck's part of :meth:`Game.state_hash` from the cards which are still in it.  The deck keeps
+        this up to date as cards are drawn, removed and put back.
+        """
+        state = 0
+        for position in self._undrawn:
+            state ^= self._card_hash(position)
+        return state
+
+    def _own(self, position):
+        """
+        Make sure that the card at the given position is not shared with any other deck, copying it if it is.
+        """
+        card = self.cards[position]
+        if position in self._shared:
+            self._shared.discard(position)
+            if self._positions.get(card) == position:
+                del self._positions[card]
+            card = card.copy()
+            card.drawn = False
+            self.cards[position] = card
+            self._positions[card] = position
+        return card
 
     def copy(self):
-        def copy_card(card):
-            new_card = type(card)()
-            new_card.drawn = card.drawn
-            return new_card
         new_deck = Deck.__new__(Deck)
-        new_deck.cards = [copy_card(card) for card in self.cards]
+        new_deck.cards = list(self.cards)
         new_deck.hero = self.hero
         new_deck.left = self.left
+        new_deck._positions = dict(self._positions)
+        new_deck._undrawn = list(self._undrawn)
+        new_deck._hash = self._hash
+        self._share_undrawn()
+        new_deck._shared = set(self._undrawn)
         return new_deck
 
+    def _share_undrawn(self):
+        """
+        Mark every card still in this deck as shared, so that the deck copies a card before changing or handing it
+        out.  This is done when the deck is copied.
+        """
+        self._shared.update(self._undrawn)
+
     def can_draw(self):
         return self.left > 0
 
+    def undrawn_cards(self):
+        """
+        Get the cards which are still in the deck, in deck order
+
+        :rtype: list[hearthbreaker.cards.base.Card]
+        """
+        return [self._own(position) for position in self._undrawn]
+
     def draw(self, game):
         if not self.can_draw():
             raise GameException("Cannot draw more than 30 cards")
-        card = game.random_draw(self.cards, lambda c: not c.drawn)
+        position = self._undrawn.pop(game._generate_random_between(0, len(self._undrawn) - 1))
+        card = self._own(position)
         card.drawn = True
         self.left -= 1
+        self._hash ^= self._card_hash(position)
         return card
 
+    def remove(self, card):
+        """
+        Take a particular card out of the deck without drawing it, such as when it is discarded or destroyed.
+
+        :param hearthbreaker.cards.base.Card card: The card to remove, which must still be in the deck
+        """
+        position = self._positions.get(card)
+        if position is None or card.drawn:
+            raise GameException("Tried to remove a card that isn't in the deck")
+        del self._undrawn[bisect.bisect_left(self._undrawn, position)]
+        self._own(position).drawn = True
+        self.left -= 1
+        self._hash ^= self._card_hash(position)
+
     def put_back(self, card):
         if not card:
             raise TypeError("Expected a card, not None")
-        for deck_card in self.cards:
-            if deck_card == card:
-                if not card.drawn:
-                    raise GameException("Tried to put back a card that hadn't been used yet")
-                deck_card.drawn = False
-                self.left += 1
-                return
+        position = self._positions.get(card)
+        if position is not None:
+            if not card.drawn:
+                raise GameException("Tried to put back a card that hadn't been used yet")
+            card.drawn = False
+            bisect.insort(self._undrawn, position)
+            self.left += 1
+            self._hash ^= self._card_hash(position)
+            return
         card.drawn = False
+        self._positions[card] = len(self.cards)
+        self._undrawn.append(len(self.cards))
         self.cards.append(card)
         self.left += 1
+        self._hash ^= self._card_hash(len(self.cards) - 1)
+
+    def return_drawn(self, card):
+        """
+        Shuffle a card which was drawn from this deck back into it, as a new copy of the card.  The deck can't tell
+        apart cards with the same name, so any which has been drawn can stand for it.
+
+        :param hearthbreaker.cards.base.Card card: The card to put back.  It is left as it is.
+        :return: True if the card was put back, or False if no card with its name has been drawn from this deck, as
+                 for The Coin, or a card which was made during the game
+        :rtype: bool
+        """
+        undrawn = set(self._undrawn)
+        for position, drawn in enumerate(self.cards):
+            if position not in undrawn and drawn.name == card.name:
+                if self._positions.get(drawn) == position:
+                    del self._positions[drawn]
+                new_card = type(drawn).create()
+                new_card.drawn = False
+                self.cards[position] = new_card
+                self._positions[new_card] = position
+                self._shared.discard(position)
+                bisect.insort(self._undrawn, position)
+                self.left += 1
+                self._hash ^= self._card_hash(position)
+                return True
+        return False
 
     def __to_json__(self):
+        undrawn = set(self._undrawn)
         card_list = []
-        for card in self.cards:
+        for position, card in enumerate(self.cards):
             card_list.append({
                 'name': card.name,
-                'used': card.drawn
+                'used': position not in undrawn
             })
         return card_list
 
@@ -608,7 +1439,8 @@ class Deck:
         deck.used = used
         deck.left = left
         deck.hero = hero
+        deck._index_cards()
         return deck
 
 
-__create_card_table()
+__find_card_classes()
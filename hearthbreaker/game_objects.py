@@ -3,13 +3,25 @@ import copy
 from functools import reduce
 import hearthbreaker.constants
 
-from hearthbreaker.tags.base import Aura, AuraUntil, Effect, Buff, BuffUntil, Deathrattle
+from hearthbreaker.tags.base import Aura, AuraUntil, Effect, Buff, BuffUntil, Deathrattle, copy_tags
 from hearthbreaker.tags.event import TurnEnded
 from hearthbreaker.tags.selector import CurrentPlayer
 from hearthbreaker.tags.status import Stealth, ChangeAttack, ChangeHealth, SetAttack, Charge, Taunt, DivineShield, \
     Windfury, NoSpellTarget, SpellDamage, MinimumHealth, CanAttack
 import hearthbreaker.targeting
 
+# Incremented each time the game state changes in a way which could make a cached stat out of date
+_stat_epoch = 0
+
+# The parts of the state of a player which :meth:`Game.state_hash <hearthbreaker.engine.Game.state_hash>` keeps a hash
+# of.  A change to the state only means the part it is in is hashed again.
+_HASH_HAND = 1
+_HASH_HERO = 2
+_HASH_MINIONS = 3
+_HASH_SECRETS = 4
+_HASH_GRAVEYARD = 5
+_HASH_PARTS = (_HASH_HAND, _HASH_HERO, _HASH_MINIONS, _HASH_SECRETS, _HASH_GRAVEYARD)
+
 
 class GameException(Exception):
     """
@@ -70,6 +82,9 @@ class Bindable:
        # outputs nothing
        target.trigger("joke_told", "What a senseless waste of human life")
 
+    The handlers for each event are kept in a tuple, in the order they were bound.  Binding or unbinding a function
+    replaces the tuple, so a trigger can call the handlers which were bound when it started without copying them.
+
     Any class which subclasses this class must be sure to call :meth:`__init__`
     """
 
@@ -89,10 +104,7 @@ class Bindable:
         :see: :class:`Bindable`
         """
 
-        if event not in self.events:
-            self.events[event] = []
-
-        self.events[event].append((function, False))
+        self.events[event] = self.events.get(event, ()) + ((function, False),)
 
     def bind_once(self, event, function):
         """
@@ -105,10 +117,7 @@ class Bindable:
         :see: :class:`Bindable`
         """
 
-        if event not in self.events:
-            self.events[event] = []
-
-        self.events[event].append((function, True))
+        self.events[event] = self.events.get(event, ()) + ((function, True),)
 
     def trigger(self, event, *args):
         """
@@ -120,14 +129,26 @@ class Bindable:
         :param list args: The arguments to pass to the bound function
         :see: :class:`Bindable`
         """
-        if event in self.events:
-            for handler in copy.copy(self.events[event]):
+        GameObject.invalidate_stats()
+        handlers = self.events.get(event)
+        if handlers:
+            # Binding and unbinding replace the tuple rather than changing it, so it can be looped over as it is
+            for handler in handlers:
                 if handler[1]:
-                    self.events[event].remove(handler)
-                    # tidy up the events dict so we don't have entries for events with no handlers
-                    if len(self.events[event]) is 0:
-                        del(self.events[event])
+                    self._remove_handler(event, handler)
                 handler[0](*args)
+            GameObject.invalidate_stats()
+
+    def _remove_handler(self, event, handler):
+        handlers = self.events.get(event, ())
+        if handler in handlers:
+            index = handlers.index(handler)
+            handlers = handlers[:index] + handlers[index + 1:]
+            # tidy up the events dict so we don't have entries for events with no handlers
+            if handlers:
+                self.events[event] = handlers
+            else:
+                del self.events[event]
 
     def unbind(self, event, function):
         """
@@ -138,17 +159,32 @@ class Bindable:
         :param string event: The event to unbind the function from
         :param function function: The function to unbind.
         """
-        if event in self.events:
-            self.events[event] = [handler for handler in self.events[event] if not handler[0] == function]
-            if len(self.events[event]) is 0:
-                del (self.events[event])
+        handlers = self.events.get(event)
+        if handlers:
+            remaining = tuple(handler for handler in handlers if not handler[0] == function)
+            if not remaining:
+                del self.events[event]
+            elif len(remaining) != len(handlers):
+                self.events[event] = remaining
 
 
 class GameObject:
     """
     Provides typing for the various game objects in the engine.  Allows for checking the type of an object without
     needing to know about and import the various objects in the game engine
+
+    The stats worked out by :meth:`calculate_stat` are cached on each object until the next time
+    :meth:`invalidate_stats` is called, which happens whenever an event is triggered, or a buff, aura or minion is
+    added or removed.  Setting :attr:`verify_stat_cache` to True checks every cached value against a full
+    recalculation, and raises a :class:`GameException` if they differ.
     """
+
+    #: If True, every stat read from the cache is checked against a full recalculation
+    verify_stat_cache = False
+
+    #: The part of its player's hash which this object is hashed in, or 0 if it isn't hashed
+    _hash_part = 0
+
     def __init__(self, effects=None, auras=None, buffs=None):
         # A list of the effects that this player has
         if effects:
@@ -168,6 +204,50 @@ class GameObject:
         #: The player associated with this Game Object
         self.player = None
         self._attached = False
+        self._stat_cache = {}
+        self._stat_cache_epoch = _stat_epoch
+
+    def _hash_changed(self):
+        """
+        Tell the player this object belongs to that the part of their state hash it is in has changed.  This must be
+        called whenever anything about this object which is hashed is changed, other than through the methods of this
+        class which add and remove tags.
+        """
+        player = self.player
+        if player is not None and self._hash_part:
+            player._hash_changed(self._hash_part)
+
+    @staticmethod
+    def invalidate_stats():
+        """
+        Mark the cached stats of every :class:`GameObject` as out of date.  Anything which changes the game state in a
+        way that could affect a stat without triggering an event should call this.
+        """
+        # Kept at module level, since changing a class attribute would slow down every attribute lookup on the class
+        global _stat_epoch
+        _stat_epoch += 1
+
+    def cached_stat(self, key, calculate, *args):
+        """
+        Look up a stat in this object's cache, calculating it if the game has changed since it was last worked out.
+
+        :param key: A hashable key identifying the stat and any starting value it depends on
+        :param function calculate: The function which calculates the stat from ``args``
+        :param list args: The arguments to pass to ``calculate``
+        """
+        if self._stat_cache_epoch != _stat_epoch:
+            self._stat_cache = {}
+            self._stat_cache_epoch = _stat_epoch
+        elif key in self._stat_cache:
+            value = self._stat_cache[key]
+            if GameObject.verify_stat_cache:
+                actual = calculate(*args)
+                if actual != value:
+                    raise GameException("Stale stat {0}: cached {1}, but is {2}".format(key, value, actual))
+            return value
+        value = calculate(*args)
+        self._stat_cache[key] = value
+        return value
 
     def attach(self, obj, player):
         if not self._attached:
@@ -182,12 +262,15 @@ class GameObject:
                 aura.set_owner(obj)
                 player.add_aura(aura)
             self._attached = True
+            GameObject.invalidate_stats()
 
     def calculate_stat(self, stat_class, starting_value=0):
         """
         Calculates the amount of a particular stat this :class:`GameObject` has at current time.
         """
+        return self.cached_stat((stat_class, starting_value), self._calculate_stat, stat_class, starting_value)
 
+    def _calculate_stat(self, stat_class, starting_value):
         # Add together all the attack amounts from buffs
         stat = reduce(lambda a, b: b.update(self, a), [buff.status for buff in self.buffs
                                                        if isinstance(buff.status, stat_class) and
@@ -195,8 +278,8 @@ class GameObject:
                       starting_value)
         stat = reduce(lambda a, b: b.update(self, a), [aura.status
                                                        for player in self.player.game.players
-                                                       for aura in player.object_auras
-                                                       if aura.match(self) and isinstance(aura.status, stat_class)],
+                                                       for aura in player.auras_for(stat_class)
+                                                       if aura.match(self)],
                       stat)
 
         return max(0, stat)
@@ -309,11 +392,13 @@ class GameObject:
         effect.set_owner(self)
         effect.apply()
         self.effects.append(effect)
+        self._hash_changed()
 
     def add_aura(self, aura):
         if not isinstance(aura, Aura):
             raise TypeError("Expected an aura to be added")
         self.auras.append(aura)
+        self._hash_changed()
         aura.set_owner(self)
         self.player.add_aura(aura)
 
@@ -321,6 +406,7 @@ class GameObject:
         for an_aura in self.auras:
             if an_aura.eq(aura):
                 self.auras.remove(an_aura)
+                self._hash_changed()
                 break
         self.player.remove_aura(aura)
 
@@ -328,15 +414,19 @@ class GameObject:
         if not isinstance(buff, Buff):
             raise TypeError("Expected a buff to be added")
         self.buffs.append(buff)
+        self._hash_changed()
         buff.set_owner(self)
         buff.apply()
+        GameObject.invalidate_stats()
 
     def remove_buff(self, buff):
         for a_buff in self.buffs:
             if a_buff.eq(buff):
                 self.buffs.remove(a_buff)
+                self._hash_changed()
                 break
         buff.unapply()
+        GameObject.invalidate_stats()
 
     def unattach(self):
         if self._attached:
@@ -349,7 +439,9 @@ class GameObject:
             for buff in reversed(self.buffs):
                 buff.unapply()
             self.buffs = []
+            self._hash_changed()
             self._attached = False
+            GameObject.invalidate_stats()
 
 
 class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
@@ -413,6 +505,8 @@ class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
                 if isinstance(buff.status, Stealth):
                     buff.unapply()
             self.buffs = [buff for buff in self.buffs if not isinstance(buff.status, Stealth)]
+            self._hash_changed()
+            GameObject.invalidate_stats()
 
     def attack(self):
         """
@@ -461,6 +555,7 @@ class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
         self.player.game.check_delayed()
         self.trigger("attack_completed")
         self.attacks_performed += 1
+        self._hash_changed()
         self.stealth = False
         self.current_target = None
 
@@ -565,6 +660,7 @@ class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
             min_health = self.calculate_stat(MinimumHealth, 0)
             if self.health < min_health:
                 self.health = min_health
+            self._hash_changed()
             self.trigger("damaged", amount, attacker)
             self.player.trigger("character_damaged", self, attacker, amount)
             if self.health <= 0:
@@ -628,6 +724,8 @@ class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
         :param new_attack: An integer specifying what this character's new attack should be
         """
         self.buffs.append(Buff(SetAttack(new_attack)))
+        self._hash_changed()
+        GameObject.invalidate_stats()
 
     def set_health_to(self, new_health):
         """
@@ -638,14 +736,15 @@ class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
         diff = new_health - (self.base_health + self.health_delta)
 
         for player in self.game.players:
-            for aura in player.object_auras:
-                if aura.match(self) and isinstance(aura.status, ChangeHealth):
+            for aura in player.auras_for(ChangeHealth):
+                if aura.match(self):
                     diff += aura.status.amount
         if diff > 0:
             self.increase_health(diff)
         elif diff < 0:
             self.decrease_health(-diff)
         self.health = self.calculate_max_health()
+        self._hash_changed()
         if was_enraged:
             self._do_unenrage()
             self.trigger('unenraged')
@@ -668,6 +767,7 @@ class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
             self.health += amount
             if self.health > self.calculate_max_health():
                 self.health = self.calculate_max_health()
+            self._hash_changed()
             if self.enraged and self.health == self.calculate_max_health():
                 self.enraged = False
                 self.trigger("unenraged")
@@ -693,8 +793,10 @@ class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
         self.auras = []
         self.buffs = []
         self.enrage = []
+        GameObject.invalidate_stats()
         if self.calculate_max_health() < self.health or health_full:
             self.health = self.calculate_max_health()
+        self._hash_changed()
         self.trigger("silenced")
 
     def die(self, by):
@@ -706,6 +808,7 @@ class Character(Bindable, GameObject, metaclass=abc.ABCMeta):
         """
         self.delayed_trigger("died", by)
         self.dead = True
+        GameObject.invalidate_stats()
 
     def can_attack(self):
         """
@@ -745,6 +848,7 @@ class Weapon(Bindable, GameObject):
     Represents a Hearthstone weapon.  All weapons have attack power and durability.  The logic for handling the
     attacks is handled by :class:`Hero`, but it can be modified through the use of events.
     """
+    _hash_part = _HASH_HERO
 
     def __init__(self, attack_power, durability, deathrattle=None,
                  effects=None, auras=None, buffs=None):
@@ -771,8 +875,10 @@ class Weapon(Bindable, GameObject):
 
     def copy(self, new_owner):
         new_weapon = Weapon(self.base_attack, self.durability, copy.deepcopy(self.deathrattle),
-                            copy.deepcopy(self.effects), copy.deepcopy(self.auras), copy.deepcopy(self.buffs))
+                            copy_tags(self.effects), copy_tags(self.auras), copy_tags(self.buffs))
         new_weapon.player = new_owner
+        if self.card:
+            new_weapon.card = type(self.card).create()
         return new_weapon
 
     def destroy(self):
@@ -826,6 +932,8 @@ class Weapon(Bindable, GameObject):
 
 
 class Minion(Character):
+    _hash_part = _HASH_MINIONS
+
     def __init__(self, attack, health,
                  deathrattle=None, taunt=False, charge=False, spell_damage=0, divine_shield=False, stealth=False,
                  windfury=False, spell_targetable=True, effects=None, auras=None, buffs=None,
@@ -861,31 +969,50 @@ class Minion(Character):
         if spell_damage:
             self.buffs.append(Buff(SpellDamage(spell_damage)))
 
+    def add_deathrattle(self, deathrattle):
+        """
+        Give this minion another deathrattle, on top of any it already has
+
+        :param hearthbreaker.tags.base.Deathrattle deathrattle: The deathrattle to add
+        """
+        self.deathrattle.append(deathrattle)
+        self._hash_changed()
+
     def add_to_board(self, index):
+        # Only the auras which depend on the board need to be checked against every minion.  The rest can only come to
+        # match this minion, so their set is left as None.
         aura_affects = {}
         for player in self.game.players:
             for aura in player.object_auras:
-                aura_affects[aura] = set()
-                for minion in self.player.minions:
-                    if aura.match(minion):
-                        aura_affects[aura].add(minion)
+                if aura.board_independent:
+                    aura_affects[aura] = None
+                else:
+                    aura_affects[aura] = set(minion for minion in self.player.minions if aura.match(minion))
         self.game.minion_counter += 1
         self.player.minions.insert(index, self)
         self.born = self.game.minion_counter
         for minion in self.player.minions[index + 1:]:
             minion.index += 1
         self.index = index
+        GameObject.invalidate_stats()
         self.health += self.calculate_max_health() - self.base_health - self.health_delta
+        self._hash_changed()
         self.attach(self, self.player)
         for player in self.game.players:
             for aura in player.object_auras:
+                if aura not in aura_affects:
+                    continue
+                affected = aura_affects[aura]
+                if affected is None:
+                    if aura.match(self):
+                        aura.status.act(aura.owner, self)
+                    continue
                 for minion in self.player.minions:
-                    if aura in aura_affects:
-                        is_in = minion in aura_affects[aura]
-                        if not is_in and aura.match(minion):
-                            aura.status.act(aura.owner, minion)
-                        elif is_in and not aura.match(minion):
-                            aura.status.unact(aura.owner, minion)
+                    is_in = minion in affected
+                    if not is_in and aura.match(minion):
+                        aura.status.act(aura.owner, minion)
+                    elif is_in and not aura.match(minion):
+                        aura.status.unact(aura.owner, minion)
         self.trigger("added_to_board", self, index)
 
     def calculate_attack(self):
@@ -908,19 +1035,21 @@ class Minion(Character):
 
     def remove_from_board(self):
         if not self.removed:
+            # The auras which don't depend on the board can't change which of the remaining minions they match
             aura_affects = {}
             for aura in self.player.object_auras:
-                aura_affects[aura] = set()
-                for minion in self.player.minions:
-                    if aura.match(minion):
-                        aura_affects[aura].add(minion)
+                if not aura.board_independent:
+                    aura_affects[aura] = set(minion for minion in self.player.minions if aura.match(minion))
             for minion in self.player.minions:
                 if minion.index > self.index:
                     minion.index -= 1
             self.player.minions.remove(self)
+            GameObject.invalidate_stats()
             self.player.trigger("minion_removed", self)
             self.removed = True
             for aura in self.player.object_auras:
+                if aura not in aura_affects:
+                    continue
                 for minion in self.player.minions:
                     is_in = minion in aura_affects[aura]
                     if not is_in and aura.match(minion):
@@ -944,11 +1073,13 @@ class Minion(Character):
         if self.index >= len(self.player.minions):
             raise ValueError("Attempting to replace minion with invalid index")
         self.player.minions[self.index] = new_minion
+        GameObject.invalidate_stats()
         new_minion.attach(new_minion, self.player)
         for aura in self.player.object_auras:
             if aura.match(new_minion):
                 aura.status.act(self, new_minion)
         new_minion.health += new_minion.calculate_max_health() - new_minion.base_health
+        new_minion._hash_changed()
         self.removed = True
         self.replaced_by = new_minion
 
@@ -958,7 +1089,9 @@ class Minion(Character):
     def damage(self, amount, attacker):
         if self.divine_shield:
             self.buffs = [buff for buff in self.buffs if not isinstance(buff.status, DivineShield)]
+            self._hash_changed()
             self.divine_shield = 0
+            GameObject.invalidate_stats()
         else:
             super().damage(amount, attacker)
 
@@ -992,6 +1125,7 @@ class Minion(Character):
         super().silence()
         self.battlecry = None
         self.deathrattle = []
+        self._hash_changed()
 
     def can_attack(self):
         return (self.charge() or not self.exhausted) and super().can_attack()
@@ -1010,12 +1144,21 @@ class Minion(Character):
         return "({0}) ({1}) {2} at index {3}".format(self.calculate_attack(), self.health, self.card.name, self.index)
 
     def copy(self, new_owner, new_game=None):
-        new_minion = Minion(self.base_attack, self.base_health,
-                            effects=copy.deepcopy(self.effects),
-                            auras=copy.deepcopy(self.auras),
-                            buffs=copy.deepcopy(self.buffs),
-                            deathrattle=copy.deepcopy(self.deathrattle),
-                            enrage=copy.deepcopy(self.enrage))
+        # Rather than going through the constructor, the copy starts from the attributes every new minion has, and is
+        # given its own lists and dicts.  Most minions have few tags, so only the lists which have any are copied.
+        new_minion = Minion.__new__(Minion)
+        contents = new_minion.__dict__ = _new_minion_attributes.copy()
+        contents["events"] = {}
+        contents["delayed"] = []
+        contents["_stat_cache"] = {}
+        contents["_stat_cache_epoch"] = _stat_epoch
+        contents["effects"] = copy_tags(self.effects) if self.effects else []
+        contents["auras"] = copy_tags(self.auras) if self.auras else []
+        contents["buffs"] = copy_tags(self.buffs) if self.buffs else []
+        contents["deathrattle"] = copy_tags(self.deathrattle) if self.deathrattle else []
+        contents["enrage"] = copy_tags(self.enrage) if self.enrage else []
+        contents["base_attack"] = self.base_attack
+        contents["base_health"] = self.base_health
         new_minion.health = self.base_health - (self.calculate_max_health() - self.health)
         new_minion.enraged = self.enraged
         new_minion.immune = self.immune
@@ -1023,8 +1166,7 @@ class Minion(Character):
         new_minion.attacks_performed = self.attacks_performed
         new_minion.exhausted = self.exhausted
         new_minion.born = self.born
-        card_type = type(self.card)
-        new_minion.card = card_type()
+        new_minion.card = type(self.card).create()
         new_minion.player = new_owner
         if new_game:
             new_minion.game = new_game
@@ -1081,7 +1223,14 @@ class Minion(Character):
         return r_val
 
 
+# The attributes of a minion which has just been created, which :meth:`Minion.copy` starts from.  Each of the lists
+# and dicts among them must be replaced by the copy, so that it isn't shared.
+_new_minion_attributes = Minion(0, 0).__dict__
+
+
 class Hero(Character):
+    _hash_part = _HASH_HERO
+
     def __init__(self, health, character_class, power, player):
         super().__init__(0, health)
         self.armor = 0
@@ -1107,16 +1256,19 @@ class Hero(Character):
         return super().calculate_stat(stat_class, starting_value)
 
     def copy(self, new_owner):
-        new_hero = Hero(self.base_health, self.character_class, self.power, new_owner)
+        new_hero = Hero(self.base_health, self.character_class, copy.copy(self.power), new_owner)
         new_hero.health = self.health
         new_hero.armor = self.armor
         new_hero.used_windfury = False
         new_hero.attacks_performed = self.attacks_performed
 
-        new_hero.effects = copy.deepcopy(self.effects)
-        new_hero.auras = copy.deepcopy(self.auras)
-        new_hero.buffs = copy.deepcopy(self.buffs)
-        new_hero.card = type(self.card)()
+        if self.effects:
+            new_hero.effects = copy_tags(self.effects)
+        if self.auras:
+            new_hero.auras = copy_tags(self.auras)
+        if self.buffs:
+            new_hero.buffs = copy_tags(self.buffs)
+        new_hero.card = type(self.card).create()
 
         return new_hero
 
@@ -1124,11 +1276,13 @@ class Hero(Character):
         super().attack()
         if self.player.weapon is not None:
             self.player.weapon.durability -= 1
+            self.player.weapon._hash_changed()
             if self.player.weapon.durability == 0:
                 self.player.weapon.destroy()
 
     def damage(self, amount, attacker):
         self.armor -= amount
+        self._hash_changed()
         if self.armor < 0:
             new_amount = -self.armor
             self.armor = 0
@@ -1139,13 +1293,15 @@ class Hero(Character):
     def increase_armor(self, amount):
         self.player.trigger("armor_increased", amount)
         self.armor += amount
+        self._hash_changed()
 
     def die(self, by):
         super().die(by)
         self.player.game.game_over()
 
     def find_power_target(self):
-        targets = hearthbreaker.targeting.find_spell_target(self.player.game, lambda t: t.spell_targetable())
+        targets = hearthbreaker.targeting.find_spell_target(self.player.game,
+                                                            hearthbreaker.targeting.is_spell_targetable)
         target = self.choose_target(targets)
         self.trigger("found_power_target", target)
         return target
@@ -1164,6 +1320,7 @@ class Hero(Character):
         new_hero.born = self.game.minion_counter
 
         self.player.hero = new_hero
+        GameObject.invalidate_stats()
         new_hero.power.hero = new_hero
         new_hero.attach(new_hero, self.player)
         for aura in self.player.object_auras:
@@ -1186,6 +1343,7 @@ class Hero(Character):
             'immune': self.immune,
             'used_windfury': self.used_windfury,
             'attacks_performed': self.attacks_performed,
+            'power_used': self.power.used,
         })
         return r_val
 
@@ -1199,5 +1357,6 @@ class Hero(Character):
         hero.armor = hd["armor"]
         hero.immune = hd["immune"]
         hero.used_windfury = hd["used_windfury"]
-        hero.attacks_performed = not hd["attacks_performed"]
+        hero.attacks_performed = hd["attacks_performed"]
+        hero.power.used = hd.get("power_used", False)
         return hero
@@ -2,10 +2,18 @@ from copy import copy
 
 
 class Power:
+    #: Whether using this power asks the player for a target
+    targetable = False
+
     def __init__(self):
         self.hero = None
         self.used = False
 
+    def __copy__(self):
+        new_power = type(self).__new__(type(self))
+        new_power.__dict__ = self.__dict__.copy()
+        return new_power
+
     def can_use(self):
         return not self.used and self.hero.player.mana >= 2
 
@@ -14,6 +22,7 @@ class Power:
             self.hero.player.trigger("used_power")
             self.hero.player.mana -= 2
             self.used = True
+            self.hero._hash_changed()
 
 
 class DruidPower(Power):
@@ -24,6 +33,10 @@ class DruidPower(Power):
 
 
 class HunterPower(Power):
+    @property
+    def targetable(self):
+        return self.hero.power_targets_minions
+
     def use(self):
         if self.hero.power_targets_minions:
             target = self.hero.find_power_target()
@@ -36,6 +49,8 @@ class HunterPower(Power):
 
 
 class MagePower(Power):
+    targetable = True
+
     def use(self):
         target = self.hero.find_power_target()
         super().use()
@@ -44,6 +59,8 @@ class MagePower(Power):
 
 
 class PriestPower(Power):
+    targetable = True
+
     def use(self):
         target = self.hero.find_power_target()
         super().use()
@@ -58,6 +75,8 @@ class PriestPower(Power):
 
 # Special power the priest can obtain via the card Shadowform
 class MindSpike(Power):
+    targetable = True
+
     def use(self):
         super().use()
         target = self.hero.find_power_target()
@@ -69,6 +88,8 @@ class MindSpike(Power):
 
 # Special power the priest can obtain via the card Shadowform
 class MindShatter(Power):
+    targetable = True
+
     def use(self):
         super().use()
         target = self.hero.find_power_target()
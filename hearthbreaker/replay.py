@@ -1,3 +1,4 @@
+import os
 import re
 import json
 
@@ -37,15 +38,79 @@ For example: ::
     replay.read_json("my_replay.hsreplay") # load the replay (this can be combined with the previous line)
     game = playback(replay)                # create a game associated with the replay
     game.start()                           # play the recorded game
+
+Streaming a game
+~~~~~~~~~~~~~~~~
+
+A long game, or a batch of many games, can be written to a file as it is played, so that the moves don't have to be
+held in memory until the end.  The replay is written in the json lines format, with the header on the first line and
+one move on each line after it.  For example: ::
+
+    game = create_a_game()
+    with record(game, "my_replay.jsonl"):  # Write the game's moves to a file as they are made
+        game.start()
+
+    replay = Replay()
+    replay.read_json_lines("my_replay.jsonl") # Load the whole replay for playback, or use ReplayReader to
+                                              # read it a move at a time
 """
 
+# The replay schema, and a validator for it, loaded when they are first needed
+_schema = None
+_validator = None
+
+
+def replay_schema():
+    """
+    Load the JSON schema that replays in the complete format must match.  The schema is read from
+    ``replay.schema.json`` inside the ``hearthbreaker`` package, once per process.
+
+    :rtype: dict
+    """
+    global _schema
+    if _schema is None:
+        schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay.schema.json")
+        with open(schema_path, "r") as schema_file:
+            _schema = json.load(schema_file)
+    return _schema
+
+
+def _inline_refs(node, root, resolving=()):
+    """
+    Copy a part of a schema, replacing each reference to another part of the same schema with a copy of that part, so
+    that references don't have to be resolved during validation.  References which refer back to a part that contains
+    them are left as they are.
+    """
+    if isinstance(node, list):
+        return [_inline_refs(item, root, resolving) for item in node]
+    if not isinstance(node, dict):
+        return node
+    ref = node.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#/") and ref not in resolving:
+        target = root
+        for part in ref[2:].split("/"):
+            target = target[part.replace("~1", "/").replace("~0", "~")]
+        return _inline_refs(target, root, resolving + (ref,))
+    return dict((key, _inline_refs(value, root, resolving)) for key, value in node.items())
+
+
+def _replay_validator():
+    global _validator
+    if _validator is None:
+        from jsonschema.validators import validator_for
+        schema = replay_schema()
+        validator_class = validator_for(schema)
+        validator_class.check_schema(schema)
+        _validator = validator_class(_inline_refs(schema, schema))
+    return _validator
+
 
 class Replay:
     """
     Encapsulates the data stored in a replay, along with functions to read and write replays.  The data
     stored in this class can be used for either recording or playing back replays.
     """
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, trusted=False):
         """
         Create a new Replay.  This replay can be used for recording or playing back a game.
 
@@ -54,6 +119,8 @@ class Replay:
         :param string filename: A string representing a filename for a replay file to load or None (the default).
                                 If present, it will load the selected replay and prepare it for playback.
                                 The replay file must be in the complete format
+        :param bool trusted: If True, the replay file is not checked against the replay schema.  See
+                             :meth:`read_json`.
         """
         self._moves = []
         self.__next_target = None
@@ -61,11 +128,9 @@ class Replay:
         self.decks = []
         self.keeps = []
         self.random = []
-        schema_file = open("replay.schema.json", "r")
-        self.schema = json.load(schema_file)
-        schema_file.close()
+        self.schema = replay_schema()
         if filename is not None:
-            self.read_json(filename)
+            self.read_json(filename, trusted)
 
     def _save_decks(self, deck1, deck2):
         """
@@ -88,11 +153,18 @@ class Replay:
         else:
             self.random.append(result)
 
+    def _add_move(self, move):
+        """
+        Add a move that has just been started to the end of the moves array.  The move can still be updated (with
+        random numbers or a chosen option, for example) until the next one is added.
+        """
+        self._moves.append(move)
+
     def _record_card_played(self, card, index):
         """
         Record that a card has been played.  This will add a new PlayMove to the moves array
         """
-        self._moves.append(PlayMove(hearthbreaker.proxies.ProxyCard(index), target=card.target))
+        self._add_move(PlayMove(hearthbreaker.proxies.ProxyCard(index), target=card.target))
         if self.__next_index >= 0:
             self._moves[-1].index = self.__next_index
             self.__next_index = -1
@@ -107,14 +179,14 @@ class Replay:
         """
         Record that an attack occurred.  This will create a new AttackMove in the moves array
         """
-        self._moves.append(AttackMove(attacker, target))
+        self._add_move(AttackMove(attacker, target))
         self.__next_target = None
 
     def _record_power(self):
         """
         Record that the current played used their hero power
         """
-        self._moves.append(PowerMove(self.__next_target))
+        self._add_move(PowerMove(self.__next_target))
         self.__next_target = None
 
     def _record_target(self, target):
@@ -228,20 +300,41 @@ class Replay:
         else:
             writer = file
 
+        json.dump({'header': self._json_header(), 'moves': self._moves}, writer, default=lambda o: o.__to_json__(),
+                  indent=2, sort_keys=True)
+        if was_filename:
+            writer.close()
+
+    def _json_header(self):
+        """
+        The header of this replay, as it is written in the complete json format
+        """
         header_cards = [{"cards": [card.name for card in self.__shorten_deck(deck.cards)],
                          "hero": deck.hero.short_name} for deck in self.decks]
 
-        header = {
+        return {
             'decks': header_cards,
             'keep': self.keeps,
             'random': self.random,
         }
-        json.dump({'header': header, 'moves': self._moves}, writer, default=lambda o: o.__to_json__(), indent=2,
-                  sort_keys=True)
-        if was_filename:
-            writer.close()
 
-    def read_json(self, file):
+    def _load_json_header(self, header):
+        """
+        Set the decks, kept cards and random numbers of this replay from a header in the complete json format
+        """
+        self.decks = []
+        for deck in header['decks']:
+            deck_size = len(deck['cards'])
+            cards = [card_lookup(deck['cards'][index % deck_size]) for index in range(0, 30)]
+            self.decks.append(
+                Deck(cards, hero_from_name(deck['hero'])))
+
+        self.random = header['random']
+        self.keeps = header['keep']
+        if len(self.keeps) == 0:
+            self.keeps = [[0, 1, 2], [0, 1, 2, 3]]
+
+    def read_json(self, file, trusted=False):
         """
         Read a replay in the complete json format.  This format is compatible with the netplay format, and is
         also designed to be more future proof.  For more info, see the
@@ -251,30 +344,38 @@ class Replay:
                      where a replay file is found.  If an IO object, then the IO object should be opened for
                      reading.
         :type file: :class:`str` or :class:`io.TextIOBase`
+        :param bool trusted: If True, the replay is not checked against the replay schema.  This is much quicker,
+                             but should only be used for replays which were written by :meth:`write_json`, as a
+                             malformed replay will fail in unexpected ways.
         """
-        from jsonschema import validate
         was_filename = False
         if 'read' not in dir(file):
             was_filename = True
             file = open(file, 'r')
 
         jd = json.load(file)
-        validate(jd, self.schema)
-        self.decks = []
-        for deck in jd['header']['decks']:
-            deck_size = len(deck['cards'])
-            cards = [card_lookup(deck['cards'][index % deck_size]) for index in range(0, 30)]
-            self.decks.append(
-                Deck(cards, hero_from_name(deck['hero'])))
-
-        self.random = jd['header']['random']
-        self.keeps = jd['header']['keep']
-        if len(self.keeps) == 0:
-            self.keeps = [[0, 1, 2], [0, 1, 2, 3]]
+        if not trusted:
+            _replay_validator().validate(jd)
+        self._load_json_header(jd['header'])
         self._moves = [Move.from_json(**js) for js in jd['moves']]
         if was_filename:
             file.close()
 
+    def read_json_lines(self, file, trusted=False):
+        """
+        Read a replay in the json lines format written by :class:`StreamingReplay`, so that it can be played back.
+        To look through the moves of a replay without holding them all in memory, use :class:`ReplayReader` instead.
+
+        :param file: Either a string or an IO object.  If a string, then it is assumed to be a filename describing
+                     where a replay file is found.  If an IO object, then the IO object should be opened for
+                     reading.
+        :type file: :class:`str` or :class:`io.TextIOBase`
+        :param bool trusted: If True, the replay is not checked against the replay schema.  See :meth:`read_json`.
+        """
+        with ReplayReader(file, trusted) as reader:
+            self._load_json_header(reader.header)
+            self._moves = list(reader)
+
     def read(self, file):
         """
         Read a replay in the compact format.  This format is a series of directives, and isn't as flexible
@@ -358,7 +459,165 @@ class Replay:
             self.keeps = [[0, 1, 2], [0, 1, 2, 3]]
 
 
-def record(game):
+def _json_line(obj):
+    return json.dumps(obj, default=lambda o: o.__to_json__(), separators=(',', ':'), sort_keys=True) + "\n"
+
+
+class StreamingReplay(Replay):
+    """
+    A replay which is written to a file while it is being recorded, rather than once the game is over.
+
+    The file is in the json lines format: the first line is an object holding the ``header`` of the complete json
+    format, and each line after that is one move, in the same form as the moves of the complete json format.  A move
+    can still change until the next one starts (random numbers are added to it as they are generated, for example),
+    so each line is written and flushed when the move after it starts.  Only the move in progress is kept in memory,
+    and if the recording process stops unexpectedly, only that move is lost.
+
+    The replay must be closed (or used as a context manager) once the game is over, to write the last move.  A
+    streaming replay can't be played back or written in another format itself.  Instead, read the file back with
+    :meth:`Replay.read_json_lines`, or a move at a time with :class:`ReplayReader`.
+    """
+
+    def __init__(self, file):
+        """
+        :param file: Either a string or an IO object.  If a string, then it is assumed to be a filename describing
+                     where a replay file should be written.  If an IO object, then the IO object should be opened for
+                     writing, and is flushed but not closed when the replay is closed.
+        :type file: :class:`str` or :class:`io.TextIOBase`
+        """
+        super().__init__()
+        if 'write' not in dir(file):
+            self._was_filename = True
+            self._writer = open(file, 'w')
+        else:
+            self._was_filename = False
+            self._writer = file
+        self._header_written = False
+        #: The number of moves which have been written to the file
+        self.moves_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write_line(self, line):
+        self._writer.write(line)
+        self._writer.flush()
+
+    def _write_header(self):
+        # The header is complete once the first move starts, as the cards kept and the random numbers generated
+        # before the game are all recorded by then
+        self._write_line(_json_line({'header': self._json_header()}))
+        self._header_written = True
+
+    def _write_pending(self):
+        if self._moves:
+            self._write_line(_json_line(self._moves.pop()))
+            self.moves_written += 1
+
+    def _add_move(self, move):
+        if not self._header_written:
+            self._write_header()
+        self._write_pending()
+        self._moves.append(move)
+
+    def finish(self):
+        """
+        Write the header, if the game hasn't started, and the move in progress, if there is one.  This should only be
+        called once the game is over, as the move can't be changed once it has been written.
+        """
+        if self._writer is None:
+            return
+        if not self._header_written:
+            self._write_header()
+        self._write_pending()
+
+    def close(self):
+        """
+        Finish writing the replay, and close the file if it was opened by this replay
+        """
+        if self._writer is None:
+            return
+        try:
+            self.finish()
+        finally:
+            if self._was_filename:
+                self._writer.close()
+            self._writer = None
+
+
+class ReplayReader:
+    """
+    Reads a replay in the json lines format written by :class:`StreamingReplay` one move at a time, so that replays
+    of any length can be looked through.  For example: ::
+
+        with ReplayReader("my_replay.jsonl") as reader:
+            decks = reader.header['decks']
+            attacks = sum(1 for move in reader if isinstance(move, AttackMove))
+
+    If the last line of the file is incomplete, as it might be if the recording process stopped unexpectedly, it is
+    left out.
+    """
+
+    def __init__(self, file, trusted=False):
+        """
+        Open a replay and read its header.
+
+        :param file: Either a string or an IO object.  If a string, then it is assumed to be a filename describing
+                     where a replay file is found.  If an IO object, then the IO object should be opened for
+                     reading.
+        :type file: :class:`str` or :class:`io.TextIOBase`
+        :param bool trusted: If True, the replay is not checked against the replay schema.  See
+                             :meth:`Replay.read_json`.
+        """
+        if 'read' not in dir(file):
+            self._was_filename = True
+            self._file = open(file, 'r')
+        else:
+            self._was_filename = False
+            self._file = file
+        self.trusted = trusted
+        line = self._file.readline()
+        if not line.endswith("\n"):
+            raise ValueError("A replay must start with a complete header line")
+        #: The header of the replay, as a dict in the form of the header of the complete json format
+        self.header = json.loads(line)['header']
+        if not trusted:
+            _replay_validator().validate({'header': self.header, 'moves': []})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self):
+        """
+        Read the moves which haven't been read yet, in order
+
+        :rtype: iterator[hearthbreaker.serialization.move.Move]
+        """
+        for line in self._file:
+            if not line.endswith("\n"):
+                break
+            if not line.strip():
+                continue
+            move = json.loads(line)
+            if not self.trusted:
+                _replay_validator().validate({'header': self.header, 'moves': [move]})
+            yield Move.from_json(**move)
+
+    def close(self):
+        """
+        Close the file, if it was opened by this reader
+        """
+        if self._was_filename:
+            self._file.close()
+
+
+def record(game, stream=None):
     """
     Ready a game for recording.  This function must be called before the game is played.
 
@@ -367,8 +626,12 @@ def record(game):
 
     :param game: A game which has not been started
     :type game: :class:`Game <hearthbreaker.game_objects.Game>`
+    :param stream: If present, the replay is written to this file as the game is played, rather than kept in
+                   memory.  See :class:`StreamingReplay`.
+    :type stream: :class:`str` or :class:`io.TextIOBase`
     :return: A replay that will track the actions of the game as it is played.  Once the game is complete,
-                  this replay can be written to a file to remember the state of this game.
+                  this replay can be written to a file to remember the state of this game.  If `stream` was given,
+                  the replay must be closed instead.
     :rtype: :class:`Replay`
     """
     class RecordingAgent:
@@ -398,7 +661,10 @@ def record(game):
         def __setattr__(self, key, value):
             setattr(self.__getattribute__("agent"), key, value)
 
-    replay = hearthbreaker.replay.Replay()
+    if stream is None:
+        replay = hearthbreaker.replay.Replay()
+    else:
+        replay = StreamingReplay(stream)
     replay.random.append(game.first_player)
 
     game.players[0].agent = RecordingAgent(game.players[0].agent)
@@ -434,11 +700,11 @@ def record(game):
         return result
 
     def _end_turn():
-        replay._moves.append(TurnEndMove())
+        replay._add_move(TurnEndMove())
         _old_end_turn()
 
     def _start_turn():
-        replay._moves.append(TurnStartMove())
+        replay._add_move(TurnStartMove())
         _old_start_turn()
 
     game.random_choice = random_choice
@@ -0,0 +1,297 @@
+import struct
+import zlib
+
+from hearthbreaker.engine import Game, card_lookup, _card_table
+from hearthbreaker.game_objects import GameException, GameObject
+
+__doc__ = """
+A compact binary encoding of a :class:`Game <hearthbreaker.engine.Game>`, for storing large numbers of positions.
+
+The encoding holds exactly the same information as :func:`hearthbreaker.serialization.serialization.serialize`, and
+decoding it goes through the same :meth:`Game.__from_json__ <hearthbreaker.engine.Game.__from_json__>`, so either
+can be used to save a game.  The binary form is smaller and quicker because:
+
+* Card names are written as their index in a table of every card name, so they take one or two bytes.
+* Every other string is written once, and referred to by its index after that.
+* Numbers are written as variable length integers, so small numbers (which almost every stat is) take one byte.
+* The effects, auras, buffs and deathrattles of a minion, weapon or card in hand which are the same as those of a new
+  copy of that card are written as a single byte, and taken from the card when decoding.
+
+Every encoding starts with a header holding the format version and a checksum of the card name table, so that data
+encoded by a different version, or with a different set of cards, is refused rather than decoded wrongly.
+"""
+
+#: The version of the format written by :func:`encode`
+FORMAT_VERSION = 1
+
+_MAGIC = b"HBG"
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STRING, _STRING_REF, _CARD, _LIST, _DICT, _TEMPLATED, _SAME = range(12)
+
+# The most common values are written in the tag byte itself: tags from _SHORT_STRING_REF refer to one of the first
+# strings, and tags from _SHORT_INT are small numbers
+_SHORT_STRING_REF = 64
+_SHORT_INT = 128
+
+_MINION, _WEAPON, _HAND_CARD = range(3)
+
+# The dicts under these keys describe an object made from a card, whose tags can be taken from that card
+_KINDS = {
+    "minions": _MINION,
+    "weapon": _WEAPON,
+    "hand": _HAND_CARD,
+}
+
+# The name of every card, sorted, and the index of each name in that list
+_card_names = []
+_card_ids = {}
+_checksum = 0
+
+# The tags of a new object made from each card, keyed by the kind of object and the card's name
+_templates = {}
+
+
+def _plain(value):
+    """
+    Convert an object to the same lists, dicts and values that :mod:`json` would write for it.
+    """
+    if isinstance(value, (str, int, float)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return dict((key, _plain(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return _plain(value.__to_json__())
+
+
+def _index_card_names():
+    global _checksum
+    names = set()
+    for ref_name, card_class in _card_table().items():
+        names.add(ref_name)
+        names.add(card_class().name)
+    _card_names.extend(sorted(names))
+    for index, name in enumerate(_card_names):
+        _card_ids[name] = index
+    _checksum = zlib.crc32("\n".join(_card_names).encode("utf-8")) & 0xffffffff
+
+
+def _template(kind, name):
+    """
+    Find the tags of a new minion, weapon or card in hand made from the card with the given name.  Cards which can't
+    be made without being in a game have no template, and are always written out in full.
+
+    :rtype: dict
+    """
+    key = (kind, name)
+    if key not in _templates:
+        card = card_lookup(name)
+        try:
+            if kind == _MINION:
+                minion = card.create_minion(None)
+                template = _plain(GameObject.__to_json__(minion))
+                template['deathrattles'] = _plain(minion.deathrattle)
+                if minion.enrage:
+                    template['enrage'] = _plain(minion.enrage)
+            elif kind == _WEAPON:
+                template = _plain(GameObject.__to_json__(card.create_weapon(None)))
+            else:
+                template = _plain(GameObject.__to_json__(card))
+        except AttributeError:
+            # The object is made with no player, so a card which needs one fails when it looks anything up on it
+            template = {}
+        _templates[key] = template
+    return _templates[key]
+
+
+class _Writer:
+    def __init__(self):
+        self.out = bytearray()
+        self.strings = {}
+
+    def varint(self, number):
+        while number > 0x7f:
+            self.out.append(number & 0x7f | 0x80)
+            number >>= 7
+        self.out.append(number)
+
+    def string(self, text):
+        if text in _card_ids:
+            self.out.append(_CARD)
+            self.varint(_card_ids[text])
+        elif text in self.strings:
+            index = self.strings[text]
+            if index < _SHORT_INT - _SHORT_STRING_REF:
+                self.out.append(_SHORT_STRING_REF + index)
+            else:
+                self.out.append(_STRING_REF)
+                self.varint(index)
+        else:
+            self.strings[text] = len(self.strings)
+            encoded = text.encode("utf-8")
+            self.out.append(_STRING)
+            self.varint(len(encoded))
+            self.out.extend(encoded)
+
+    def value(self, value, kind=None):
+        if value is None:
+            self.out.append(_NONE)
+        elif value is False:
+            self.out.append(_FALSE)
+        elif value is True:
+            self.out.append(_TRUE)
+        elif isinstance(value, int):
+            if 0 <= value < 256 - _SHORT_INT:
+                self.out.append(_SHORT_INT + value)
+                return
+            self.out.append(_INT)
+            self.varint(value << 1 if value >= 0 else (-value << 1) - 1)
+        elif isinstance(value, float):
+            self.out.append(_FLOAT)
+            self.out.extend(struct.pack("<d", value))
+        elif isinstance(value, str):
+            self.string(value)
+        elif isinstance(value, list):
+            self.out.append(_LIST)
+            self.varint(len(value))
+            for item in value:
+                self.value(item, kind)
+        elif kind is not None and isinstance(value.get('name'), str):
+            template = _template(kind, value['name'])
+            self.out.append(_TEMPLATED)
+            self.varint(kind)
+            self.varint(len(value))
+            for key, item in value.items():
+                self.string(key)
+                if key in template and template[key] == item:
+                    self.out.append(_SAME)
+                else:
+                    self.value(item)
+        else:
+            self.out.append(_DICT)
+            self.varint(len(value))
+            for key, item in value.items():
+                self.string(key)
+                self.value(item, _KINDS.get(key))
+
+
+class _Reader:
+    def __init__(self, data, position):
+        self.data = data
+        self.position = position
+        self.strings = []
+
+    def varint(self):
+        byte = self.data[self.position]
+        self.position += 1
+        if byte < 0x80:
+            return byte
+        number = byte & 0x7f
+        shift = 7
+        while True:
+            byte = self.data[self.position]
+            self.position += 1
+            number |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return number
+            shift += 7
+
+    def value(self):
+        tag = self.data[self.position]
+        self.position += 1
+        if tag >= _SHORT_INT:
+            return tag - _SHORT_INT
+        if tag >= _SHORT_STRING_REF:
+            return self.strings[tag - _SHORT_STRING_REF]
+        if tag == _INT:
+            number = self.varint()
+            return -((number + 1) >> 1) if number & 1 else number >> 1
+        if tag == _CARD:
+            return _card_names[self.varint()]
+        if tag == _STRING_REF:
+            return self.strings[self.varint()]
+        if tag == _STRING:
+            length = self.varint()
+            text = self.data[self.position:self.position + length].decode("utf-8")
+            self.position += length
+            self.strings.append(text)
+            return text
+        if tag == _NONE:
+            return None
+        if tag == _FALSE:
+            return False
+        if tag == _TRUE:
+            return True
+        if tag == _LIST:
+            return [self.value() for index in range(self.varint())]
+        if tag == _DICT:
+            result = {}
+            for index in range(self.varint()):
+                key = self.value()
+                result[key] = self.value()
+            return result
+        if tag == _TEMPLATED:
+            kind = self.varint()
+            result = {}
+            same = []
+            for index in range(self.varint()):
+                key = self.value()
+                if self.data[self.position] == _SAME:
+                    self.position += 1
+                    same.append(key)
+                    result[key] = None
+                else:
+                    result[key] = self.value()
+            if same:
+                template = _template(kind, result['name'])
+                for key in same:
+                    result[key] = template[key]
+            return result
+        if tag == _FLOAT:
+            number = struct.unpack_from("<d", self.data, self.position)[0]
+            self.position += 8
+            return number
+        raise GameException("Unknown tag {0} in encoded game".format(tag))
+
+
+def _header():
+    if not _card_names:
+        _index_card_names()
+    return _MAGIC + struct.pack(">BI", FORMAT_VERSION, _checksum)
+
+
+def encode(game):
+    """
+    Encode a game in the compact binary format.
+
+    :param hearthbreaker.engine.Game game: The game to encode
+    :rtype: bytes
+    """
+    writer = _Writer()
+    writer.out.extend(_header())
+    writer.value(_plain(game))
+    return bytes(writer.out)
+
+
+def _decode_json(data):
+    """
+    Decode the structure that :func:`encode` wrote, which is the same as the JSON for the game.
+    """
+    header = _header()
+    if data[:len(_MAGIC)] != _MAGIC:
+        raise GameException("The data is not an encoded game")
+    if data[:len(header)] != header:
+        raise GameException("The game was encoded with format version {0}, or with a different set of cards"
+                            .format(data[len(_MAGIC)]))
+    return _Reader(data, len(header)).value()
+
+
+def decode(data, agents):
+    """
+    Decode a game from the binary format written by :func:`encode`.
+
+    :param bytes data: The encoded game
+    :param list agents: The agents which will play for each player
+    :rtype: hearthbreaker.engine.Game
+    """
+    return Game.__from_json__(_decode_json(data), agents)
@@ -0,0 +1,3 @@
+from hearthbreaker.sim.batch import BatchResult, load_deck, run_batch
+from hearthbreaker.sim.results import open_results
+from hearthbreaker.sim.archive import ReplayArchive
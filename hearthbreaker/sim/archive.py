@@ -0,0 +1,290 @@
+import io
+import json
+import os
+
+from hearthbreaker.replay import Replay
+from hearthbreaker.sim.results import winning_deck
+
+__doc__ = """
+Keeps many replays in one file, so that a batch of games doesn't have to write a file for each of them.  For
+example: ::
+
+    with ReplayArchive("zoo_vs_patron.hsarchive") as archive:
+        for game in games:                       # Each game is recorded with hearthbreaker.replay.record
+            archive.add_game(replays[game], game, ["zoo", "patron"])
+
+        for entry in archive.find(lambda entry: entry.turns > 20, winner=0):
+            replay = archive.load(entry)
+
+The archive is only ever appended to.  Each replay is written straight after a line of JSON describing it, which
+holds the decks, the winner, the number of turns, the seed, the format the replay is written in and its length.
+Opening an archive reads only these lines, skipping over the replays themselves, to make an index of every replay
+in it.  A replay can then be found by its id (its position in the archive) or by what is in its index entry, and
+loaded without reading any other replay.
+
+Each replay is written with a single append to a file opened with ``O_APPEND``, so a number of processes can add to
+the same archive at once.
+"""
+
+#: Replays written in the complete json format (see :meth:`Replay.write_json <hearthbreaker.replay.Replay.write_json>`)
+JSON = "json"
+#: Replays written in the compact format (see :meth:`Replay.write <hearthbreaker.replay.Replay.write>`)
+COMPACT = "compact"
+
+# Every line describing a replay starts with this, as its keys are written in order
+_HEADER = b'{"decks":'
+_FIELDS = frozenset(['decks', 'format', 'length', 'seed', 'turns', 'winner'])
+# Returned by ReplayArchive._read_record for a replay which is still being written
+_INCOMPLETE = object()
+# How much of the archive is read at a time when looking for the next replay after one which was cut short
+_SEARCH_SIZE = 65536
+
+
+class ArchiveEntry:
+    """
+    The index entry of one replay in a :class:`ReplayArchive`.
+    """
+    __slots__ = ["id", "offset", "length", "format", "decks", "winner", "turns", "seed"]
+
+    def __init__(self, entry_id, offset, length, format, decks, winner, turns, seed):
+        #: The position of the replay in the archive, starting from 0
+        self.id = entry_id
+        #: Where the replay starts in the archive file, in bytes
+        self.offset = offset
+        #: The length of the replay, in bytes
+        self.length = length
+        #: The format the replay is written in, either :data:`JSON` or :data:`COMPACT`
+        self.format = format
+        #: The names of the decks, in the order of the replay's decks
+        self.decks = decks
+        #: The index in :attr:`decks` of the deck which won, or None for a draw or if it wasn't given.  The replay's
+        #: decks start with the deck of the player who went first, so this is not always the index of the winner in
+        #: ``game.players``.
+        self.winner = winner
+        #: The number of turns the game lasted, or None if it wasn't given
+        self.turns = turns
+        #: The seed of the game, or None if it wasn't given
+        self.seed = seed
+
+
+class ReplayArchive:
+    """
+    A file holding any number of replays, with an index of them.  The index is read when the archive is opened, and
+    can be brought up to date with replays added by other processes since by calling :meth:`refresh`.
+    """
+
+    def __init__(self, filename):
+        """
+        :param str filename: The archive file.  It is created if it doesn't exist.
+        """
+        self.filename = filename
+        #: The index entry of every replay in the archive, in the order they were added
+        self.entries = []
+        self._file = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._reader = open(filename, "rb")
+        self._end = 0
+        self.refresh()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, replay_id):
+        return self.entries[replay_id]
+
+    def refresh(self):
+        """
+        Add the replays which have been appended to the archive since it was last read to the index.  A replay which
+        is still being written is left for a later refresh.  A replay which was only partly written, and has had
+        others added after it, is skipped over, and the index picks up again at the next replay after it.
+        """
+        size = os.fstat(self._reader.fileno()).st_size
+        while self._end < size:
+            record = self._read_record(self._end, size)
+            if record is _INCOMPLETE:
+                break
+            if record is None:
+                start = self._find_record(self._end + 1, size)
+                if start is None:
+                    break
+                self._end = start
+                continue
+            info, offset = record
+            self.entries.append(ArchiveEntry(len(self.entries), offset, info['length'], info['format'],
+                                             info['decks'], info['winner'], info['turns'], info['seed']))
+            self._end = offset + info['length']
+
+    def _read_record(self, start, size):
+        """
+        Read the line describing the replay which starts at the given offset.
+
+        :param int start: Where the replay starts in the archive file
+        :param int size: The size of the archive file
+        :return: The description of the replay and where the replay itself starts, :data:`_INCOMPLETE` if the replay
+                 is still being written, or None if there is no whole replay at the offset
+        """
+        self._reader.seek(start)
+        line = self._reader.readline()
+        if not line.endswith(b"\n"):
+            return _INCOMPLETE
+        if not line.startswith(_HEADER):
+            return None
+        try:
+            info = json.loads(line.decode("utf-8"))
+        except ValueError:
+            return None
+        if not isinstance(info, dict) or not _FIELDS.issubset(info) or not isinstance(info['length'], int):
+            return None
+        offset = start + len(line)
+        end = offset + info['length']
+        if end > size:
+            return _INCOMPLETE
+        # A replay which was cut short runs on into the one after it, so the next replay has to start where this
+        # one ends
+        self._reader.seek(end)
+        following = self._reader.read(len(_HEADER))
+        if following != _HEADER[:len(following)]:
+            return None
+        return info, offset
+
+    def _find_record(self, start, size):
+        """
+        Find where the next replay could start in the archive, at or after the given offset.
+
+        :param int start: The offset to search from
+        :param int size: The size of the archive file
+        :return: The offset of the next replay, or None if there isn't one
+        """
+        while start < size:
+            self._reader.seek(start)
+            chunk = self._reader.read(_SEARCH_SIZE)
+            found = chunk.find(_HEADER)
+            if found >= 0:
+                return start + found
+            start += max(len(chunk) - len(_HEADER) + 1, 1)
+        return None
+
+    def add(self, replay, decks=None, winner=None, turns=None, seed=None, format=JSON):
+        """
+        Append a replay to the archive.
+
+        :param hearthbreaker.replay.Replay replay: The replay to add.  The game it records should be over.
+        :param list[str] decks: The names of the decks, in the order of the replay's decks.  Defaults to the names of
+                                their heroes.
+        :param int winner: The index of the deck which won in the replay's decks, or None for a draw
+        :param int turns: The number of turns the game lasted
+        :param int seed: The seed of the game
+        :param str format: The format to write the replay in, either :data:`JSON` or :data:`COMPACT`
+        :return: The index entry of the replay
+        :rtype: ArchiveEntry
+        """
+        output = io.StringIO()
+        if format == JSON:
+            replay.write_json(output)
+        elif format == COMPACT:
+            replay.write(output)
+        else:
+            raise ValueError("Unknown replay format: {0}".format(format))
+        if decks is None:
+            decks = [deck.hero.short_name for deck in replay.decks]
+        body = output.getvalue().encode("utf-8")
+        info = {
+            'decks': list(decks),
+            'format': format,
+            'length': len(body),
+            'seed': seed,
+            'turns': turns,
+            'winner': winner,
+        }
+        data = json.dumps(info, sort_keys=True, separators=(",", ":")).encode("utf-8") + b"\n" + body
+        written = os.write(self._file, data)
+        if written != len(data):
+            raise IOError("Only {0} of {1} bytes of a replay were written to {2}".format(
+                written, len(data), self.filename))
+        offset = os.lseek(self._file, 0, os.SEEK_CUR) - len(body)
+        self.refresh()
+        for entry in reversed(self.entries):
+            if entry.offset == offset:
+                return entry
+
+    def add_game(self, replay, game, decks=None, format=JSON):
+        """
+        Append the replay of a finished game to the archive, taking the winner, the number of turns and the seed from
+        the game.  The winner is found by :func:`hearthbreaker.sim.results.winning_deck`, and is given in the order of
+        the replay's decks.
+
+        :param hearthbreaker.replay.Replay replay: The replay the game was recorded into
+        :param hearthbreaker.engine.Game game: The game which was recorded
+        :param list[str] decks: The names of the decks, in the order of the replay's decks.  Defaults to the names of
+                                their heroes.
+        :param str format: The format to write the replay in, either :data:`JSON` or :data:`COMPACT`
+        :return: The index entry of the replay
+        :rtype: ArchiveEntry
+        """
+        return self.add(replay, decks, winning_deck(game, replay.decks), game._turns_passed, game.seed, format)
+
+    def find(self, predicate=None, **metadata):
+        """
+        Find the replays whose index entries match.  For example, ``archive.find(winner=1, turns=10)`` finds the games
+        the second deck won in 10 turns.
+
+        :param predicate: A function which is given each :class:`ArchiveEntry`, and returns True for those to find
+        :param metadata: Values that the attributes of the entries to find must be equal to
+        :return: The matching entries, in the order they were added
+        :rtype: list[ArchiveEntry]
+        """
+        entries = [entry for entry in self.entries
+                   if all(getattr(entry, key) == value for key, value in metadata.items())]
+        if predicate is not None:
+            entries = [entry for entry in entries if predicate(entry)]
+        return entries
+
+    def read_bytes(self, entry):
+        """
+        Read a replay as it is written in the archive, without loading it.
+
+        :param entry: The replay to read, either its id or its index entry
+        :type entry: int or ArchiveEntry
+        :rtype: bytes
+        """
+        if not isinstance(entry, ArchiveEntry):
+            entry = self.entries[entry]
+        self._reader.seek(entry.offset)
+        return self._reader.read(entry.length)
+
+    def load(self, entry, trusted=False):
+        """
+        Load a replay from the archive, so that it can be played back.
+
+        :param entry: The replay to load, either its id or its index entry
+        :type entry: int or ArchiveEntry
+        :param bool trusted: If True, a replay in the json format is not checked against the replay schema.  See
+                             :meth:`Replay.read_json <hearthbreaker.replay.Replay.read_json>`.
+        :rtype: hearthbreaker.replay.Replay
+        """
+        if not isinstance(entry, ArchiveEntry):
+            entry = self.entries[entry]
+        text = io.StringIO(self.read_bytes(entry).decode("utf-8"))
+        replay = Replay()
+        if entry.format == JSON:
+            replay.read_json(text, trusted)
+        else:
+            replay.read(text)
+        return replay
+
+    def close(self):
+        """
+        Close the archive file
+        """
+        if self._file is not None:
+            os.close(self._file)
+            self._reader.close()
+            self._file = None
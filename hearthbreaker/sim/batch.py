@@ -0,0 +1,174 @@
+import multiprocessing
+import random
+
+from hearthbreaker.agents import registry
+from hearthbreaker.cards.heroes import hero_for_class
+from hearthbreaker.constants import CHARACTER_CLASS
+from hearthbreaker.engine import Game, Deck, card_lookup
+from hearthbreaker.game_objects import GameException
+from hearthbreaker.sim.results import game_record, open_results, record_mulligans, winning_deck
+
+__doc__ = """
+Runs large batches of simulated games, spread across every core of the machine.
+
+Each batch is split into one chunk of games per worker process.  Every worker loads its own copy of the decks and
+agents, and is handed its own seed, from which the seed of each of its games is drawn.  A game can then be
+reproduced from its seed alone.  For example: ::
+
+    result = run_batch(["zoo.hsdeck", "patron.hsdeck"], ["Random", "Trade"], 100000)
+    print(result.wins, result.draws)
+
+A record of each game can also be written to a file as it is played, by :mod:`hearthbreaker.sim.results`: ::
+
+    run_batch(["zoo.hsdeck", "patron.hsdeck"], ["Random", "Trade"], 100000, results="games.jsonl")
+"""
+
+
+def load_deck(filename):
+    """
+    Load a deck from a file in cockatrice format, with a card name in English on each line, preceded by a number to
+    specify how many.  The character class is inferred from the cards present, or defaults to mage.
+
+    :param str filename: The name of the file to load the deck from
+    :rtype: hearthbreaker.engine.Deck
+    """
+    cards = []
+    character_class = CHARACTER_CLASS.MAGE
+
+    with open(filename, "r") as deck_file:
+        contents = deck_file.read()
+        items = contents.splitlines()
+        for line in items[0:]:
+            parts = line.split(" ", 1)
+            count = int(parts[0])
+            for i in range(0, count):
+                card = card_lookup(parts[1])
+                if card.character_class != CHARACTER_CLASS.ALL:
+                    character_class = card.character_class
+                cards.append(card)
+
+    return Deck(cards, hero_for_class(character_class))
+
+
+class BatchResult:
+    """
+    The totals from a batch of games.  Wins are counted per deck, in the order the decks were given to
+    :func:`run_batch`.  A game in which neither hero survives is counted as a draw.
+    """
+
+    def __init__(self, wins=None, draws=0):
+        #: The number of games won by each deck
+        self.wins = wins if wins else [0, 0]
+        #: The number of games which no deck won
+        self.draws = draws
+
+    @property
+    def games(self):
+        """
+        The total number of games played in this batch
+        """
+        return self.wins[0] + self.wins[1] + self.draws
+
+    def add_game(self, winner):
+        """
+        Count a single finished game
+
+        :param winner: The index of the winning deck, or None for a draw
+        """
+        if winner is None:
+            self.draws += 1
+        else:
+            self.wins[winner] += 1
+
+    def merge(self, other):
+        """
+        Add the totals from another :class:`BatchResult` (such as one returned by a different worker) to this one.
+
+        :param BatchResult other: The result to merge into this one
+        :return: This result, for chaining
+        :rtype: BatchResult
+        """
+        self.wins = [self.wins[0] + other.wins[0], self.wins[1] + other.wins[1]]
+        self.draws += other.draws
+        return self
+
+
+def _play_games(deck_files, agent_names, game_count, seed, results=None):
+    """
+    Play a chunk of games in the current process.  This is the body of each worker, and so must only be given
+    arguments which can be sent between processes.
+    """
+    seeder = random.Random(seed)
+    base_decks = [load_deck(deck_file) for deck_file in deck_files]
+    agents = [registry.create_agent(name) for name in agent_names]
+    result = BatchResult()
+    writer = open_results(results, header=False) if results else None
+    try:
+        for game_number in range(game_count):
+            decks = [deck.copy() for deck in base_decks]
+            game = Game(decks, agents, seeder.getrandbits(64))
+            if writer:
+                mulligans = record_mulligans(game, decks)
+            try:
+                game.start()
+            except Exception as e:
+                raise GameException("Game {0} with seed {1} failed: {2!r}".format(game_number, game.seed, e)) from e
+            result.add_game(winning_deck(game, decks))
+            if writer:
+                writer.write(game_record(game, decks, deck_files, agent_names, mulligans))
+    finally:
+        if writer:
+            writer.close()
+    return result
+
+
+def _play_chunk(args):
+    return _play_games(*args)
+
+
+def run_batch(deck_files, agent_names, game_count, workers=None, seed=None, results=None):
+    """
+    Play ``game_count`` games between two decks, spreading them over a pool of worker processes.
+
+    :param list[str] deck_files: The file names of the two decks to play with, in cockatrice format
+    :param list[str] agent_names: The names of the agents which will play each deck, as found in
+                                  :data:`hearthbreaker.agents.registry`
+    :param int game_count: The number of games to play in total
+    :param int workers: The number of worker processes to use.  Defaults to the number of cores on this machine.
+                        If 1, the games are played in the calling process.
+    :param int seed: The seed that the seed for each worker is derived from.  If None, a random seed is used.
+    :param str results: The name of a file to append a record of each game to, as described in
+                        :mod:`hearthbreaker.sim.results`.  If None, no records are kept.
+    :rtype: BatchResult
+    """
+    if len(deck_files) != 2 or len(agent_names) != 2:
+        raise ValueError("A batch needs exactly two decks and two agents")
+    for name in agent_names:
+        if name not in registry.get_names():
+            raise KeyError("{} is not in the agent registry".format(name))
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, game_count))
+    if seed is None:
+        seed = random.getrandbits(64)
+    seeder = random.Random(seed)
+    if results:
+        open_results(results).close()
+
+    chunks = []
+    for worker in range(workers):
+        count = game_count // workers
+        if worker < game_count % workers:
+            count += 1
+        chunks.append((list(deck_files), list(agent_names), count, seeder.getrandbits(64), results))
+
+    result = BatchResult()
+    if workers == 1:
+        for chunk in chunks:
+            result.merge(_play_chunk(chunk))
+        return result
+
+    with multiprocessing.Pool(workers) as pool:
+        for chunk_result in pool.imap_unordered(_play_chunk, chunks):
+            result.merge(chunk_result)
+    return result
@@ -0,0 +1,245 @@
+import abc
+import csv
+import io
+import json
+import os
+
+__doc__ = """
+Writes a record of every game in a batch to a file, one line per game, as the games are played.
+
+Each worker process opens the file for itself and appends its records to it a few at a time.  Every write is a whole
+number of lines, and is made with a single append to a file opened with ``O_APPEND``, so records from different
+workers never end up mixed within a line.  Nothing is kept in memory beyond the lines waiting to be written, so
+batches of any size can be recorded.
+
+Files ending in ``.csv`` are written as CSV, with a header line.  Anything else is written as JSON lines, with one
+object per line.  Either can be read back a record at a time with :func:`read_results`.
+"""
+
+#: The columns of a CSV results file.  Lists of cards are joined by :data:`CARD_SEPARATOR`.
+CSV_COLUMNS = ["seed", "deck1", "deck2", "agent1", "agent2", "winner", "turns", "health1", "health2",
+               "mulligan1", "mulligan2", "played1", "played2"]
+
+#: The separator between the names of cards in the columns of a CSV results file
+CARD_SEPARATOR = "|"
+
+
+def winning_deck(game, decks):
+    """
+    Find which deck won a finished game.  Every part of :mod:`hearthbreaker.sim` gives the winner in this way, as
+    an index into a list of decks, rather than into ``game.players``.
+
+    :param hearthbreaker.engine.Game game: The game that was played
+    :param list[hearthbreaker.engine.Deck] decks: The decks which were played, in the order to give the winner in
+    :return: The index in ``decks`` of the deck whose hero is still alive, or None for a draw
+    :rtype: int
+    """
+    alive = [index for index, deck in enumerate(decks)
+             for player in game.players if player.deck is deck and not player.hero.dead]
+    if len(alive) == 1:
+        return alive[0]
+    return None
+
+
+def game_record(game, decks, deck_files, agent_names, mulligans):
+    """
+    Make the record of a finished game.  Everything in it which is per deck is in the same order as the decks.
+
+    :param hearthbreaker.engine.Game game: The game that was played
+    :param list[hearthbreaker.engine.Deck] decks: The decks which were played, in the order they were given to the
+                                                  batch
+    :param list[str] deck_files: The file names of the decks
+    :param list[str] agent_names: The names of the agents playing each deck
+    :param list[list[str]] mulligans: The names of the cards that each deck's player put back before the game
+    :return: A dict with the seed of the game, the ``decks`` and ``agents``, the ``winner`` as given by
+             :func:`winning_deck`, the number of ``turns``, the ``health`` of each hero at the end, and the names of
+             the cards each deck put back as a ``mulligan`` and ``played``
+    :rtype: dict
+    """
+    players = [player for deck in decks for player in game.players if player.deck is deck]
+    return {
+        'seed': game.seed,
+        'decks': list(deck_files),
+        'agents': list(agent_names),
+        'winner': winning_deck(game, decks),
+        'turns': game._turns_passed,
+        'health': [player.hero.health for player in players],
+        'mulligan': mulligans,
+        'played': [[card.name for card in game._all_cards_played if card.player is player] for player in players],
+    }
+
+
+def record_mulligans(game, decks):
+    """
+    Start recording the cards each player puts back before a game.  This must be called before the game is started.
+
+    :param hearthbreaker.engine.Game game: The game to record
+    :param list[hearthbreaker.engine.Deck] decks: The decks being played, in the order they were given to the batch
+    :return: A list for each deck, which the names of the cards put back are added to
+    :rtype: list[list[str]]
+    """
+    mulligans = [[] for deck in decks]
+    checked = []
+
+    def kept_cards(cards, keep):
+        player = game.players[len(checked)]
+        checked.append(player)
+        for index, deck in enumerate(decks):
+            if player.deck is deck:
+                mulligans[index].extend(card.name for card, kept in zip(cards, keep) if not kept)
+
+    game.bind("kept_cards", kept_cards)
+    return mulligans
+
+
+class ResultWriter(metaclass=abc.ABCMeta):
+    """
+    Appends game records to a file.  Records are kept until ``buffer_size`` of them are waiting, and then written
+    together.  The writer must be closed (or used as a context manager) to write the last of them.
+    """
+
+    def __init__(self, filename, buffer_size=100):
+        """
+        :param str filename: The file to append to.  It is created if it doesn't exist.
+        :param int buffer_size: The most records to keep before writing them
+        """
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self._lines = []
+        self._file = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @abc.abstractmethod
+    def format(self, record):
+        """
+        Turn a record into the line to write for it, including the line ending
+
+        :param dict record: A record made by :func:`game_record`
+        :rtype: str
+        """
+        pass
+
+    def write(self, record):
+        """
+        Add a record to be written
+
+        :param dict record: A record made by :func:`game_record`
+        """
+        self._lines.append(self.format(record))
+        if len(self._lines) >= self.buffer_size:
+            self.flush()
+
+    def _append(self, text):
+        data = text.encode("utf-8")
+        while data:
+            written = os.write(self._file, data)
+            data = data[written:]
+
+    def flush(self):
+        """
+        Write every record which is waiting
+        """
+        if self._lines:
+            self._append("".join(self._lines))
+            self._lines = []
+
+    def close(self):
+        """
+        Write every record which is waiting, and close the file
+        """
+        if self._file is not None:
+            try:
+                self.flush()
+            finally:
+                os.close(self._file)
+                self._file = None
+
+
+class JSONLinesWriter(ResultWriter):
+    """
+    Writes each record as a JSON object on its own line
+    """
+
+    def format(self, record):
+        return json.dumps(record, sort_keys=True) + "\n"
+
+
+class CSVWriter(ResultWriter):
+    """
+    Writes each record as a line of CSV, in the columns of :data:`CSV_COLUMNS`
+    """
+
+    def write_header(self):
+        """
+        Write the line of column names.  This is written straight away, rather than waiting with the records.
+        """
+        self._append(self._csv_line(CSV_COLUMNS))
+
+    def format(self, record):
+        cards = [CARD_SEPARATOR.join(names) for names in record['mulligan'] + record['played']]
+        values = [record['seed']] + record['decks'] + record['agents'] + [record['winner'], record['turns']]
+        return self._csv_line(values + record['health'] + cards)
+
+    @staticmethod
+    def _csv_line(values):
+        line = io.StringIO()
+        csv.writer(line, lineterminator="\n").writerow(values)
+        return line.getvalue()
+
+
+def open_results(filename, buffer_size=100, header=True):
+    """
+    Open a file to append game records to, in the format that matches its name.
+
+    :param str filename: The file to append to.  It is written as CSV if the name ends in ``.csv``, and as JSON lines
+                         otherwise.
+    :param int buffer_size: The most records to keep before writing them
+    :param bool header: Whether to write the line of column names to a CSV file which is empty
+    :rtype: ResultWriter
+    """
+    if filename.lower().endswith(".csv"):
+        writer = CSVWriter(filename, buffer_size)
+        if header and os.fstat(writer._file).st_size == 0:
+            writer.write_header()
+        return writer
+    return JSONLinesWriter(filename, buffer_size)
+
+
+def _csv_record(row):
+    def cards(column):
+        return row[column].split(CARD_SEPARATOR) if row[column] else []
+
+    return {
+        'seed': int(row['seed']),
+        'decks': [row['deck1'], row['deck2']],
+        'agents': [row['agent1'], row['agent2']],
+        'winner': int(row['winner']) if row['winner'] else None,
+        'turns': int(row['turns']),
+        'health': [int(row['health1']), int(row['health2'])],
+        'mulligan': [cards('mulligan1'), cards('mulligan2')],
+        'played': [cards('played1'), cards('played2')],
+    }
+
+
+def read_results(filename):
+    """
+    Read back the game records written to a file by :func:`open_results`, one at a time, so that files of any size
+    can be read.
+
+    :param str filename: The file to read.  It is read as CSV if the name ends in ``.csv``, and as JSON lines
+                         otherwise.
+    :return: A generator of the records, each a dict as made by :func:`game_record`
+    """
+    with open(filename, "r", newline="", encoding="utf-8") as results_file:
+        if filename.lower().endswith(".csv"):
+            for row in csv.DictReader(results_file):
+                yield _csv_record(row)
+        else:
+            for line in results_file:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,272 @@
+import multiprocessing
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from hearthbreaker.engine import _card_table
+from hearthbreaker.sim.results import read_results
+
+__doc__ = """
+Works out how often games are won when each card is played, and when each pair of cards is played together, from the
+game records written by :mod:`hearthbreaker.sim.results`.  For example: ::
+
+    stats = aggregate_results(["zoo_vs_patron.jsonl", "zoo_vs_handlock.jsonl"])
+    for first, second, synergy, games in stats.top_synergies(10, min_games=1000):
+        print(first, second, synergy)
+
+Every card has a fixed id (its position in :func:`card_names`), and the counts are kept in `NumPy
+<http://www.numpy.org/>`_ arrays indexed by those ids, so only the totals are ever held in memory.  The totals from
+different workers or files are added together with :meth:`CardStats.merge`.
+
+This module needs NumPy, which is not needed by the rest of Hearthbreaker.
+"""
+
+_card_names = []
+
+
+def card_names():
+    """
+    The name of every card, in the order of their ids
+
+    :rtype: list[str]
+    """
+    if not _card_names:
+        _card_names.extend(sorted(set(card_class().name for card_class in _card_table().values())))
+    return _card_names
+
+
+class CardStats:
+    """
+    The totals of which cards were played by each side of a number of games, and which of those sides won.
+
+    Each deck in each game counts once for every card it played, however many copies of the card it played.  A card
+    which was drawn but never played is not counted.  Cards that aren't in :func:`card_names` (which can only happen
+    if the records were made with a different set of cards) are left out, and counted in :attr:`unknown_cards`.
+    """
+
+    def __init__(self, batch_size=4096):
+        """
+        :param int batch_size: The number of sides of games to collect before adding them to the totals.  Larger
+                               batches are added more quickly, but take more memory while they are collected.
+        """
+        if numpy is None:
+            raise ImportError("Card statistics need NumPy to be installed")
+        self.names = card_names()
+        self.ids = dict((name, index) for index, name in enumerate(self.names))
+        size = len(self.names)
+        #: The number of sides of games counted
+        self.sides = 0
+        #: The number of those sides which won
+        self.wins = 0
+        #: The number of times a card was left out because it wasn't known
+        self.unknown_cards = 0
+        #: The number of sides which played each card
+        self.played = numpy.zeros(size, numpy.int64)
+        #: The number of sides which played each card and won
+        self.played_wins = numpy.zeros(size, numpy.int64)
+        #: The number of sides which played both of each pair of cards
+        self.pair_played = numpy.zeros((size, size), numpy.int64)
+        #: The number of sides which played both of each pair of cards and won
+        self.pair_wins = numpy.zeros((size, size), numpy.int64)
+
+        self.batch_size = batch_size
+        self._batch = numpy.zeros((batch_size, size), numpy.float32)
+        self._batch_won = numpy.zeros(batch_size, numpy.bool_)
+        self._batch_count = 0
+
+    def add_record(self, record):
+        """
+        Count one game.
+
+        :param dict record: A game record, as made by :func:`hearthbreaker.sim.results.game_record`
+        """
+        for index, cards in enumerate(record['played']):
+            ids = []
+            for name in set(cards):
+                card_id = self.ids.get(name)
+                if card_id is None:
+                    self.unknown_cards += 1
+                else:
+                    ids.append(card_id)
+            self._add_side(ids, record['winner'] == index)
+
+    def add_records(self, records):
+        """
+        Count a number of games.
+
+        :param records: An iterable of game records, such as the generator returned by
+                        :func:`hearthbreaker.sim.results.read_results`
+        :return: This object, for chaining
+        :rtype: CardStats
+        """
+        for record in records:
+            self.add_record(record)
+        self.flush()
+        return self
+
+    def _add_side(self, ids, won):
+        row = self._batch_count
+        self._batch[row, ids] = 1
+        self._batch_won[row] = won
+        self._batch_count += 1
+        self.sides += 1
+        if won:
+            self.wins += 1
+        if self._batch_count == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Add the sides collected so far to the totals.  Sides counted by :meth:`add_record` are only added to the
+        arrays of totals a batch at a time, so this must be called before reading them directly.
+
+        The pairs of cards played together are counted by multiplying the matrix of which cards each side played by
+        itself.
+        """
+        if self._batch_count == 0:
+            return
+        batch = self._batch[:self._batch_count]
+        won = batch[self._batch_won[:self._batch_count]]
+        self.played += batch.sum(axis=0).astype(numpy.int64)
+        self.played_wins += won.sum(axis=0).astype(numpy.int64)
+        self.pair_played += batch.T.dot(batch).astype(numpy.int64)
+        self.pair_wins += won.T.dot(won).astype(numpy.int64)
+        batch[:] = 0
+        self._batch_count = 0
+
+    def merge(self, other):
+        """
+        Add the totals from another :class:`CardStats` (such as one returned by a different worker) to this one.
+
+        :param CardStats other: The totals to add
+        :return: This object, for chaining
+        :rtype: CardStats
+        """
+        if other.names != self.names:
+            raise ValueError("Card statistics can only be merged if they have the same cards")
+        self.flush()
+        other.flush()
+        self.sides += other.sides
+        self.wins += other.wins
+        self.unknown_cards += other.unknown_cards
+        self.played += other.played
+        self.played_wins += other.played_wins
+        self.pair_played += other.pair_played
+        self.pair_wins += other.pair_wins
+        return self
+
+    def __getstate__(self):
+        # Only the totals are sent between processes, not the batch being collected
+        self.flush()
+        state = dict(self.__dict__)
+        del state['_batch']
+        del state['_batch_won']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._batch = numpy.zeros((self.batch_size, len(self.names)), numpy.float32)
+        self._batch_won = numpy.zeros(self.batch_size, numpy.bool_)
+
+    def win_rates(self, min_games=1):
+        """
+        Find the fraction of sides which won, out of those which played each card.
+
+        :param int min_games: The fewest sides a card must have been played by to be given a win rate
+        :return: An array of the win rate of each card, indexed by id.  Cards played by fewer than ``min_games``
+                 sides are NaN.
+        :rtype: numpy.ndarray
+        """
+        self.flush()
+        return self._rates(self.played_wins, self.played, min_games)
+
+    def pair_win_rates(self, min_games=1):
+        """
+        Find the fraction of sides which won, out of those which played both of each pair of cards.
+
+        :param int min_games: The fewest sides a pair of cards must have been played by to be given a win rate
+        :return: A matrix of the win rate of each pair of cards, indexed by their ids.  The diagonal holds the win
+                 rate of each card on its own.  Pairs played by fewer than ``min_games`` sides are NaN.
+        :rtype: numpy.ndarray
+        """
+        self.flush()
+        return self._rates(self.pair_wins, self.pair_played, min_games)
+
+    @staticmethod
+    def _rates(wins, games, min_games):
+        rates = numpy.full(games.shape, numpy.nan)
+        counted = games >= max(min_games, 1)
+        rates[counted] = wins[counted] / games[counted]
+        return rates
+
+    def synergy(self, min_games=1):
+        """
+        Find how much more often sides won when they played both of each pair of cards, than when they played either
+        card.  This is the win rate of the pair less the average of the win rates of the two cards.
+
+        :param int min_games: The fewest sides a pair of cards must have been played by to be given a synergy
+        :return: A matrix of the synergy of each pair of cards, indexed by their ids.  The diagonal is 0 for cards
+                 which have been played.  Pairs played by fewer than ``min_games`` sides are NaN.
+        :rtype: numpy.ndarray
+        """
+        rates = self.win_rates()
+        return self.pair_win_rates(min_games) - (rates[:, numpy.newaxis] + rates[numpy.newaxis, :]) / 2
+
+    def top_synergies(self, count=10, min_games=1):
+        """
+        Find the pairs of different cards with the highest :meth:`synergy`.
+
+        :param int count: The number of pairs to find
+        :param int min_games: The fewest sides a pair of cards must have been played by to be considered
+        :return: A list of the names of both cards, the synergy and the number of sides which played both, best first
+        :rtype: list[(str, str, float, int)]
+        """
+        synergy = self.synergy(min_games)
+        first, second = numpy.triu_indices(len(self.names), 1)
+        values = synergy[first, second]
+        counted = numpy.flatnonzero(~numpy.isnan(values))
+        best = counted[numpy.argsort(-values[counted], kind="mergesort")[:count]]
+        return [(self.names[first[index]], self.names[second[index]], float(values[index]),
+                 int(self.pair_played[first[index], second[index]])) for index in best]
+
+    def card_win_rates(self, min_games=1):
+        """
+        Find the win rate of every card which has been played by at least ``min_games`` sides.
+
+        :param int min_games: The fewest sides a card must have been played by
+        :return: The win rate and number of sides which played each card, keyed by the name of the card
+        :rtype: dict[str, (float, int)]
+        """
+        rates = self.win_rates(min_games)
+        return dict((self.names[index], (float(rates[index]), int(self.played[index])))
+                    for index in numpy.flatnonzero(~numpy.isnan(rates)))
+
+
+def _aggregate_file(filename):
+    return CardStats().add_records(read_results(filename))
+
+
+def aggregate_results(filenames, workers=None):
+    """
+    Count the games in a number of results files, reading each file in its own worker process.
+
+    :param list[str] filenames: The names of the files written by :func:`hearthbreaker.sim.results.open_results`
+    :param int workers: The number of worker processes to use.  Defaults to the number of cores on this machine.
+                        If 1, the files are read in the calling process.
+    :rtype: CardStats
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, len(filenames)))
+    stats = CardStats()
+    if workers == 1:
+        for filename in filenames:
+            stats.add_records(read_results(filename))
+        return stats
+
+    with multiprocessing.Pool(workers) as pool:
+        for file_stats in pool.imap_unordered(_aggregate_file, filenames):
+            stats.merge(file_stats)
+    return stats
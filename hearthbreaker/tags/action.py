@@ -68,7 +68,7 @@ class GiveAura(Action):
 
     def act(self, actor, target, other=None):
         for aura in self.auras:
-            target.add_aura(aura)
+            target.add_aura(copy.deepcopy(aura))
 
     def __to_json__(self):
         return {
@@ -96,7 +96,11 @@ class GiveEffect(Action):
 
     def act(self, actor, target, other=None):
         for effect in self.effects:
+            # The effects given are shared between every copy of the card, so the targets are fixed on a copy
+            effect = copy.deepcopy(effect)
+            effect.tags = [copy.copy(tag) for tag in effect.tags]
             for tag in effect.tags:
+                tag.actions = [copy.copy(action) for action in tag.actions]
                 for action in tag.actions:
                     if hasattr(action, "selector"):
                         action.selector = ConstantSelector([obj.born for obj in
@@ -211,6 +215,7 @@ class Transform(Action):
             target.replace(minion)
         elif target.is_hero():
             hero = card.create_hero(target.player)
+            hero.card = card
             target.replace(hero)
 
     def __to_json__(self):
@@ -302,8 +307,7 @@ class Discard(Action, metaclass=Amount):
                     actor.player.trigger("card_discarded", card)
                     card.unattach()
                 else:
-                    card.drawn = True
-                    actor.player.deck.left -= 1
+                    actor.player.deck.remove(card)
                     actor.player.trigger("card_discarded", card)
 
     def __to_json__(self):
@@ -323,6 +327,7 @@ class IncreaseArmor(Action, metaclass=Amount):
 
     def act(self, actor, target, other=None):
         target.armor += self.get_amount(actor, target, other)
+        target._hash_changed()
 
     def __to_json__(self):
         return {
@@ -372,7 +377,7 @@ class AddCard(Action):
                     card = self.card.get_card(target, target, actor)
                     target.game.selected_card = card
                     if card:
-                        card = copy.copy(card)
+                        card = card.copy()
                         target.hand.append(card)
                         card.attach(card, target)
 
@@ -406,8 +411,7 @@ class RemoveFromDeck(Action):
         card = self.card.get_card(target, target, actor)
         target.game.selected_card = card
         if card:
-            card.drawn = True
-            target.deck.left -= 1
+            target.deck.remove(card)
 
     def __to_json__(self):
         return {
@@ -691,6 +695,7 @@ class GiveManaCrystal(Action):
 class IncreaseDurability(Action):
     def act(self, actor, target, other=None):
         target.durability += 1
+        target._hash_changed()
 
     def __to_json__(self):
         return {
@@ -701,6 +706,7 @@ class IncreaseDurability(Action):
 class DecreaseDurability(Action):
     def act(self, actor, target, other=None):
             target.durability -= 1
+            target._hash_changed()
             if target.durability <= 0:
                 target.destroy()
 
@@ -716,6 +722,7 @@ class IncreaseWeaponAttack(Action, metaclass=Amount):
 
     def act(self, actor, target, other=None):
         target.base_attack += self.get_amount(actor, target, other)
+        target._hash_changed()
 
     def __to_json__(self):
         return {
@@ -728,6 +735,7 @@ class RemoveDivineShields(Action):
         from hearthbreaker.tags.status import DivineShield
         if target.divine_shield:
             target.buffs = [buff for buff in target.buffs if not isinstance(buff.status, DivineShield)]
+            target._hash_changed()
             target.divine_shield = 0
 
     def __to_json__(self):
@@ -800,6 +808,7 @@ class SwapStats(Action):
         if attribute == "damage":
             was_enraged = obj.enraged
             obj.health = max(0, obj.clculate_max_health() - value)
+            obj._hash_changed()
             if value > 0:
                 obj.enraged = True
                 if not was_enraged:
@@ -826,8 +835,8 @@ class Joust(Action):
         self.lose_action = lose_action
 
     def act(self, actor, target, other=None):
-        my_card = actor.game.random_draw(actor.player.deck.cards, lambda c: not c.drawn)
-        their_card = actor.game.random_draw(actor.player.opponent.deck.cards, lambda c: not c.drawn and c.is_minion())
+        my_card = actor.game.random_draw(actor.player.deck.undrawn_cards(), lambda c: True)
+        their_card = actor.game.random_draw(actor.player.opponent.deck.undrawn_cards(), lambda c: c.is_minion())
 
         if my_card and (not their_card or my_card.mana > their_card.mana):
             self.win_action.act(actor, target, other)
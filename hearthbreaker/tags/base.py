@@ -22,27 +22,155 @@ class JSONObject(metaclass=abc.ABCMeta):
         self.__init__(**kwargs)
         return self
 
+    #: Whether the result of :meth:`key` can be kept.  This must be False for any class whose JSON representation
+    #: changes after it has been created.
+    _keep_key = True
+
+    def key(self):
+        """
+        Build a tuple from the contents of this object, such that two objects have equal keys if and only if they
+        have the same JSON representation.  Unlike the JSON, the key is hashable, so it can be used to look objects
+        up in sets and dicts.
+
+        The key is kept once it has been worked out, unless this object or one of its parts can change.
+
+        :rtype: tuple
+        """
+        key = self.__dict__.get("_key")
+        if key is None:
+            key, keep = _key_for(self.__to_json__())
+            if keep and self._keep_key:
+                kept = _keys.get(key)
+                if kept is None:
+                    if len(_keys) >= 100000:
+                        _keys.clear()
+                    _keys[key] = key
+                else:
+                    key = kept
+                self._key = key
+        return key
+
     def eq(self, other):
-        return str(self) == str(other)
+        return isinstance(other, JSONObject) and self.key() == other.key()
+
+    def __copy__(self):
+        # A shallow copy is made to be changed, so it can't keep the key of the original
+        new = type(self).__new__(type(self))
+        new.__dict__.update(self.__dict__)
+        new.__dict__.pop("_key", None)
+        return new
 
     def __str__(self):
         return json.dumps(self.__to_json__(), default=lambda o: o.__to_json__(), sort_keys=True)
 
 
+# The keys which have been kept, so that equal keys are the same tuple, and compare without checking their contents.
+# It is cleared when it gets too big, as keys which were kept before then still compare equal, only more slowly.
+_keys = {}
+
+
+def _key_for(value):
+    """
+    Build the key for part of a JSON representation, along with whether it can be kept.
+    """
+    if isinstance(value, JSONObject):
+        key = value.key()
+        return key, "_key" in value.__dict__
+    if isinstance(value, dict):
+        parts = sorted((name, _key_for(item)) for name, item in value.items())
+        return tuple((name, key) for name, (key, keep) in parts), all(keep for name, (key, keep) in parts)
+    if isinstance(value, (list, tuple)):
+        parts = [_key_for(item) for item in value]
+        return tuple(key for key, keep in parts), all(keep for key, keep in parts)
+    if hasattr(value, "__to_json__"):
+        return _key_for(value.__to_json__())
+    # JSON tells apart 1, 1.0 and True, which are equal in Python
+    return (type(value), value), True
+
+
+class Immutable:
+    """
+    A mixin for the parts of a tag which never change once they have been created, such as selectors and conditions.
+    Deep copies of a tag share these parts with the original rather than duplicating them.  A subclass which does
+    change once it has been applied must override ``__deepcopy__`` to return a real copy, and make ``_keep_key``
+    False for as long as its JSON representation can change.
+    """
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+# The types of the parts of a tag which are shared by copies rather than copied.  The subclasses of
+# :class:`Immutable` which don't override ``__deepcopy__`` are added as they are found.
+_SHARED_TYPES = {int, float, bool, str, type(None)}
+
+
+def _copy_part(value, memo):
+    """
+    Copy a part of a tag for :meth:`Tag.__deepcopy__`.  Immutable parts are shared with the copy, and lists are copied
+    item by item, so that the machinery of :func:`copy.deepcopy` is only used for the parts that need it.
+    """
+    value_type = type(value)
+    if value_type in _SHARED_TYPES:
+        return value
+    if value_type is list:
+        return [_copy_part(item, memo) for item in value]
+    deepcopy = getattr(value_type, "__deepcopy__", None)
+    if deepcopy is Immutable.__deepcopy__:
+        _SHARED_TYPES.add(value_type)
+        return value
+    copied = memo.get(id(value))
+    if copied is None:
+        if deepcopy is None:
+            copied = copy.deepcopy(value, memo)
+        else:
+            copied = deepcopy(value, memo)
+    return copied
+
+
+def copy_tags(tags):
+    """
+    Copy a list of tags, such as the effects of a minion, for a copy of the object they belong to.  The copies have
+    no owner, and share their immutable parts with the originals.
+
+    :param list tags: The tags to copy, or None
+    :return: The copies, or None if ``tags`` is None
+    :rtype: list
+    """
+    if tags is None:
+        return None
+    memo = {}
+    return [tag.__deepcopy__(memo) for tag in tags]
+
+
 class Tag(JSONObject):
+    #: The attributes of this tag which can hold parts that change once it has been applied, and so are copied along
+    #: with it.  The rest of its parts are shared with its copies.  If None, every attribute is copied.
+    _copied_attributes = None
+
     def __deepcopy__(self, memo):
         cls = self.__class__
         new = cls.__new__(cls)
         memo[id(self)] = new
+        if self._copied_attributes is not None:
+            contents = new.__dict__ = self.__dict__.copy()
+            contents.pop("_key", None)
+            contents["owner"] = None
+            for attribute in self._copied_attributes:
+                contents[attribute] = _copy_part(contents[attribute], memo)
+            return new
+        contents = new.__dict__
         for attribute, value in self.__dict__.items():
-            if attribute != "owner":
-                setattr(new, attribute, copy.deepcopy(value, memo))
-            else:
-                setattr(new, attribute, None)
+            if attribute == "owner":
+                contents[attribute] = None
+            elif attribute != "_key":
+                contents[attribute] = _copy_part(value, memo)
         return new
 
 
 class Aura(Tag):
+    _copied_attributes = ("status",)
+
     def __init__(self, status, selector, condition=None, expires=False):
         self.owner = None
         self.status = status
@@ -68,6 +196,15 @@ class Aura(Tag):
         return (not self.condition or self.condition.evaluate(self.owner, self.owner)) and \
             self.selector.match(self.owner, obj)
 
+    @property
+    def board_independent(self):
+        """
+        True if the minions this aura matches can only change when a minion enters or leaves the board by that
+        minion itself being matched or not.  Auras which depend on adjacency or on how many minions there are must be
+        checked against every minion instead.
+        """
+        return (not self.condition or self.condition.board_independent) and self.selector.board_independent
+
     def __to_json__(self):
         if self.condition:
             return {
@@ -92,6 +229,8 @@ class Aura(Tag):
 
 
 class Buff(Tag):
+    _copied_attributes = ("status",)
+
     def __init__(self, status, condition=None):
         self.status = status
         self.condition = condition
@@ -134,6 +273,8 @@ class Buff(Tag):
 
 
 class BuffUntil(Buff):
+    _copied_attributes = ("status", "until")
+
     def __init__(self, status, until):
         super().__init__(status)
         self.until = until
@@ -163,6 +304,8 @@ class BuffUntil(Buff):
 
 
 class AuraUntil(Aura):
+    _copied_attributes = ("status", "until")
+
     def __init__(self, status, selector, until, expires=True):
         super().__init__(status, selector, None, expires)
         self.until = until
@@ -194,7 +337,10 @@ class AuraUntil(Aura):
         return AuraUntil(status, selector, until, expires)
 
 
-class Player(metaclass=abc.ABCMeta):
+class Player(Immutable, metaclass=abc.ABCMeta):
+    #: True if whether an object matches this player can't change when a minion enters or leaves the board
+    board_independent = False
+
     @abc.abstractmethod
     def get_players(self, target):
         pass
@@ -223,7 +369,7 @@ class Player(metaclass=abc.ABCMeta):
             return OtherPlayer()
 
 
-class Picker(JSONObject, metaclass=abc.ABCMeta):
+class Picker(Immutable, JSONObject, metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
     def pick(self, source, targets):
@@ -242,7 +388,10 @@ class Picker(JSONObject, metaclass=abc.ABCMeta):
             raise TypeError("What are you even doing?")
 
 
-class Selector(JSONObject, metaclass=abc.ABCMeta):
+class Selector(Immutable, JSONObject, metaclass=abc.ABCMeta):
+    #: True if whether a minion matches this selector can't change when another minion enters or leaves the board
+    board_independent = False
+
     @abc.abstractmethod
     def get_targets(self, source, target=None):
         pass
@@ -264,7 +413,7 @@ class Selector(JSONObject, metaclass=abc.ABCMeta):
         return obj.__from_json__(**kwargs)
 
 
-class Action(JSONObject, metaclass=abc.ABCMeta):
+class Action(Immutable, JSONObject, metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
     def act(self, actor, target, other=None):
@@ -280,7 +429,7 @@ class Action(JSONObject, metaclass=abc.ABCMeta):
         return obj.__from_json__(**kwargs)
 
 
-class Status(JSONObject, metaclass=abc.ABCMeta):
+class Status(Immutable, JSONObject, metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def act(self, actor, target):
         pass
@@ -351,6 +500,10 @@ class Amount(abc.ABCMeta):
 
 
 class Event(JSONObject, metaclass=abc.ABCMeta):
+    #: True for events which always bind their own ``__action__``, and so keep what they are bound to even when they
+    #: have no condition
+    _binds_itself = False
+
     def __init__(self, event_name, condition=None):
         self.event_name = event_name
         self.condition = condition
@@ -379,14 +532,17 @@ class Event(JSONObject, metaclass=abc.ABCMeta):
         return obj.__from_json__(**kwargs)
 
     def __deepcopy__(self, memo):
+        # An event only keeps what it is bound to when it has a condition to check, so one without can be shared
+        if not self.condition and not self._binds_itself:
+            return self
+        # Otherwise the copy shares the condition and the rest of the event, but not what it is bound to
         cls = type(self)
         new = cls.__new__(cls)
         memo[id(self)] = new
-        if self.condition:
-            new.condition = copy.deepcopy(self.condition, memo)
-        else:
-            new.condition = None
-        new.event_name = self.event_name
+        contents = new.__dict__ = self.__dict__.copy()
+        contents.pop("_key", None)
+        contents["__target__"] = None
+        contents["__func__"] = None
         return new
 
     def __from_json__(self, condition=None):
@@ -445,11 +601,6 @@ class PlayerEvent(Event):
             else:
                 player.unbind(self.event_name, func)
 
-    def __deepcopy__(self, memo):
-        new = super().__deepcopy__(memo)
-        new.player = copy.deepcopy(self.player, memo)
-        return new
-
     def __to_json__(self):
         super_json = super().__to_json__()
         super_json.update({
@@ -466,6 +617,9 @@ class PlayerEvent(Event):
 
 
 class Effect(Tag):
+    # The tags of an effect are never changed once it has been created, so its copies share the list of them
+    _copied_attributes = ("event",)
+
     def __init__(self, event, tags):
         self.event = event
         if isinstance(tags, list):
@@ -502,11 +656,24 @@ class Effect(Tag):
         return Effect(event, tags)
 
 
-class Condition(JSONObject, metaclass=abc.ABCMeta):
+class Condition(Immutable, JSONObject, metaclass=abc.ABCMeta):
+    #: True if whether a minion meets this condition can't change when another minion enters or leaves the board
+    board_independent = False
+
     @abc.abstractmethod
     def evaluate(self, target, *args):
         pass
 
+    def card_key(self, target):
+        """
+        Find the key that the collectible cards which meet this condition are filed under by
+        :func:`hearthbreaker.engine.collectible_cards`.
+
+        :param target: The object that the condition is being checked for
+        :return: The key, or None if this condition has to be checked against each card
+        """
+        return None
+
     @staticmethod
     def from_json(name, **kwargs):
         import hearthbreaker.tags.condition as action_mod
@@ -521,7 +688,7 @@ class Condition(JSONObject, metaclass=abc.ABCMeta):
         pass
 
 
-class ActionTag(Tag):
+class ActionTag(Immutable, Tag):
     def __init__(self, actions, selector, condition=None):
         if isinstance(actions, list):
             self.actions = actions
@@ -576,7 +743,7 @@ class Spell(ActionTag):
         super().__init__(actions, selector, condition)
 
 
-class CardQuery(JSONObject, metaclass=abc.ABCMeta):
+class CardQuery(Immutable, JSONObject, metaclass=abc.ABCMeta):
     def __init__(self):
         pass
 
@@ -638,7 +805,7 @@ class Choice(ActionTag):
         return Choice(card, actions, selector, condition)
 
 
-class Function(JSONObject, metaclass=abc.ABCMeta):
+class Function(Immutable, JSONObject, metaclass=abc.ABCMeta):
 
     def do(self, target, *args):
         pass
@@ -69,9 +69,9 @@ class DeckSource(CardSource):
     def get_list(self, target, player, owner):
         players = self.player.get_players(target)
         if len(players) == 1:
-            return filter(lambda c: not c.drawn, players[0].deck.cards)
+            return players[0].deck.undrawn_cards()
         else:
-            return filter(lambda c: not c.drawn, chain(players[0].deck.cards, players[1].deck.cards))
+            return chain(players[0].deck.undrawn_cards(), players[1].deck.undrawn_cards())
 
     def __to_json__(self):
         return {
@@ -134,7 +134,8 @@ class CardList(CardQuery):
         self.list = list
 
     def get_card(self, target, player, owner):
-        return player.game.random_choice(self.list)
+        # The cards in the list are shared by every copy of the game, so only the one chosen is copied
+        return player.game.random_choice(self.list).copy()
 
     def __to_json__(self):
         return [card.name for card in self.list]
@@ -149,6 +150,28 @@ class CollectionSource(CardSource):
     def __init__(self, conditions):
         self.conditions = conditions
 
+    def get_card(self, target, player, owner):
+        from hearthbreaker.engine import collectible_cards
+        keys = []
+        conditions = []
+        for condition in self.conditions:
+            key = condition.card_key(target)
+            if key is None:
+                conditions.append(condition)
+            else:
+                keys.append(key)
+
+        # The cards in the index are shared, so only the one chosen is copied
+        card_list = [card for card in collectible_cards(keys)
+                     if all(condition.evaluate(target, card) for condition in conditions)]
+        card_len = len(card_list)
+        if card_len == 1:
+            return card_list[0].copy()
+        elif card_len == 0:
+            return None
+        else:
+            return player.game.random_choice(card_list).copy()
+
     def get_list(self, target, player, owner):
         from hearthbreaker.engine import get_cards
         return get_cards()
@@ -17,6 +17,9 @@ class IsSecret(Condition):
     def evaluate(self, target, obj, *args):
         return obj.is_secret()
 
+    def card_key(self, target):
+        return ("secret",)
+
     def __to_json__(self):
         return {
             'name': 'is_secret'
@@ -27,6 +30,9 @@ class IsSpell(Condition):
     def evaluate(self, target, obj, *args):
         return obj.is_spell()
 
+    def card_key(self, target):
+        return ("spell",)
+
     def __to_json__(self):
         return {
             'name': 'is_spell'
@@ -71,6 +77,9 @@ class ManaCost(Condition, metaclass=Amount):
     def evaluate(self, target, obj, *args):
         return obj.mana == self.get_amount(target, target)
 
+    def card_key(self, target):
+        return ("mana", self.get_amount(target, target))
+
     def __to_json__(self):
         return {
             'name': 'mana_cost',
@@ -81,9 +90,14 @@ class ManaCost(Condition, metaclass=Amount):
 
 
 class IsMinion(Condition):
+    board_independent = True
+
     def evaluate(self, target, minion, *args):
         return minion.is_minion()
 
+    def card_key(self, target):
+        return ("minion",)
+
     def __to_json__(self):
         return {
             "name": 'is_minion'
@@ -104,6 +118,9 @@ class IsWeapon(Condition):
     def evaluate(self, target, weapon, *args):
         return weapon.is_weapon()
 
+    def card_key(self, target):
+        return ("weapon",)
+
     def __to_json__(self):
         return {
             "name": 'is_weapon'
@@ -131,6 +148,8 @@ class MinionIsTarget(Condition):
 
 
 class MinionIsNotTarget(Condition):
+    board_independent = True
+
     def evaluate(self, target, minion, *args):
         return minion is not target
 
@@ -192,6 +211,8 @@ class And(Condition):
 
 
 class IsType(Condition):
+    board_independent = True
+
     def __init__(self, minion_type, include_self=False):
         super().__init__()
         self.minion_type = minion_type
@@ -209,6 +230,9 @@ class IsType(Condition):
                 return minion.minion_type == self.minion_type
         return False
 
+    def card_key(self, target):
+        return ("minion_type", self.minion_type)
+
     def __to_json__(self):
         return {
             'name': 'is_type',
@@ -229,6 +253,9 @@ class IsClass(Condition, metaclass=Amount):
     def evaluate(self, target, card, *args):
         return card.character_class == self.get_amount(target, card, *args)
 
+    def card_key(self, target):
+        return ("character_class", self.get_amount(target, None))
+
     def __to_json__(self):
         return {
             'name': 'is_class'
@@ -294,6 +321,9 @@ class IsRarity(Condition):
         else:
             return minion.card.rarity == self.rarity
 
+    def card_key(self, target):
+        return ("rarity", self.rarity)
+
 
 class MinionCountIs(Condition):
     def __init__(self, count):
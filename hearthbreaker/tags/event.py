@@ -4,6 +4,8 @@ from hearthbreaker.tags.selector import FriendlyPlayer
 
 
 class SpellCast(PlayerEvent):
+    _binds_itself = True
+
     def __init__(self, condition=None, player=FriendlyPlayer()):
         super().__init__("spell_cast", condition, player)
 
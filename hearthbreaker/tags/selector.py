@@ -4,6 +4,8 @@ import hearthbreaker.tags.condition
 
 
 class FriendlyPlayer(Player):
+    board_independent = True
+
     def match(self, source, obj):
         return obj.player is source.player
 
@@ -15,6 +17,8 @@ class FriendlyPlayer(Player):
 
 
 class EnemyPlayer(Player):
+    board_independent = True
+
     def get_players(self, target):
         return [target.opponent]
 
@@ -26,6 +30,8 @@ class EnemyPlayer(Player):
 
 
 class BothPlayer(Player):
+    board_independent = True
+
     def match(self, source, obj):
         return True
 
@@ -124,6 +130,8 @@ class RandomPicker(Picker):
 
 
 class CardSelector(Selector, metaclass=abc.ABCMeta):
+    board_independent = True
+
     def __init__(self, players=FriendlyPlayer(), condition=None):
         self.players = players
         self.condition = condition
@@ -189,6 +197,8 @@ class LastDrawnSelector(CardSelector):
 
 
 class HeroSelector(Selector):
+    board_independent = True
+
     def __init__(self, players=FriendlyPlayer(), picker=AllPicker()):
         self.players = players
         self.picker = picker
@@ -219,6 +229,8 @@ class HeroSelector(Selector):
 
 
 class PlayerSelector(Selector):
+    board_independent = True
+
     def __init__(self, players=FriendlyPlayer()):
         self.players = players
 
@@ -260,6 +272,10 @@ class MinionSelector(Selector):
         possible_targets = self.get_targets(source, target)
         return self.picker.pick(source, possible_targets)
 
+    @property
+    def board_independent(self):
+        return (not self.condition or self.condition.board_independent) and self.players.board_independent
+
     def match(self, source, obj):
         if self.condition:
             return not obj.is_card() and obj.is_minion() and not obj.dead and self.players.match(source, obj)\
@@ -390,6 +406,8 @@ class CharacterSelector(Selector):
 
 
 class SelfSelector(Selector):
+    board_independent = True
+
     def get_targets(self, source, obj=None):
         return [source]
 
@@ -458,6 +476,8 @@ class TargetSelector(Selector):
 
 
 class WeaponSelector(Selector):
+    board_independent = True
+
     def __init__(self, players=FriendlyPlayer()):
         self.players = players
 
@@ -1,4 +1,6 @@
-from hearthbreaker.tags.base import Status, Amount
+import copy
+
+from hearthbreaker.tags.base import Status, Amount, Function
 
 
 class ChangeAttack(Status, metaclass=Amount):
@@ -33,6 +35,7 @@ class ChangeHealth(Status, metaclass=Amount):
             target.health_delta += self.amount
             if target.health > target.calculate_max_health():
                 target.health = target.calculate_max_health()
+        target._hash_changed()
 
     def unact(self, actor, target):
         if self.amount > 0:
@@ -43,6 +46,16 @@ class ChangeHealth(Status, metaclass=Amount):
             if target.calculate_max_health() == target.health:
                 target.health -= self.amount
             target.health_delta -= self.amount
+        target._hash_changed()
+
+    def __deepcopy__(self, memo):
+        # The amount is replaced each time the status is applied, so each copy needs its own
+        return copy.copy(self)
+
+    @property
+    def _keep_key(self):
+        # Applying the status replaces an amount worked out by a function with the number it gave
+        return not isinstance(self.amount, Function)
 
     def __to_json__(self):
         return {
@@ -190,9 +203,11 @@ class DivineShield(Status):
 class Frozen(Status):
     def act(self, actor, target):
         target.frozen += 1
+        target._hash_changed()
 
     def unact(self, actor, target):
         target.frozen -= 1
+        target._hash_changed()
 
     def __to_json__(self):
         return {
@@ -203,9 +218,11 @@ class Frozen(Status):
 class Immune(Status):
     def act(self, actor, target):
         target.immune += 1
+        target._hash_changed()
 
     def unact(self, actor, target):
         target.immune -= 1
+        target._hash_changed()
 
     def __to_json__(self):
         return {
@@ -366,7 +383,7 @@ class AttackEqualsHealth(Status):
     def unact(self, actor, target):
         target.calculate_attack = self._calculate_attack[target]
 
-    def __deep_copy__(self, memo):
+    def __deepcopy__(self, memo):
         return AttackEqualsHealth()
 
     def __copy__(self):
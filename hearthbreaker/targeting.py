@@ -1,67 +1,112 @@
-import copy
+import hearthbreaker.game_objects
+
+__doc__ = """
+Functions for finding the characters a card or power could target.
+
+Each function takes a game and a filter function, and returns the characters of one part of the board which the filter
+accepts.  Within one decision the same lists are asked for many times (by :meth:`Card.can_use
+<hearthbreaker.cards.base.Card.can_use>` for every card in hand, and again when the target is chosen), so they are
+kept on the game until it changes.  Anything which changes the board, stealth or whether a character can be targeted
+by spells also fires an event or adds or removes a buff, which bumps the stat epoch, so the lists are dropped whenever
+the epoch moves on or the turn passes to the other player.
+
+The lists handed out are shared, and must not be changed.
+"""
+
+# Filter functions whose answer only depends on state that bumps the stat epoch when it changes
+_cacheable_filters = set()
+
+
+def cacheable_filter(filter_function):
+    """
+    Mark a filter function as only depending on the board, stealth, whether a character can be targeted by spells and
+    whether it is dead, so that the targets it accepts can be kept along with the lists of characters.  Any other
+    filter function is run over the kept lists again on every call.
+
+    :param function filter_function: The function to mark
+    :return: The same function, so that this can be used as a decorator
+    """
+    _cacheable_filters.add(filter_function)
+    return filter_function
+
+
+@cacheable_filter
+def is_spell_targetable(target):
+    return target.spell_targetable()
+
+
+def _characters(game, area):
+    if area == "all":
+        return game.other_player.minions + game.current_player.minions + \
+            [game.other_player.hero, game.current_player.hero]
+    if area == "enemy":
+        return game.other_player.minions + [game.other_player.hero]
+    if area == "friendly":
+        return game.current_player.minions + [game.current_player.hero]
+    if area == "minions":
+        return game.other_player.minions + game.current_player.minions
+    if area == "enemy_minions":
+        return list(game.other_player.minions)
+    return list(game.current_player.minions)
+
+
+def _find(game, area, filter_function):
+    key = (hearthbreaker.game_objects._stat_epoch, game.current_player)
+    if game._target_cache_key != key:
+        game._target_cache = {}
+        game._target_cache_key = key
+    cache = game._target_cache
+    verify = hearthbreaker.game_objects.GameObject.verify_stat_cache
+
+    characters = cache.get(area)
+    if characters is None:
+        characters = cache[area] = _characters(game, area)
+    elif verify and characters != _characters(game, area):
+        raise hearthbreaker.game_objects.GameException("The cached characters in {0} are out of date".format(area))
+    if filter_function not in _cacheable_filters:
+        return [target for target in characters if filter_function(target)]
+
+    targets = cache.get((area, filter_function))
+    if targets is None:
+        targets = cache[(area, filter_function)] = [target for target in characters if filter_function(target)]
+    elif verify and targets != [target for target in characters if filter_function(target)]:
+        raise hearthbreaker.game_objects.GameException("The cached targets in {0} are out of date".format(area))
+    return targets
 
 
 def find_spell_target(game, filter_function):
-    targets = copy.copy(game.other_player.minions)
-    targets.extend(game.current_player.minions)
-    targets.append(game.other_player.hero)
-    targets.append(game.current_player.hero)
-
-    targets = [target for target in targets if filter_function(target)]
-    return targets
+    return _find(game, "all", filter_function)
 
 
 def find_enemy_spell_target(game, filter_function):
-    targets = copy.copy(game.other_player.minions)
-    targets.append(game.other_player.hero)
-
-    targets = [target for target in targets if filter_function(target)]
-    return targets
+    return _find(game, "enemy", filter_function)
 
 
 def find_friendly_spell_target(game, filter_function):
-    targets = copy.copy(game.current_player.minions)
-    targets.append(game.current_player.hero)
-
-    targets = [target for target in targets if filter_function(target)]
-    return targets
+    return _find(game, "friendly", filter_function)
 
 
 def find_minion_spell_target(game, filter_function):
-    targets = copy.copy(game.other_player.minions)
-    targets.extend(game.current_player.minions)
-
-    targets = [target for target in targets if filter_function(target)]
-    return targets
+    return _find(game, "minions", filter_function)
 
 
 def find_enemy_minion_spell_target(game, filter_function):
-    targets = copy.copy(game.other_player.minions)
-
-    targets = [target for target in targets if filter_function(target)]
-    return targets
+    return _find(game, "enemy_minions", filter_function)
 
 
 def find_friendly_minion_spell_target(game, filter_function):
-    targets = copy.copy(game.current_player.minions)
-
-    targets = [target for target in targets if filter_function(target)]
-    return targets
+    return _find(game, "friendly_minions", filter_function)
 
 
 def find_enemy_minion_battlecry_target(game, filter_function):
-    targets = copy.copy(game.other_player.minions)
-
-    targets = [target for target in targets if filter_function(target)]
+    targets = _find(game, "enemy_minions", filter_function)
     if len(targets) is 0:
         return None
     return targets
 
 
 def find_friendly_minion_battlecry_target(game, filter_function):
-    targets = copy.copy(game.current_player.minions)
-
-    targets = [target for target in targets if filter_function(target)]
+    targets = _find(game, "friendly_minions", filter_function)
     if len(targets) is 0:
         return None
     return targets
@@ -1,58 +1,39 @@
-import json
-from hearthbreaker.agents.basic_agents import RandomAgent
-from hearthbreaker.cards.heroes import hero_for_class
-from hearthbreaker.constants import CHARACTER_CLASS
-from hearthbreaker.engine import Game, Deck, card_lookup
-from hearthbreaker.cards import *
+import sys
 import timeit
+from hearthbreaker.sim import run_batch
 
 
-def load_deck(filename):
-    cards = []
-    character_class = CHARACTER_CLASS.MAGE
+def print_usage():
+    usage = """usage: python run_games.py deck1 deck2 [games] [workers] [agent1] [agent2] [results]
 
-    with open(filename, "r") as deck_file:
-        contents = deck_file.read()
-        items = contents.splitlines()
-        for line in items[0:]:
-            parts = line.split(" ", 1)
-            count = int(parts[0])
-            for i in range(0, count):
-                card = card_lookup(parts[1])
-                if card.character_class != CHARACTER_CLASS.ALL:
-                    character_class = card.character_class
-                cards.append(card)
-
-    if len(cards) > 30:
-        pass
-
-    return Deck(cards, hero_for_class(character_class))
+       deck1 and deck2 are the decks to be used by the players, in cockatrice format
+       games is the number of games to play (default 100000)
+       workers is the number of processes to play them in (default one per core)
+       agent1 and agent2 are the names of the agents to use (default Random)
+       results is a file to append a record of each game to, as CSV if it ends in .csv or JSON lines otherwise
+    """
+    print(usage)
 
 
 def do_stuff():
-    _count = 0
-
-    def play_game():
-        nonlocal _count
-        _count += 1
-        new_game = game.copy()
-        try:
-            new_game.start()
-        except Exception as e:
-            print(json.dumps(new_game.__to_json__(), default=lambda o: o.__to_json__(), indent=1))
-            print(new_game._all_cards_played)
-            raise e
-
-        del new_game
+    deck_files = sys.argv[1:3]
+    game_count = int(sys.argv[3]) if len(sys.argv) > 3 else 100000
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    agent_names = [sys.argv[5] if len(sys.argv) > 5 else "Random",
+                   sys.argv[6] if len(sys.argv) > 6 else "Random"]
+    results = sys.argv[7] if len(sys.argv) > 7 else None
+    result = None
 
-        if _count % 1000 == 0:
-            print("---- game #{} ----".format(_count))
+    def play_games():
+        nonlocal result
+        result = run_batch(deck_files, agent_names, game_count, workers, results=results)
 
-    deck1 = load_deck("mage.hsdeck")
-    deck2 = load_deck("mage2.hsdeck")
-    game = Game([deck1, deck2], [RandomAgent(), RandomAgent()])
+    print(timeit.timeit(play_games, number=1))
+    print("wins: {0[0]} - {0[1]}, draws: {1}".format(result.wins, result.draws))
 
-    print(timeit.timeit(play_game, 'gc.enable()', number=100000))
 
 if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print_usage()
+        sys.exit()
     do_stuff()
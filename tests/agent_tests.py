@@ -1,13 +1,19 @@
+import json
 import random
 import unittest
-from hearthbreaker.agents.basic_agents import RandomAgent
+from hearthbreaker.agents import registry
+from hearthbreaker.agents.basic_agents import RandomAgent, DoNothingAgent
+from hearthbreaker.agents.mcts_agent import MCTSAgent, _search
+from hearthbreaker.agents.transposition import TranspositionTable, LRU, DEPTH_PREFERRED
 from hearthbreaker.cards import GoldshireFootman, MurlocRaider, BloodfenRaptor, FrostwolfGrunt, RiverCrocolisk, \
     IronfurGrizzly, MagmaRager, SilverbackPatriarch, ChillwindYeti, SenjinShieldmasta, BootyBayBodyguard, \
     FenCreeper, BoulderfistOgre, WarGolem, Shieldbearer, FlameImp, YoungPriestess, DarkIronDwarf, DireWolfAlpha, \
     Voidwalker, HarvestGolem, KnifeJuggler, ShatteredSunCleric, ArgentSquire, Doomguard, Soulfire, DefenderOfArgus, \
-    AbusiveSergeant, NerubianEgg, KeeperOfTheGrove
+    AbusiveSergeant, NerubianEgg, KeeperOfTheGrove, MechanicalYeti, EmperorThaurissan
 from hearthbreaker.cards.heroes import Guldan, Malfurion
 from hearthbreaker.engine import Game, Deck
+from hearthbreaker.sim import load_deck
+from tests.testing_utils import generate_game_for
 
 
 class TestAgents(unittest.TestCase):
@@ -115,3 +121,118 @@ class TestAgents(unittest.TestCase):
         self.assertEqual(21, game.other_player.hero.health)
 
         self.assertTrue(game.game_ended)
+
+    def test_MCTSAgent(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        agent = MCTSAgent(iterations=8, time_limit=None, playout_turns=1)
+        game = Game([deck.copy() for deck in decks], [agent, RandomAgent()], 5)
+        game.start()
+        self.assertTrue(game.game_ended)
+        self.assertGreater(agent.decisions, 0)
+        self.assertGreater(agent.decisions_per_second, 0)
+        self.assertIsInstance(registry.create_agent("MCTS"), MCTSAgent)
+
+    def test_MCTSAgent_search(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        game = Game([deck.copy() for deck in decks], [RandomAgent(), RandomAgent()], 3)
+        game.pre_game()
+        game.current_player = game.players[1]
+        for turn in range(0, 6):
+            game.play_single_turn()
+        game._start_turn()
+        state = json.dumps(game.__to_json__(), default=lambda o: o.__to_json__(), sort_keys=True)
+        moves = game.legal_moves()
+
+        for workers in [1, 2]:
+            agent = MCTSAgent(iterations=6, time_limit=None, playout_turns=1, workers=workers)
+            self.assertIn(agent.choose_move(game, moves), moves)
+            self.assertEqual(state, json.dumps(game.__to_json__(), default=lambda o: o.__to_json__(), sort_keys=True))
+            pool = agent._pool
+            self.assertIn(agent.choose_move(game, moves), moves)
+            self.assertIs(pool, agent._pool)
+            agent.close()
+            self.assertIsNone(agent._pool)
+
+    def test_MCTSAgent_leaves_game(self):
+        game = generate_game_for(MechanicalYeti, BoulderfistOgre, DoNothingAgent, DoNothingAgent)
+        MechanicalYeti().summon(game.players[0], game, 0)
+        EmperorThaurissan().summon(game.players[0], game, 1)
+        BoulderfistOgre().summon(game.players[1], game, 0)
+        game.play_single_turn()
+        game.play_single_turn()
+        game._start_turn()
+        state = json.dumps(game.__to_json__(), default=lambda o: o.__to_json__(), sort_keys=True)
+
+        # Playouts which attack the Ogre with the Yeti get Spare Parts, which Emperor Thaurissan makes cheaper
+        agent = MCTSAgent(iterations=30, time_limit=None, playout_turns=1)
+        agent.choose_move(game, game.legal_moves())
+        self.assertEqual(state, json.dumps(game.__to_json__(), default=lambda o: o.__to_json__(), sort_keys=True))
+
+        game.players[0].minions[0].die(None)
+        game.check_delayed()
+        for player in game.players:
+            self.assertEqual([], player.hand[-1].buffs)
+            self.assertEqual(player.hand[-1].mana, player.hand[-1].mana_cost())
+
+    def test_MCTSAgent_hidden_hand(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        game = Game([deck.copy() for deck in decks], [RandomAgent(), RandomAgent()], 3)
+        game.pre_game()
+        game.current_player = game.players[1]
+        for turn in range(0, 6):
+            game.play_single_turn()
+        game._start_turn()
+
+        # The search can't see what the opponent is holding, so dealing them another hand changes nothing
+        other_game = game.copy()
+        opponent = other_game.other_player
+        opponent.redeal_hand()
+        self.assertNotEqual([card.name for card in game.other_player.hand], [card.name for card in opponent.hand])
+        self.assertEqual(_search(game, 10, None, 1, 0.7, 12, TranspositionTable()),
+                         _search(other_game, 10, None, 1, 0.7, 12, TranspositionTable()))
+
+    def test_MCTSAgent_table(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        game = Game([deck.copy() for deck in decks], [RandomAgent(), RandomAgent()], 3)
+        game.pre_game()
+        game.current_player = game.players[1]
+        for turn in range(0, 6):
+            game.play_single_turn()
+        game._start_turn()
+
+        table = TranspositionTable()
+        agent = MCTSAgent(iterations=40, time_limit=None, playout_turns=1, table=table)
+        agent.choose_move(game, game.legal_moves())
+        self.assertGreater(len(table), 0)
+        self.assertGreater(sum(entry.visits for entry in table._entries.values()), len(table))
+        self.assertIs(table, MCTSAgent(table=table).table)
+
+    def test_TranspositionTable(self):
+        table = TranspositionTable(max_entries=2, replacement=LRU)
+        table.store(1, 0.5)
+        table.store(2, 0.25)
+        self.assertEqual(0.5, table.lookup(1).value)
+        table.store(3, 1.0)
+        self.assertEqual(2, len(table))
+        self.assertIn(1, table)
+        self.assertNotIn(2, table)
+        self.assertEqual(0.75, table.add_value(1, 1.0))
+        self.assertEqual(2, table.lookup(1).visits)
+        self.assertEqual(1.0, table.add_value(4, 1.0))
+        self.assertNotIn(3, table)
+        self.assertIsNone(table.lookup(3))
+        self.assertEqual(2, table.misses)
+
+        table = TranspositionTable(max_entries=4, replacement=DEPTH_PREFERRED)
+        table.store(1, 0.5, depth=3)
+        self.assertIsNone(table.store(5, 0.25, depth=2))
+        self.assertEqual(0.5, table.lookup(1).value)
+        table.store(5, 0.25, move="move", depth=3)
+        self.assertNotIn(1, table)
+        self.assertEqual("move", table.lookup(5).move)
+        table.store(2, 0.5)
+        self.assertEqual(2, len(table))
+        table.clear()
+        self.assertEqual(0, len(table))
+        self.assertRaises(ValueError, TranspositionTable, 0)
+        self.assertRaises(ValueError, TranspositionTable, 10, "random")
@@ -1,5 +1,6 @@
 import unittest
-from hearthbreaker.cards import ArgentSquire, DireWolfAlpha, HarvestGolem, BloodfenRaptor, MagmaRager, Wisp, Ysera
+from hearthbreaker.cards import ArgentSquire, DireWolfAlpha, HarvestGolem, BloodfenRaptor, MagmaRager, Wisp, Ysera, \
+    ChillwindYeti, BoulderfistOgre
 from hearthbreaker.cards.spells.neutral import TheCoin
 from tests.agents.trade.test_helpers import TestHelpers
 from hearthbreaker.agents.trade.possible_play import PossiblePlays
@@ -95,6 +96,36 @@ class TestTradeAgentPlayCoinTests(TestCaseMixin, unittest.TestCase):
         names = [c.name for c in play.cards]
         self.assertEqual(names, ["Argent Squire"])
 
+    def test_coin_before_hero_power(self):
+        game = self.make_game()
+        cards = self.make_cards(game.current_player, ChillwindYeti(), TheCoin())
+        play = PossiblePlays(cards, 1).plays()[0]
+        self.assertEqual(["The Coin", "Hero Power"], [c.name for c in play.cards])
+        self.assertEqual("The Coin", play.first_card().name)
+
+
+class TestTradeAgentPlannerTests(TestCaseMixin, unittest.TestCase):
+    def test_distinct_plays(self):
+        game = self.make_game()
+        cards = self.make_cards(game.current_player, Wisp(), ArgentSquire(), ArgentSquire(), DireWolfAlpha(),
+                                DireWolfAlpha(), HarvestGolem(), HarvestGolem(), ChillwindYeti(), BoulderfistOgre(),
+                                TheCoin())
+        plays = PossiblePlays(cards, 10, allow_hero_power=False).plays()
+        keys = [tuple(sorted(c.name for c in play.cards)) for play in plays]
+        self.assertEqual(len(keys), len(set(keys)))
+        for play in plays:
+            self.assertGreaterEqual(play.wasted(), 0)
+            self.assertIn("Wisp", [c.name for c in play.cards])
+        self.assertEqual(["The Coin", "Wisp", "Argent Squire", "Chillwind Yeti", "Boulderfist Ogre"],
+                         [c.name for c in plays[0].cards])
+
+    def test_only_complete_plays(self):
+        game = self.make_game()
+        cards = self.make_cards(game.current_player, ArgentSquire(), DireWolfAlpha(), HarvestGolem())
+        names = sorted(sorted(c.name for c in play.cards) for play in PossiblePlays(cards, 3).plays())
+        self.assertEqual([["Argent Squire", "Dire Wolf Alpha"], ["Argent Squire", "Hero Power"], ["Harvest Golem"]],
+                         names)
+
 
 class TestTradeAgentHeroPowerTests(TestCaseMixin, unittest.TestCase):
     def test_will_use_hero_power_with_empty_hand(self):
@@ -1,5 +1,9 @@
 import unittest
+import gc
+import weakref
 from hearthbreaker.agents.trade.possible_play import PossiblePlays
+from hearthbreaker.agents.trade.trade import Trade, Trades
+from hearthbreaker.agents.trade.util import memoized
 from hearthbreaker.cards import Wisp, WarGolem, BloodfenRaptor, RiverCrocolisk, AbusiveSergeant, ArgentSquire
 from tests.agents.trade.test_helpers import TestHelpers
 from tests.agents.trade.test_case_mixin import TestCaseMixin
@@ -43,3 +47,47 @@ class TestTradeAgent(TestCaseMixin, unittest.TestCase):
         possible_plays = PossiblePlays(cards, 10, allow_hero_power=True)
 
         self.assertEqual(1, len(possible_plays.plays()))
+
+    def test_memoized(self):
+        class Counter:
+            def __init__(self):
+                self.calls = 0
+
+            @memoized
+            def square(self, number):
+                self.calls += 1
+                return number * number
+
+        Counter.square.reset_counts()
+        counter = Counter()
+        self.assertEqual(4, counter.square(2))
+        self.assertEqual(4, counter.square(2))
+        self.assertEqual(1, counter.calls)
+        self.assertEqual(1, Counter.square.hits)
+        self.assertEqual(1, Counter.square.misses)
+
+        other = Counter()
+        self.assertEqual(4, other.square(2))
+        self.assertEqual(1, other.calls)
+
+        for number in range(200):
+            counter.square(number)
+        self.assertEqual(Counter.square.max_size, len(Counter.square.cache_for(counter)))
+        counter.square(2)
+        self.assertEqual(201, counter.calls)
+
+    def test_trade_memo_released(self):
+        game = TestHelpers().make_game()
+        self.add_minions(game, 0, BloodfenRaptor())
+        self.add_minions(game, 1, Wisp(), WarGolem())
+        self.make_all_active(game)
+        player = game.players[0]
+        trades = Trades(player, player.minions, player.opponent.minions, player.opponent.hero)
+        trade = trades.trades()[0]
+        self.assertEqual(trade.value(), trade.value())
+        self.assertGreater(Trade.value.hits, 0)
+
+        kept = weakref.ref(trades)
+        del trades
+        gc.collect()
+        self.assertIsNone(kept())
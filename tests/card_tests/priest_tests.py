@@ -192,9 +192,8 @@ class TestPriest(unittest.TestCase):
         self.assertEqual("Mogu'shan Warden", game.players[0].minions[0].card.name)
 
         # Cheat
-        for index in range(0, 30):
-            game.players[1].deck.cards[index].drawn = True
-        game.players[1].deck.left = 0
+        for card in game.players[1].deck.undrawn_cards():
+            game.players[1].deck.remove(card)
 
         game.play_single_turn()
         game.play_single_turn()
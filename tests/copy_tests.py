@@ -5,7 +5,8 @@ import unittest
 from hearthbreaker.agents.basic_agents import DoNothingAgent, PredictableAgent
 from hearthbreaker.cards.base import MinionCard
 from hearthbreaker.constants import MINION_TYPE, CARD_RARITY
-from hearthbreaker.tags.status import ChangeAttack
+from hearthbreaker.tags.base import Buff
+from hearthbreaker.tags.status import ChangeAttack, ManaChange
 from tests.agents.testing_agents import CardTestingAgent, OneCardPlayingAgent, PlayAndAttackAgent, \
     EnemyMinionSpellTestingAgent, HeroPowerAndCardPlayingAgent
 from tests.card_tests.card_tests import TestUtilities
@@ -2227,6 +2228,24 @@ class TestMinionCopying(unittest.TestCase, TestUtilities):
         self.assertEqual(9, len(game.players[1].hand))
         self.assertSparePart(game.players[1].hand[-1])
 
+    def test_generated_card_buffs(self):
+        game = generate_game_for(MechanicalYeti, Fireball, OneCardPlayingAgent, OneCardPlayingAgent)
+
+        for turn in range(0, 7):
+            game.play_single_turn()
+
+        new_game = game.copy()
+        new_game.play_single_turn()
+        spare_part = new_game.players[0].hand[-1]
+        spare_part.add_buff(Buff(ManaChange(-1)))
+        self.assertEqual(spare_part.mana - 1, spare_part.mana_cost())
+
+        game.play_single_turn()
+        self.assertSparePart(game.players[0].hand[-1])
+        self.assertEqual(spare_part.name, game.players[0].hand[-1].name)
+        self.assertEqual(0, len(game.players[0].hand[-1].buffs))
+        self.assertEqual(spare_part.mana, game.players[0].hand[-1].mana_cost())
+
     def test_FelCannon(self):
         game = generate_game_for([FelCannon, BoulderfistOgre], [BloodfenRaptor, HarvestGolem, Deathwing],
                                  OneCardPlayingAgent, OneCardPlayingAgent)
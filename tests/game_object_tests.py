@@ -1,15 +1,25 @@
+import copy
 import random
 import unittest
 
-from hearthbreaker.agents.basic_agents import DoNothingAgent, PredictableAgent
-from hearthbreaker.cards.base import SecretCard
+from hearthbreaker.agents.basic_agents import DoNothingAgent, PredictableAgent, RandomAgent
+from hearthbreaker.cards.base import SecretCard, _is_spell_targetable
 from hearthbreaker.cards.heroes import Malfurion, Jaina
+from hearthbreaker.cards.minions.neutral import DireWolfAlpha, RaidLeader, StormwindChampion
 from hearthbreaker.cards.minions.rogue import AnubarAmbusher
-from hearthbreaker.engine import Game, Deck, card_lookup
+from hearthbreaker.constants import CARD_RARITY, CHARACTER_CLASS, MINION_TYPE
+from hearthbreaker.engine import Game, Deck, card_lookup, collectible_cards, get_cards
 from tests.agents.testing_agents import CardTestingAgent, OneCardPlayingAgent, PlayAndAttackAgent
-from tests.testing_utils import generate_game_for, mock
+from tests.testing_utils import describe_state, generate_game_for, mock
 from hearthbreaker.cards import StonetuskBoar, ArcaneIntellect, Naturalize, Abomination, NerubianEgg, SylvanasWindrunner
-from hearthbreaker.game_objects import Bindable
+from hearthbreaker.game_objects import Bindable, GameException, GameObject
+from hearthbreaker.serialization.move import TurnEndMove
+from hearthbreaker.sim import load_deck
+from hearthbreaker.tags.base import Buff
+import hearthbreaker.tags.base
+from hearthbreaker.tags.condition import IsClass, IsMinion, IsRarity, IsSecret, IsSpell, IsType, IsWeapon, ManaCost
+from hearthbreaker.tags.status import ChangeAttack, ChangeHealth, Stealth
+import hearthbreaker.targeting
 
 
 class TestGame(unittest.TestCase):
@@ -81,6 +91,424 @@ class TestGame(unittest.TestCase):
 
         game.start()
 
+    def test_seeded_game(self):
+        def play_seeded_game(seed):
+            deck1 = Deck([card_lookup("Stonetusk Boar") for i in range(0, 15)] +
+                         [card_lookup("Arcane Missiles") for i in range(0, 15)], Jaina())
+            deck2 = Deck([card_lookup("Novice Engineer") for i in range(0, 15)] +
+                         [card_lookup("Mad Bomber") for i in range(0, 15)], Malfurion())
+            random.seed(seed)  # The shared generator should have no effect on a seeded game
+            game = Game([deck1, deck2], [RandomAgent(), RandomAgent()], 0x5eed5eed5eed5eed)
+            game.start()
+            return [card.name for card in game._all_cards_played], \
+                [player.hero.health for player in game.players], game._turns_passed
+
+        self.assertEqual(play_seeded_game(1), play_seeded_game(2))
+
+    def test_deck_draw_and_put_back(self):
+        cards = [card_lookup("Stonetusk Boar") for i in range(0, 15)] + \
+                [card_lookup("Novice Engineer") for i in range(0, 15)]
+        deck = Deck(cards, Jaina())
+        game = Game([deck, Deck([card_lookup("Wisp") for i in range(0, 30)], Malfurion())],
+                    [DoNothingAgent(), DoNothingAgent()], 1857)
+
+        drawn = [deck.draw(game) for i in range(0, 10)]
+        deck.remove(deck.undrawn_cards()[3])
+        deck.put_back(drawn[0])
+        deck.put_back(card_lookup("Wisp"))
+        self.assertRaises(GameException, deck.put_back, deck.undrawn_cards()[0])
+        self.assertRaises(GameException, deck.remove, drawn[1])
+
+        self.assertEqual(21, deck.left)
+        self.assertEqual([card for card in deck.cards if not card.drawn], deck.undrawn_cards())
+        self.assertEqual("Wisp", deck.undrawn_cards()[-1].name)
+        self.assertEqual(21, len([entry for entry in deck.__to_json__() if not entry['used']]))
+
+        copied = deck.copy()
+        self.assertEqual([card.name for card in deck.undrawn_cards()], [card.name for card in copied.undrawn_cards()])
+        while deck.can_draw():
+            deck.draw(game)
+        self.assertEqual([], deck.undrawn_cards())
+        self.assertEqual(21, copied.left)
+
+    def test_deck_copy_shares_cards(self):
+        deck = Deck([card_lookup("Stonetusk Boar") for i in range(0, 30)], Jaina())
+        game = Game([deck, Deck([card_lookup("Wisp") for i in range(0, 30)], Malfurion())],
+                    [DoNothingAgent(), DoNothingAgent()], 1857)
+        originals = list(deck.cards)
+
+        copied = deck.copy()
+        for original, card in zip(originals, copied.cards):
+            self.assertIs(original, card)
+
+        card = copied.draw(game)
+        self.assertTrue(card.drawn)
+        self.assertNotIn(card, originals)
+        self.assertEqual(30, deck.left)
+        self.assertEqual(29, copied.left)
+        self.assertFalse(any(original.drawn for original in originals))
+
+        for original, card in zip(originals, deck.undrawn_cards()):
+            self.assertIsNot(original, card)
+
+    def test_copy_shares_tag_parts(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        player = game.players[0]
+        for name in ["Knife Juggler", "Mana Wyrm", "Flesheating Ghoul", "Goldshire Footman"]:
+            card_lookup(name).summon(player, game, len(player.minions))
+        juggler, wyrm, ghoul, footman = player.minions
+        health = game.players[1].hero.health
+
+        copied = game.copy()
+        other_copy = game.copy()
+        copies = list(copied.players[0].minions)
+        for original, minion, other in zip(player.minions, copies, other_copy.players[0].minions):
+            for attribute in ["events", "delayed", "_stat_cache", "effects", "auras", "buffs", "deathrattle",
+                              "enrage"]:
+                self.assertIsNot(getattr(original, attribute), getattr(minion, attribute))
+                self.assertIsNot(getattr(other, attribute), getattr(minion, attribute))
+            for tag, copied_tag in zip(original.effects + original.buffs, minion.effects + minion.buffs):
+                self.assertIsNot(tag, copied_tag)
+                self.assertIs(original, tag.owner)
+                self.assertIs(minion, copied_tag.owner)
+
+        # Effects share their actions, and events unless they keep what they are bound to
+        for original, minion in zip([juggler, wyrm, ghoul], copies):
+            self.assertIs(original.effects[0].tags, minion.effects[0].tags)
+        self.assertIsNot(juggler.effects[0].event, copies[0].effects[0].event)
+        self.assertIs(juggler.effects[0].event.condition, copies[0].effects[0].event.condition)
+        self.assertIsNot(wyrm.effects[0].event, copies[1].effects[0].event)
+        self.assertIs(ghoul.effects[0].event, copies[2].effects[0].event)
+        self.assertIs(footman.buffs[0].status, copies[3].buffs[0].status)
+
+        # Each game only sees its own minions' effects
+        card_lookup("Wisp").summon(copied.players[0], copied, 0)
+        copied.players[0].trigger("card_played", card_lookup("Arcane Explosion"), 0)
+        copied.players[0].minions[0].die(None)
+        copied.check_delayed()
+        self.assertEqual(health - 1, copied.players[1].hero.health)
+        self.assertEqual(health, game.players[1].hero.health)
+        self.assertEqual(2, copies[1].calculate_attack())
+        self.assertEqual(1, wyrm.calculate_attack())
+        self.assertEqual(3, copies[2].calculate_attack())
+        self.assertEqual(2, ghoul.calculate_attack())
+
+    def test_card_lookup(self):
+        for card in get_cards():
+            self.assertIs(type(card), type(card_lookup(card.ref_name)))
+        self.assertEqual("Eviscerate", card_lookup("Eviscerate").name)
+        self.assertEqual("Silver Hand Recruit", card_lookup("Silver Hand Recruit").ref_name)
+        self.assertRaises(KeyError, card_lookup, "Not a Card")
+
+    def test_collectible_card_index(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        target = game.players[0].hero
+        for conditions in [[IsMinion()], [ManaCost(2), IsMinion()], [IsRarity(CARD_RARITY.LEGENDARY), IsMinion()],
+                           [IsType(MINION_TYPE.BEAST)], [IsWeapon()], [IsSecret()],
+                           [IsClass(CHARACTER_CLASS.MAGE), IsSpell()]]:
+            expected = [card.name for card in get_cards()
+                        if all(condition.evaluate(target, card) for condition in conditions)]
+            found = [card.name for card in collectible_cards([condition.card_key(target) for condition in conditions])]
+            self.assertNotEqual([], found)
+            self.assertEqual(expected, found)
+
+    def test_tag_keys(self):
+        tags = []
+        for card in get_cards():
+            tags.extend(card.effects)
+            tags.extend(card.buffs)
+            if card.is_minion():
+                tags.extend(card.battlecry)
+                minion = card.create_minion(None)
+                tags.extend(minion.effects + minion.auras + minion.buffs + (minion.deathrattle or []))
+        tags.append(Buff(ChangeHealth(2)))
+        tags.append(Buff(ChangeHealth(2.0)))
+        names = [str(tag) for tag in tags]
+        keys = [tag.key() for tag in tags]
+        by_key = {}
+        for name, key in zip(names, keys):
+            self.assertEqual(name, by_key.setdefault(key, name))
+        self.assertEqual(len(set(names)), len(by_key))
+        self.assertTrue(tags[0].eq(copy.deepcopy(tags[0])))
+        self.assertFalse(tags[-1].eq(tags[-2]))
+
+    def test_tag_keys_bounded(self):
+        kept = Buff(ChangeHealth(3)).key()
+        with mock.patch.dict("hearthbreaker.tags.base._keys", {(index,): (index,) for index in range(100000)}):
+            key = Buff(ChangeHealth(12345)).key()
+            self.assertLess(len(hearthbreaker.tags.base._keys), 10)
+            self.assertIs(key, hearthbreaker.tags.base._keys[key])
+            self.assertIs(key, Buff(ChangeHealth(12345)).key())
+            self.assertEqual(kept, Buff(ChangeHealth(3)).key())
+
+    def test_aura_index(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        player = game.players[0]
+        self.assertEqual([], player.auras_for(ChangeAttack))
+
+        RaidLeader().summon(player, game, 0)
+        StormwindChampion().summon(player, game, 1)
+        self.assertEqual(2, len(player.auras_for(ChangeAttack)))
+        self.assertEqual(1, len(player.auras_for(ChangeHealth)))
+        self.assertEqual([aura for aura in player.object_auras if isinstance(aura.status, ChangeAttack)],
+                         player.auras_for(ChangeAttack))
+        self.assertEqual(3, player.minions[0].calculate_attack())
+
+        player.minions[0].silence()
+        self.assertEqual(1, len(player.auras_for(ChangeAttack)))
+        self.assertEqual(1, len(player.auras_for(ChangeHealth)))
+        self.assertEqual(3, player.minions[0].calculate_attack())
+        self.assertEqual(6, player.minions[1].calculate_attack())
+
+        player.minions[1].die(None)
+        game.check_delayed()
+        self.assertEqual([], player.auras_for(ChangeAttack))
+        self.assertEqual([], player.auras_for(ChangeHealth))
+        self.assertEqual(2, player.minions[0].calculate_attack())
+
+    def test_board_auras(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        player = game.players[0]
+        RaidLeader().summon(player, game, 0)
+        StonetuskBoar().summon(player, game, 1)
+        DireWolfAlpha().summon(player, game, 1)
+        self.assertTrue(player.minions[0].auras[0].board_independent)
+        self.assertFalse(player.minions[1].auras[0].board_independent)
+        self.assertEqual([3, 3, 3], [minion.calculate_attack() for minion in player.minions])
+
+        StonetuskBoar().summon(player, game, 1)
+        self.assertEqual([2, 3, 3, 3], [minion.calculate_attack() for minion in player.minions])
+
+        player.minions[2].die(None)
+        game.check_delayed()
+        self.assertEqual([2, 2, 2], [minion.calculate_attack() for minion in player.minions])
+
+    def test_legal_moves(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        game._start_turn()
+
+        def moves():
+            return [move.to_output_string() for move in game.legal_moves()]
+
+        self.assertEqual(['summon(0,0)', 'summon(1,0)', 'summon(2,0)', 'summon(3,0)', 'end()'], moves())
+        game.apply_move(game.legal_moves()[0])
+        self.assertEqual(['attack(p1:0,p2)', 'end()'], moves())
+        game.apply_move(game.legal_moves()[0])
+        self.assertEqual(29, game.players[1].hero.health)
+        self.assertEqual(['end()'], moves())
+
+        game.apply_move(game.legal_moves()[0])
+        self.assertEqual(game.players[1], game.current_player)
+        self.assertEqual(['summon(0,0)', 'summon(1,0)', 'summon(2,0)', 'summon(3,0)', 'play(4)', 'summon(5,0)',
+                          'end()'], moves())
+        self.assertIs(game.legal_moves()[0], game.legal_moves()[0])
+        game.apply_move(game.legal_moves()[0])
+        game.apply_move(game.legal_moves()[0])
+        self.assertEqual(['summon(0,0)', 'summon(0,1)', 'summon(1,0)', 'summon(1,1)', 'summon(2,0)', 'summon(2,1)',
+                          'summon(3,0)', 'summon(3,1)', 'attack(p2:0,p1:0)', 'attack(p2:0,p1)', 'end()'], moves())
+
+        game.current_player.mana = 2
+        self.assertEqual(['power(p1:0)', 'power(p2:0)', 'power(p1)', 'power(p2)', 'end()'], moves()[-5:])
+
+    def test_legal_moves_follow_game_state(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        other_game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        game._start_turn()
+        game.apply_move(game.legal_moves()[-1])
+        game.apply_move(game.legal_moves()[0])
+        moves = game.legal_moves()
+        self.assertEqual(['play(3)', 'attack(p2:0,p1)', 'end()'], [move.to_output_string() for move in moves])
+
+        # Playing another game doesn't change this one, so its moves are kept
+        other_game._start_turn()
+        other_game.apply_move(other_game.legal_moves()[0])
+        for move, kept in zip(moves, game.legal_moves()):
+            self.assertIs(move, kept)
+
+        # The Coin only changes the hand and mana, so the attack is kept while the cards are looked at again
+        game.apply_move(moves[0])
+        new_moves = game.legal_moves()
+        summons = ['summon(0,0)', 'summon(0,1)', 'summon(1,0)', 'summon(1,1)', 'summon(2,0)', 'summon(2,1)',
+                   'summon(3,0)', 'summon(3,1)']
+        self.assertEqual(summons + ['attack(p2:0,p1)', 'end()'], [move.to_output_string() for move in new_moves])
+        self.assertIs(moves[1], new_moves[-2])
+
+        attacked = game.copy()
+        attacked.apply_move(new_moves[-2])
+        self.assertEqual(summons + ['end()'], [move.to_output_string() for move in attacked.legal_moves()])
+        self.assertEqual([move.to_output_string() for move in new_moves],
+                         [move.to_output_string() for move in game.legal_moves()])
+
+    def test_apply_legal_moves(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        for seed in range(0, 3):
+            game = Game([deck.copy() for deck in decks], [RandomAgent(), RandomAgent()], seed)
+            game.pre_game()
+            game.current_player = game.players[1]
+            game._start_turn()
+            while not game.game_ended:
+                moves = game.legal_moves()
+                self.assertIsInstance(moves[-1], TurnEndMove)
+                player = game.current_player
+                found = game._find_card_moves(player) + game._find_attack_moves(player) + \
+                    game._find_power_moves(player) + [TurnEndMove()]
+                self.assertEqual([move.to_output_string() for move in found],
+                                 [move.to_output_string() for move in moves])
+                if game._turns_passed % 5 == 0:
+                    for move in moves:
+                        game.copy().apply_move(move)
+                game.apply_move(moves[game.random.randint(0, len(moves) - 1)])
+            self.assertEqual([], game.legal_moves())
+
+    def test_state_hash(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        game = Game([deck.copy() for deck in decks], [RandomAgent(), RandomAgent()], 0)
+        game.pre_game()
+        game.current_player = game.players[1]
+        game._start_turn()
+        hashes = {}
+        descriptions = {}
+
+        def check_hash(game):
+            state = game.state_hash()
+            description = describe_state(game)
+            self.assertEqual(hashes.setdefault(description, state), state)
+            self.assertEqual(descriptions.setdefault(state, description), description)
+            return state
+
+        Game.verify_state_hash = True
+        try:
+            while not game.game_ended:
+                state = check_hash(game)
+                self.assertEqual(state, game.copy().state_hash())
+                moves = game.legal_moves()
+                if game._turns_passed % 3 == 0:
+                    for move in moves:
+                        explored = game.copy()
+                        explored.apply_move(move)
+                        check_hash(explored)
+                    self.assertEqual(state, check_hash(game))
+                game.apply_move(moves[game.random.randint(0, len(moves) - 1)])
+        finally:
+            Game.verify_state_hash = False
+        self.assertGreater(len(hashes), 50)
+
+    def test_verify_state_hash(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        deck = game.players[0].deck
+        state = game.state_hash()
+
+        # Changing the deck directly skips updating its hash, which the debug mode catches
+        deck._undrawn.pop()
+        self.assertEqual(state, game.state_hash())
+        Game.verify_state_hash = True
+        try:
+            self.assertRaises(GameException, game.state_hash)
+            deck._hash = deck._compute_hash()
+            self.assertNotEqual(state, game.state_hash())
+        finally:
+            Game.verify_state_hash = False
+
+    def test_verify_kept_state_hash(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        for turn in range(4):
+            game.play_single_turn()
+        minion = StonetuskBoar().summon(game.players[0], game, 0)
+        state = game.state_hash()
+
+        # Changing a minion without telling its player leaves their kept hash of the board alone
+        minion.health = 5
+        self.assertEqual(state, game.state_hash())
+        Game.verify_state_hash = True
+        try:
+            self.assertRaises(GameException, game.state_hash)
+            minion._hash_changed()
+            self.assertNotEqual(state, game.state_hash())
+            state = game.state_hash()
+
+            # The hash of a copy starts from the parts kept by the original
+            copied = game.copy()
+            self.assertEqual(game.players[0]._hash_kept.keys(), copied.players[0]._hash_kept.keys())
+            self.assertEqual(state, copied.state_hash())
+            copied.players[0].minions[0].damage(1, None)
+            self.assertNotEqual(state, copied.state_hash())
+            self.assertEqual(state, game.state_hash())
+
+            # A list assigned in place of one of the player's own can't be kept track of, so it is hashed each time
+            game.players[1].secrets = []
+            self.assertEqual(state, game.state_hash())
+            game.players[1].secrets.append(card_lookup("Snipe"))
+            self.assertNotEqual(state, game.state_hash())
+        finally:
+            Game.verify_state_hash = False
+
+    def test_redeal_hand(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        game = Game([deck.copy() for deck in decks], [RandomAgent(), RandomAgent()], 0)
+        game.pre_game()
+        player = [player for player in game.players if "The Coin" in [card.name for card in player.hand]][0]
+        viewer = player.opponent
+        coin = player.hand.index([card for card in player.hand if card.name == "The Coin"][0])
+
+        def held_cards():
+            return sorted([card.name for card in player.hand] + [card.name for card in player.deck.undrawn_cards()])
+
+        cards = held_cards()
+        hand = [card.name for card in player.hand]
+        state = game.state_hash(viewer)
+        player.redeal_hand()
+        self.assertEqual(len(hand), len(player.hand))
+        self.assertNotEqual(hand, [card.name for card in player.hand])
+        self.assertEqual("The Coin", player.hand[coin].name)
+        self.assertEqual(cards, held_cards())
+        self.assertEqual(30 - len(hand) + 1, player.deck.left)
+        self.assertEqual(game._compute_state_hash(), game.state_hash())
+        self.assertEqual(state, game.state_hash(viewer))
+        for card in player.hand:
+            self.assertIs(player, card.player)
+
+    def test_target_cache(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        game._start_turn()
+        enemy = game.other_player
+        StonetuskBoar().summon(enemy, game, 0)
+        targets = hearthbreaker.targeting.find_spell_target(game, hearthbreaker.targeting.is_spell_targetable)
+        self.assertEqual([enemy.minions[0], enemy.hero, game.current_player.hero], targets)
+        self.assertIs(targets, hearthbreaker.targeting.find_spell_target(game,
+                                                                         hearthbreaker.targeting.is_spell_targetable))
+
+        enemy.minions[0].add_buff(Buff(Stealth()))
+        self.assertEqual([enemy.hero, game.current_player.hero],
+                         hearthbreaker.targeting.find_spell_target(game, hearthbreaker.targeting.is_spell_targetable))
+        StonetuskBoar().summon(enemy, game, 1)
+        self.assertEqual([enemy.minions[1]],
+                         hearthbreaker.targeting.find_enemy_minion_spell_target(game, lambda t: not t.stealth))
+        enemy.minions[1].die(None)
+        self.assertEqual([], hearthbreaker.targeting.find_minion_spell_target(game, _is_spell_targetable))
+
+    def test_stat_cache(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        player = game.players[0]
+        RaidLeader().summon(player, game, 0)
+        minion = player.minions[0]
+        self.assertEqual(2, minion.calculate_attack())
+
+        minion.change_attack(2)
+        self.assertEqual(4, minion.calculate_attack())
+        StormwindChampion().summon(player, game, 1)
+        self.assertEqual(5, minion.calculate_attack())
+
+        # Changing the buffs directly skips invalidation, which the debug mode catches
+        minion.buffs.append(Buff(ChangeAttack(1)))
+        self.assertEqual(5, minion.calculate_attack())
+        GameObject.verify_stat_cache = True
+        try:
+            self.assertRaises(GameException, minion.calculate_attack)
+            GameObject.invalidate_stats()
+            self.assertEqual(6, minion.calculate_attack())
+        finally:
+            GameObject.verify_stat_cache = False
+
     def test_secrets(self):
         for secret_type in SecretCard.__subclasses__():
             random.seed(1857)
@@ -191,3 +619,28 @@ class TestBinding(unittest.TestCase):
         binder.trigger("test")
         event.assert_called_once_with(1, 5, 6)
         self.assertEqual(event2.call_count, 2)
+
+    def test_bind_during_trigger(self):
+        calls = []
+        binder = Bindable()
+
+        def first():
+            calls.append("first")
+            binder.unbind("test", second)
+            binder.bind("test", third)
+
+        def second():
+            calls.append("second")
+
+        def third():
+            calls.append("third")
+
+        binder.bind("test", first)
+        binder.bind_once("test", second)
+        binder.trigger("test")
+        self.assertEqual(["first", "second"], calls)
+        binder.unbind("test", first)
+        binder.trigger("test")
+        self.assertEqual(["first", "second", "third"], calls)
+        binder.unbind("test", third)
+        self.assertEqual({}, binder.events)
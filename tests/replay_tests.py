@@ -1,4 +1,5 @@
 import json
+import os
 import unittest
 from io import StringIO
 from os import listdir
@@ -8,7 +9,8 @@ import random
 from hearthbreaker.cards.heroes import Malfurion, Jaina
 from hearthbreaker.engine import Game, Deck
 
-from hearthbreaker.replay import Replay, record, playback
+from hearthbreaker.replay import Replay, record, playback, replay_schema, ReplayReader
+import hearthbreaker.replay
 from hearthbreaker.agents.basic_agents import PredictableAgent, RandomAgent
 from hearthbreaker.constants import CHARACTER_CLASS
 from hearthbreaker.cards import *
@@ -202,10 +204,101 @@ class TestReplay(unittest.TestCase):
                     files.append(folder_name + "/" + file)
                 elif isdir(folder_name + "/" + file):
                     get_files_from(folder_name + "/" + file)
-        with open("replay.schema.json", "r") as schema_file:
+        with open("hearthbreaker/replay.schema.json", "r") as schema_file:
             schema = json.load(schema_file)
             get_files_from("tests/replays")
             for rfile in files:
                 with open(rfile, "r") as replay_file:
                     replay_json = json.load(replay_file)
                     validate(replay_json, schema)
+
+    def test_cached_validator(self):
+        from jsonschema import ValidationError
+        with open("tests/replays/example.hsreplay", "r") as replay_file:
+            replay_json = json.load(replay_file)
+
+        directory = os.getcwd()
+        os.chdir("tests")
+        try:
+            self.assertIs(replay_schema(), Replay().schema)
+        finally:
+            os.chdir(directory)
+        self.assertIs(hearthbreaker.replay._replay_validator(), hearthbreaker.replay._replay_validator())
+
+        replay_json['moves'][0]['name'] = 'jump'
+        self.assertRaises(ValidationError, Replay, StringIO(json.dumps(replay_json)))
+        replay_json['moves'][0]['name'] = 'start'
+        card = replay_json['moves'][1].pop('card')
+        self.assertRaises(ValidationError, Replay, StringIO(json.dumps(replay_json)))
+        replay_json['moves'][1]['card'] = card
+
+        replay_json['header']['random'] = "not random"
+        replay = Replay(StringIO(json.dumps(replay_json)), trusted=True)
+        self.assertEqual("not random", replay.random)
+
+    def test_streaming_replay(self):
+        def recorded_game(stream=None):
+            deck1 = hearthbreaker.engine.Deck([RagnarosTheFirelord() for i in range(0, 30)], Jaina())
+            deck2 = hearthbreaker.engine.Deck([StonetuskBoar() for i in range(0, 30)], Malfurion())
+            random.seed(4879)
+            game = Game([deck1, deck2], [PlayAndAttackAgent(), OneCardPlayingAgent()])
+            replay = record(game, stream)
+            game.pre_game()
+            for turn in range(0, 17):
+                game.play_single_turn()
+                if stream is not None:
+                    self.assertEqual(1, len(replay._moves))
+            return replay
+
+        output = StringIO()
+        recorded_game().write_json(output)
+
+        stream = StringIO()
+        with recorded_game(stream) as replay:
+            lines = stream.getvalue().splitlines()
+            self.assertEqual(replay.moves_written + 1, len(lines))
+            self.assertEqual(1, len(replay._moves))
+        self.assertEqual(replay.moves_written + 1, len(stream.getvalue().splitlines()))
+        self.assertNotIn(" ", stream.getvalue().splitlines()[1])
+
+        streamed = Replay()
+        streamed.read_json_lines(StringIO(stream.getvalue()))
+        streamed_output = StringIO()
+        streamed.write_json(streamed_output)
+        self.assertEqual(output.getvalue(), streamed_output.getvalue())
+
+        random.seed(4879)
+        new_game = playback(streamed)
+        new_game.pre_game()
+        for turn in range(0, 17):
+            new_game.play_single_turn()
+        self.assertEqual(2, len(new_game.current_player.minions))
+        self.assertEqual(30, new_game.other_player.hero.health)
+        self.assertEqual(5, len(new_game.other_player.minions))
+
+    def test_replay_reader(self):
+        from jsonschema import ValidationError
+        from hearthbreaker.serialization.move import TurnStartMove
+        game = Game([StackedDeck([StonetuskBoar()], CHARACTER_CLASS.HUNTER),
+                     StackedDeck([StonetuskBoar()], CHARACTER_CLASS.MAGE)], [RandomAgent(), RandomAgent()])
+        stream = StringIO()
+        replay = record(game, stream)
+        game.start()
+        replay.close()
+        lines = stream.getvalue().splitlines(True)
+
+        with ReplayReader(StringIO("".join(lines))) as reader:
+            self.assertEqual("Rexxar", reader.header['decks'][0]['hero'])
+            moves = list(reader)
+        self.assertEqual(len(lines) - 1, len(moves))
+        self.assertIsInstance(moves[0], TurnStartMove)
+
+        # A move which was cut off part way through writing it is left out
+        reader = ReplayReader(StringIO("".join(lines[:-1]) + lines[-1][:-5]))
+        self.assertEqual(len(lines) - 2, len(list(reader)))
+
+        lines[1] = lines[1].replace('"start"', '"jump"')
+        self.assertRaises(ValidationError, list, ReplayReader(StringIO("".join(lines))))
+        self.assertEqual(len(lines) - 1, len(list(ReplayReader(StringIO("".join(lines[:1] + lines[2:])),
+                                                               trusted=True))) + 1)
+        self.assertRaises(ValueError, ReplayReader, StringIO(lines[0][:-1]))
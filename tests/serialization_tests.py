@@ -1,5 +1,13 @@
 import json
+import unittest
+from hearthbreaker.agents.basic_agents import DoNothingAgent, RandomAgent
+from hearthbreaker.cards import StonetuskBoar
 from hearthbreaker.engine import Game
+from hearthbreaker.game_objects import GameException, Minion
+from hearthbreaker.serialization import binary
+from hearthbreaker.serialization.binary import FORMAT_VERSION, decode, encode, _decode_json
+from hearthbreaker.sim import load_deck
+from tests.testing_utils import generate_game_for, mock
 import tests.copy_tests
 
 
@@ -43,3 +51,93 @@ class TestMinionSerialization(tests.copy_tests.TestMinionCopying):
     def tearDown(self):
         super().tearDown()
         Game.copy = self._old_copy
+
+
+def _binary_copy(old_game):
+    game = decode(encode(old_game), [player.agent for player in old_game.players])
+    game._has_turn_ended = old_game._has_turn_ended
+    return game
+
+
+class TestGameBinarySerialization(tests.copy_tests.TestGameCopying):
+    def setUp(self):
+        super().setUp()
+        self._old_copy = Game.copy
+        Game.copy = _binary_copy
+
+    def tearDown(self):
+        super().tearDown()
+        Game.copy = self._old_copy
+
+
+class TestMinionBinarySerialization(tests.copy_tests.TestMinionCopying):
+    def setUp(self):
+        super().setUp()
+        self._old_copy = Game.copy
+        Game.copy = _binary_copy
+
+    def tearDown(self):
+        super().tearDown()
+        Game.copy = self._old_copy
+
+
+class TestBinaryFormat(unittest.TestCase):
+    def test_same_as_json(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        game = Game([deck.copy() for deck in decks], [RandomAgent(), RandomAgent()], 3)
+        game.pre_game()
+        game.current_player = game.players[1]
+        agents = [player.agent for player in game.players]
+        for turn in range(0, 12):
+            game.play_single_turn()
+            game_json = json.dumps(game, default=lambda o: o.__to_json__(), sort_keys=True)
+            data = encode(game)
+            self.assertLess(len(data), len(game_json) / 2)
+            self.assertEqual(json.loads(game_json), _decode_json(data))
+            from_json = Game.__from_json__(json.loads(game_json), agents)
+            self.assertEqual(json.dumps(from_json, default=lambda o: o.__to_json__(), sort_keys=True),
+                             json.dumps(decode(data, agents), default=lambda o: o.__to_json__(), sort_keys=True))
+
+    def test_same_moves(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("patron.hsdeck")]
+        for seed in range(0, 3):
+            game = Game([deck.copy() for deck in decks], [RandomAgent(), RandomAgent()], seed)
+            game.pre_game()
+            game.current_player = game.players[1]
+            game._start_turn()
+            while not game.game_ended:
+                moves = game.legal_moves()
+                decoded = decode(encode(game), [RandomAgent(), RandomAgent()])
+                self.assertEqual([move.to_output_string() for move in moves],
+                                 [move.to_output_string() for move in decoded.legal_moves()])
+                game.apply_move(moves[game.random.randint(0, len(moves) - 1)])
+
+    def test_card_needing_game(self):
+        def create_minion(card, player):
+            return Minion(1, player.max_mana)
+
+        key = (binary._MINION, StonetuskBoar().name)
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        game._start_turn()
+        try:
+            with mock.patch.object(StonetuskBoar, "create_minion", create_minion):
+                binary._templates.pop(key, None)
+                StonetuskBoar().summon(game.current_player, game, 0)
+                self.assertEqual({}, binary._template(*key))
+                data = encode(game)
+                self.assertEqual(json.loads(json.dumps(game, default=lambda o: o.__to_json__())), _decode_json(data))
+
+            # Any other error is a bug in the card, and isn't hidden
+            with mock.patch.object(StonetuskBoar, "create_minion", mock.Mock(side_effect=ValueError)):
+                binary._templates.pop(key, None)
+                self.assertRaises(ValueError, binary._template, *key)
+        finally:
+            binary._templates.pop(key, None)
+
+    def test_header(self):
+        game = generate_game_for(StonetuskBoar, StonetuskBoar, DoNothingAgent, DoNothingAgent)
+        data = encode(game)
+        self.assertEqual(b"HBG", data[:3])
+        self.assertEqual(FORMAT_VERSION, data[3])
+        self.assertRaises(GameException, decode, data[:3] + bytes([FORMAT_VERSION + 1]) + data[4:], [None, None])
+        self.assertRaises(GameException, decode, b"{}", [None, None])
@@ -0,0 +1,283 @@
+import csv
+import json
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import unittest
+
+from io import StringIO
+
+from hearthbreaker.engine import Game
+from hearthbreaker.agents.basic_agents import RandomAgent
+import hearthbreaker.replay
+from hearthbreaker.sim import BatchResult, load_deck, open_results, run_batch, ReplayArchive
+from hearthbreaker.sim.archive import JSON, COMPACT
+from hearthbreaker.sim.results import read_results, winning_deck, ResultWriter
+import hearthbreaker.sim.stats
+from tests.testing_utils import mock
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        random.seed(1857)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_deck(self):
+        deck = load_deck("zoo.hsdeck")
+        self.assertEqual(30, len(deck.cards))
+        self.assertEqual("Gul'dan", deck.hero.name)
+
+    def test_single_worker(self):
+        result = run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 4, workers=1, seed=1)
+        self.assertEqual(4, result.games)
+
+    def test_same_seed_same_result(self):
+        result1 = run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 6, workers=2, seed=99)
+        result2 = run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 6, workers=2, seed=99)
+        self.assertEqual(6, result1.games)
+        self.assertEqual(result1.wins, result2.wins)
+        self.assertEqual(result1.draws, result2.draws)
+
+    def test_unknown_agent(self):
+        self.assertRaises(KeyError, run_batch, ["zoo.hsdeck", "example.hsdeck"], ["Random", "Nobody"], 1)
+
+    def test_merge(self):
+        result = BatchResult([1, 2], 3).merge(BatchResult([4, 5], 6))
+        self.assertEqual([5, 7], result.wins)
+        self.assertEqual(9, result.draws)
+        self.assertEqual(21, result.games)
+
+    def test_winning_deck(self):
+        decks = [load_deck("zoo.hsdeck"), load_deck("example.hsdeck")]
+        game = Game(decks, [RandomAgent(), RandomAgent()], 3)
+        self.assertIsNone(winning_deck(game, decks))
+        game.start()
+        dead = [player.hero.dead for player in game.players]
+        self.assertEqual([False, True], [dead[winning_deck(game, decks)], dead[1 - winning_deck(game, decks)]])
+        self.assertEqual(1 - winning_deck(game, decks), winning_deck(game, list(reversed(decks))))
+
+        game.players[0].hero.dead = True
+        game.players[1].hero.dead = True
+        self.assertIsNone(winning_deck(game, decks))
+
+    def test_writer_needs_format(self):
+        self.assertRaises(TypeError, ResultWriter, os.path.join(self.directory, "games.txt"))
+
+    def test_jsonl_results(self):
+        filename = os.path.join(self.directory, "games.jsonl")
+        result = run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 5, workers=2, seed=7,
+                           results=filename)
+        with open(filename) as results_file:
+            records = [json.loads(line) for line in results_file]
+        self.assertEqual(5, len(records))
+        self.assertEqual(5, len(set(record['seed'] for record in records)))
+        for record in records:
+            self.assertEqual(["zoo.hsdeck", "example.hsdeck"], record['decks'])
+            self.assertEqual(["Random", "Random"], record['agents'])
+            self.assertGreater(record['turns'], 0)
+            self.assertEqual(2, len(record['health']))
+            self.assertEqual([[], []], record['mulligan'])
+            self.assertGreater(len(record['played'][0]) + len(record['played'][1]), 0)
+        self.assertEqual(result.wins, [sum(1 for record in records if record['winner'] == index)
+                                       for index in range(2)])
+
+        run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 3, workers=1, seed=8, results=filename)
+        with open(filename) as results_file:
+            self.assertEqual(8, len(results_file.readlines()))
+
+    def test_csv_results(self):
+        filename = os.path.join(self.directory, "games.csv")
+        run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 3, workers=1, seed=7, results=filename)
+        run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 2, workers=2, seed=8, results=filename)
+        with open(filename) as results_file:
+            rows = list(csv.DictReader(results_file))
+        self.assertEqual(5, len(rows))
+        self.assertEqual("zoo.hsdeck", rows[0]['deck1'])
+        self.assertEqual("Random", rows[0]['agent2'])
+        self.assertIn(rows[0]['winner'], ["0", "1", ""])
+
+    def test_buffered_results(self):
+        filename = os.path.join(self.directory, "games.jsonl")
+        record = {'seed': 1}
+        with open_results(filename, buffer_size=2) as writer:
+            writer.write(record)
+            self.assertEqual(0, os.path.getsize(filename))
+            writer.write(record)
+            self.assertGreater(os.path.getsize(filename), 0)
+            writer.write(record)
+        with open(filename) as results_file:
+            self.assertEqual(3, len(results_file.readlines()))
+
+    def test_read_results(self):
+        for name in ["games.jsonl", "games.csv"]:
+            filename = os.path.join(self.directory, name)
+            run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 3, workers=1, seed=7, results=filename)
+            records = list(read_results(filename))
+            self.assertEqual(3, len(records))
+            self.assertEqual(["zoo.hsdeck", "example.hsdeck"], records[0]['decks'])
+            self.assertIn("The Coin", records[0]['played'][0] + records[0]['played'][1])
+
+
+class TestReplayArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "games.hsarchive")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def play_game(self, seed):
+        game = Game([load_deck("zoo.hsdeck"), load_deck("example.hsdeck")], [RandomAgent(), RandomAgent()], seed)
+        replay = hearthbreaker.replay.record(game)
+        game.start()
+        return game, replay
+
+    def test_add_and_load(self):
+        games = [self.play_game(seed) for seed in range(4)]
+        with ReplayArchive(self.filename) as archive:
+            for index, (game, replay) in enumerate(games):
+                entry = archive.add_game(replay, game, format=COMPACT if index == 3 else JSON)
+                self.assertEqual(index, entry.id)
+                self.assertEqual(game._turns_passed, entry.turns)
+                self.assertEqual(game.seed, entry.seed)
+            self.assertEqual(4, len(archive))
+
+        with ReplayArchive(self.filename) as archive:
+            self.assertEqual(4, len(archive))
+            self.assertEqual([0, 1, 2, 3], [entry.seed for entry in archive])
+            for index, (game, replay) in enumerate(games):
+                entry = archive[index]
+                self.assertEqual([deck.hero.short_name for deck in replay.decks], entry.decks)
+                expected = StringIO()
+                actual = StringIO()
+                if entry.format == JSON:
+                    replay.write_json(expected)
+                    archive.load(index).write_json(actual)
+                else:
+                    replay.write(expected)
+                    archive.load(entry).write(actual)
+                self.assertEqual(expected.getvalue(), actual.getvalue())
+                self.assertEqual(expected.getvalue().encode("utf-8"), archive.read_bytes(entry))
+
+            for index, (game, replay) in enumerate(games):
+                winners = [i for i in range(2) if not game.players[i].hero.dead]
+                self.assertEqual(1, len(winners))
+                self.assertIs(game.players[winners[0]].deck, replay.decks[archive[index].winner])
+                self.assertFalse(game.players[1 - winners[0]].deck is replay.decks[archive[index].winner])
+            for winner in range(2):
+                self.assertEqual([entry for entry in archive if entry.winner == winner], archive.find(winner=winner))
+            self.assertEqual([archive[1]], archive.find(winner=archive[1].winner, seed=1))
+            self.assertEqual([archive[3]], archive.find(lambda entry: entry.format == COMPACT))
+
+    def test_add_metadata(self):
+        game, replay = self.play_game(7)
+        with ReplayArchive(self.filename) as archive:
+            entry = archive.add(replay, ["zoo", "example"], 1, 12, 7)
+            self.assertEqual(["zoo", "example"], entry.decks)
+            self.assertEqual((1, 12, 7), (entry.winner, entry.turns, entry.seed))
+            self.assertRaises(ValueError, archive.add, replay, format="xml")
+            self.assertEqual(1, len(archive))
+
+    def test_shared_archive(self):
+        first, first_replay = self.play_game(1)
+        second, second_replay = self.play_game(2)
+        with ReplayArchive(self.filename) as reader, ReplayArchive(self.filename) as writer:
+            writer.add_game(first_replay, first)
+            self.assertEqual(0, len(reader))
+            self.assertEqual(1, reader.add_game(second_replay, second).id)
+            self.assertEqual([1, 2], [entry.seed for entry in reader])
+            writer.refresh()
+            self.assertEqual([1, 2], [entry.seed for entry in writer])
+
+        # A replay which was only partly written is left out of the index
+        with open(self.filename, "rb") as archive_file:
+            data = archive_file.read()
+        with open(self.filename, "wb") as archive_file:
+            archive_file.write(data[:-10])
+        with ReplayArchive(self.filename) as archive:
+            self.assertEqual(1, len(archive))
+
+    def test_short_write(self):
+        games = [self.play_game(seed) for seed in range(3)]
+        write = os.write
+        # Cut the second replay short both in the line describing it and in the replay itself
+        for cut in [10, -10]:
+            filename = os.path.join(self.directory, "cut{0}.hsarchive".format(cut))
+            with ReplayArchive(filename) as archive, ReplayArchive(filename) as reader:
+                archive.add_game(games[0][1], games[0][0])
+                with mock.patch("os.write", side_effect=lambda fd, data: write(fd, data[:cut])):
+                    self.assertRaises(IOError, archive.add_game, games[1][1], games[1][0])
+                reader.refresh()
+                self.assertEqual([0], [entry.seed for entry in reader])
+                self.assertEqual(2, archive.add_game(games[2][1], games[2][0]).seed)
+                reader.refresh()
+                self.assertEqual([0, 2], [entry.seed for entry in reader])
+
+            with ReplayArchive(filename) as archive:
+                self.assertEqual([0, 1], [entry.id for entry in archive])
+                self.assertEqual([0, 2], [entry.seed for entry in archive])
+                expected = StringIO()
+                games[2][1].write_json(expected)
+                self.assertEqual(expected.getvalue().encode("utf-8"), archive.read_bytes(1))
+
+
+@unittest.skipIf(hearthbreaker.sim.stats.numpy is None, "NumPy is not installed")
+class TestCardStats(unittest.TestCase):
+    def record(self, winner, *played):
+        return {'winner': winner, 'played': [list(cards) for cards in played]}
+
+    def test_win_rates(self):
+        stats = hearthbreaker.sim.stats.CardStats(batch_size=3)
+        stats.add_records([
+            self.record(0, ["Wisp", "Wisp", "Argent Squire"], ["Wisp"]),
+            self.record(1, ["Argent Squire"], ["Wisp", "Nobody"]),
+            self.record(None, ["Wisp", "Argent Squire"], []),
+        ])
+        self.assertEqual(6, stats.sides)
+        self.assertEqual(2, stats.wins)
+        self.assertEqual(1, stats.unknown_cards)
+
+        rates = stats.card_win_rates()
+        self.assertEqual((0.5, 4), rates["Wisp"])
+        self.assertEqual((1 / 3, 3), rates["Argent Squire"])
+        self.assertEqual(2, len(rates))
+        self.assertEqual({"Wisp": (0.5, 4)}, stats.card_win_rates(min_games=4))
+
+        wisp = stats.ids["Wisp"]
+        squire = stats.ids["Argent Squire"]
+        self.assertEqual(2, stats.pair_played[wisp, squire])
+        self.assertEqual(2, stats.pair_played[squire, wisp])
+        self.assertEqual(1, stats.pair_wins[wisp, squire])
+        self.assertAlmostEqual(0.5 - (0.5 + 1 / 3) / 2, stats.synergy()[wisp, squire])
+        self.assertEqual([("Argent Squire", "Wisp", stats.synergy()[wisp, squire], 2)], stats.top_synergies())
+        self.assertEqual([], stats.top_synergies(min_games=3))
+
+    def test_merge(self):
+        records = [self.record(game % 2, ["Wisp", "Argent Squire"][:game % 3], ["Wisp"]) for game in range(10)]
+        whole = hearthbreaker.sim.stats.CardStats().add_records(records)
+        first = hearthbreaker.sim.stats.CardStats(batch_size=2).add_records(records[:4])
+        second = pickle.loads(pickle.dumps(hearthbreaker.sim.stats.CardStats().add_records(records[4:])))
+        first.merge(second)
+        self.assertEqual(whole.sides, first.sides)
+        self.assertTrue((whole.played == first.played).all())
+        self.assertTrue((whole.pair_wins == first.pair_wins).all())
+
+    def test_aggregate_results(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filenames = [os.path.join(directory, name) for name in ["games.jsonl", "games.csv"]]
+            for filename in filenames:
+                run_batch(["zoo.hsdeck", "example.hsdeck"], ["Random", "Random"], 4, workers=1, seed=3,
+                          results=filename)
+            for workers in [1, 2]:
+                stats = hearthbreaker.sim.stats.aggregate_results(filenames, workers)
+                self.assertEqual(16, stats.sides)
+                self.assertEqual(0, stats.unknown_cards)
+                self.assertEqual(8, stats.card_win_rates()["The Coin"][1])
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,104 @@
+from hearthbreaker.engine import Game
+from hearthbreaker.game_objects import Character
+import tests.card_tests.druid_tests
+import tests.card_tests.hunter_tests
+import tests.card_tests.mage_tests
+import tests.card_tests.neutral_tests
+import tests.card_tests.paladin_tests
+import tests.card_tests.priest_tests
+import tests.card_tests.rogue_tests
+import tests.card_tests.shaman_tests
+import tests.card_tests.warlock_tests
+import tests.card_tests.warrior_tests
+from tests.testing_utils import describe_state
+
+
+class HashChecking:
+    """
+    Runs a card test suite, checking the hash of the game after every card played, attack and end of turn against
+    the game's JSON.  Every state described by the same JSON must have the same hash, and every state with the same
+    hash must be described by the same JSON.  The hashes kept by each player and deck are also checked, by
+    :attr:`Game.verify_state_hash <hearthbreaker.engine.Game.verify_state_hash>`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.hashes = {}
+        self.descriptions = {}
+        Game.verify_state_hash = True
+        self._old_play_card = Game.play_card
+        self._old_attack = Character.attack
+        self._old_end_turn = Game._end_turn
+        old_play_card = self._old_play_card
+        old_attack = self._old_attack
+        old_end_turn = self._old_end_turn
+        test = self
+
+        def play_card(game, card):
+            old_play_card(game, card)
+            test.check_hash(game)
+
+        def attack(character):
+            old_attack(character)
+            test.check_hash(character.player.game)
+
+        def end_turn(game):
+            old_end_turn(game)
+            test.check_hash(game)
+
+        Game.play_card = play_card
+        Character.attack = attack
+        Game._end_turn = end_turn
+
+    def tearDown(self):
+        Game.play_card = self._old_play_card
+        Character.attack = self._old_attack
+        Game._end_turn = self._old_end_turn
+        Game.verify_state_hash = False
+        super().tearDown()
+
+    def check_hash(self, game):
+        state = game.state_hash()
+        description = describe_state(game)
+        self.assertEqual(self.hashes.setdefault(description, state), state)
+        self.assertEqual(self.descriptions.setdefault(state, description), description)
+
+
+class TestDruidHashing(HashChecking, tests.card_tests.druid_tests.TestDruid):
+    pass
+
+
+class TestHunterHashing(HashChecking, tests.card_tests.hunter_tests.TestHunter):
+    pass
+
+
+class TestMageHashing(HashChecking, tests.card_tests.mage_tests.TestMage):
+    pass
+
+
+class TestCommonHashing(HashChecking, tests.card_tests.neutral_tests.TestCommon):
+    pass
+
+
+class TestPaladinHashing(HashChecking, tests.card_tests.paladin_tests.TestPaladin):
+    pass
+
+
+class TestPriestHashing(HashChecking, tests.card_tests.priest_tests.TestPriest):
+    pass
+
+
+class TestRogueHashing(HashChecking, tests.card_tests.rogue_tests.TestRogue):
+    pass
+
+
+class TestShamanHashing(HashChecking, tests.card_tests.shaman_tests.TestShaman):
+    pass
+
+
+class TestWarlockHashing(HashChecking, tests.card_tests.warlock_tests.TestWarlock):
+    pass
+
+
+class TestWarriorHashing(HashChecking, tests.card_tests.warrior_tests.TestWarrior):
+    pass
@@ -1,5 +1,6 @@
 import copy
 import collections
+import json
 import sys
 from hearthbreaker.cards.heroes import hero_for_class
 from hearthbreaker.constants import CHARACTER_CLASS
@@ -11,7 +12,7 @@ if sys.version_info.major is 3:
     else:
         from unittest import mock  # pragma: no cover
 
-__all__ = ["mock", "StackedDeck", "generate_game_for"]
+__all__ = ["mock", "StackedDeck", "generate_game_for", "describe_state"]
 
 
 class StackedDeck(Deck):
@@ -25,11 +26,9 @@ class StackedDeck(Deck):
         super().__init__(cards, hero)
 
     def draw(self, random_func):
-        for card_index in range(0, len(self.cards)):
-            if not self.cards[card_index].drawn:
-                self.cards[card_index].drawn = True
-                self.left -= 1
-                return self.cards[card_index]
+        for card in self.undrawn_cards():
+            self.remove(card)
+            return card
 
 
 def generate_game_for(card1, card2, first_agent_type, second_agent_type, run_pre_game=True):
@@ -62,3 +61,17 @@ def generate_game_for(card1, card2, first_agent_type, second_agent_type, run_pre
     if run_pre_game:
         game.pre_game()
     return game
+
+
+def describe_state(game):
+    """
+    Describe the state of a game as its JSON, leaving out what Game.state_hash doesn't cover: the number of turns, and
+    the order the minions were played in.  Two games in the same state have the same description.
+    """
+    description = json.loads(json.dumps(game, default=lambda o: o.__to_json__()))
+    del description['turn_count']
+    del description['current_sequence_id']
+    for player in description['players']:
+        for minion in player['minions']:
+            del minion['sequence_id']
+    return json.dumps(description, sort_keys=True)